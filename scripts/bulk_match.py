@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+批量矩阵匹配：多份简历 × 职位目录，每个职位取向量最相近的 top_k 份简历打分，结果逐条追加写入 JSONL。
+
+用法:
+  uv run python scripts/bulk_match.py --resumes resumes/ --out .data/bulk/matches.jsonl [--jobs jobs.jsonl]
+      [--source mock] [--keywords "Python 后端"] [--location 上海] [--top-k 5] [--mode hybrid] [--concurrency 5]
+  --resumes  简历目录（*.txt / *.md，文件名即简历 ID）或 JSONL（每行 {"id": ..., "text": ...}）
+  --jobs     职位 JSONL（每行一个 JobInfo）；不传则从 --source 职位源（或启用的职位目录）获取
+"""
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+
+from tatha.jobs.bulk import abulk_match_to_jsonl
+from tatha.jobs.pipeline import fetch_jobs
+from tatha.jobs.schemas import JobInfo, ResumeInput
+
+
+def _load_resumes(path: Path) -> list[ResumeInput]:
+    if path.is_dir():
+        files = sorted(p for p in path.iterdir() if p.suffix.lower() in (".txt", ".md"))
+        return [ResumeInput(id=p.stem, text=p.read_text(encoding="utf-8")) for p in files]
+    with path.open(encoding="utf-8") as f:
+        return [ResumeInput.model_validate(json.loads(line)) for line in f if line.strip()]
+
+
+def _load_jobs(path: Path) -> list[JobInfo]:
+    with path.open(encoding="utf-8") as f:
+        return [JobInfo.model_validate(json.loads(line)) for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="简历 × 职位批量矩阵匹配 → JSONL")
+    parser.add_argument("--resumes", required=True, type=Path, help="简历目录或 JSONL")
+    parser.add_argument("--jobs", type=Path, help="职位 JSONL；不传则从职位源获取")
+    parser.add_argument("--source", help="职位源 ID（--jobs 未传时使用）")
+    parser.add_argument("--keywords", help="职位关键词（启用职位目录时生效）")
+    parser.add_argument("--location", help="工作地点（启用职位目录时生效）")
+    parser.add_argument("--top-k", type=int, default=5, help="每个职位进入打分的候选简历数")
+    parser.add_argument("--mode", choices=("fast", "llm", "hybrid"), help="打分模式，默认 TATHA_JOB_SCORE_MODE")
+    parser.add_argument("--concurrency", type=int, help="同时在途的 LLM 打分数，默认 TATHA_JOB_SCORE_CONCURRENCY")
+    parser.add_argument("--out", required=True, type=Path, help="输出 JSONL（追加写入）")
+    args = parser.parse_args()
+
+    resumes = _load_resumes(args.resumes)
+    jobs = _load_jobs(args.jobs) if args.jobs else fetch_jobs(args.source, args.keywords, args.location)
+    print(f"简历 {len(resumes)} 份，职位 {len(jobs)} 条，每职位候选 {args.top_k} 份")
+    start = time.perf_counter()
+    n = asyncio.run(
+        abulk_match_to_jsonl(
+            args.out, resumes, jobs, top_k=args.top_k, mode=args.mode, concurrency=args.concurrency
+        )
+    )
+    print(f"完成 {n} 条打分，用时 {time.perf_counter() - start:.1f}s，结果: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
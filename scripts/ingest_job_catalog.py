@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+职位目录入库：从已注册职位源拉取职位写入本地目录（SQLite FTS5），供 TATHA_JOB_CATALOG=true 时的匹配流水线检索。
+
+可由 cron 定时执行，替代 API 进程内的后台调度。
+
+用法:
+  uv run python scripts/ingest_job_catalog.py [--source mock] [--force] [--limit 500]
+  --source  只入库指定源（可重复）；默认 TATHA_JOB_CATALOG_SOURCES
+  --force   忽略刷新间隔与失败退避，立即重新拉取
+  --limit   每个源最多拉取条数（定时刷新与 --force 均适用）
+"""
+import argparse
+
+from tatha.core.config import job_catalog_sources
+from tatha.jobs.catalog import get_job_catalog, refresh_stale_sources
+
+
+def main():
+    parser = argparse.ArgumentParser(description="职位源 → 本地职位目录")
+    parser.add_argument("--source", action="append", help="职位源 ID，可重复")
+    parser.add_argument("--force", action="store_true", help="忽略刷新间隔立即拉取")
+    parser.add_argument("--limit", type=int, default=500, help="每个源最多拉取条数")
+    args = parser.parse_args()
+
+    catalog = get_job_catalog()
+    sources = args.source or job_catalog_sources()
+    if args.force:
+        result = {sid: catalog.ingest_from_source(sid, limit=args.limit) for sid in sources}
+        catalog.prune()
+    else:
+        result = refresh_stale_sources(catalog, sources, limit=args.limit)
+    for sid in sources:
+        status = f"入库 {result[sid]} 条" if sid in result else "未到刷新时间，跳过"
+        print(f"{sid}: {status}（目录现有 {catalog.count(sid)} 条）")
+    print(f"目录路径: {catalog.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,27 @@
 # PydanticAI 类型安全智能体 + Marvin 轻量 AI 函数
 
-from .schemas import ResumeAnalysis, PoetryAnalysis, CreditAnalysis
+from .schemas import ResumeAnalysis, ResumeProfile, PoetryAnalysis, CreditAnalysis, IntentDocumentAnalysis
 from .document_agents import (
     run_resume_analysis,
+    run_resume_profile,
+    arun_resume_profile,
     run_poetry_analysis,
     run_credit_analysis,
     run_document_analysis,
+    arun_intent_document_analysis,
 )
 
 __all__ = [
     "ResumeAnalysis",
+    "ResumeProfile",
     "PoetryAnalysis",
     "CreditAnalysis",
+    "IntentDocumentAnalysis",
     "run_resume_analysis",
+    "run_resume_profile",
+    "arun_resume_profile",
     "run_poetry_analysis",
     "run_credit_analysis",
     "run_document_analysis",
+    "arun_intent_document_analysis",
 ]
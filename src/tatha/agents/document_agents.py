@@ -6,20 +6,32 @@ from __future__ import annotations
 
 from typing import Any
 
-from tatha.core.config import get_default_model
-from .schemas import ResumeAnalysis, PoetryAnalysis, CreditAnalysis
+from tatha.core.config import document_max_tokens, model_profile
+from tatha.core.tokens import truncate_tokens
+from .schemas import ResumeAnalysis, ResumeProfile, PoetryAnalysis, CreditAnalysis, IntentDocumentAnalysis
 
 
-def _model():
-    """LiteLLM 模型实例，与 TATHA_DEFAULT_MODEL 一致。"""
-    from pydantic_ai_litellm import LiteLLMModel
-    return LiteLLMModel(model_name=get_default_model())
+def _model(task: str | None = None):
+    """LiteLLM 模型实例：按任务配置选模型，未指定时与 TATHA_DEFAULT_MODEL 一致（或按 TATHA_MODEL_ROUTE 路由）；请求经提供方限流排队。"""
+    from tatha.core.llm import agent_model
+    return agent_model(task)
+
+
+def _settings(task: str) -> dict[str, Any]:
+    """任务配置中的 max_tokens / temperature / 超时，作为 Agent 的 model_settings。"""
+    return model_profile(task).agent_settings()
+
+
+def _fit(task: str, text: str) -> str:
+    """输入按该任务模型的 token 上限截断（TATHA_DOCUMENT_MAX_TOKENS，优先在句末断开），提示词大小可预期。"""
+    return truncate_tokens(text or "", document_max_tokens(), model_name=model_profile(task).model_name)
 
 
 def _resume_agent():
     from pydantic_ai import Agent
     return Agent(
-        model=_model(),
+        model=_model("resume"),
+        model_settings=_settings("resume"),
         output_type=ResumeAnalysis,
         system_prompt=(
             "你是一个简历解析器。根据用户提供的简历文本，提取并仅返回结构化信息："
@@ -29,10 +41,27 @@ def _resume_agent():
     )
 
 
+def _resume_profile_agent():
+    from pydantic_ai import Agent
+    return Agent(
+        model=_model("resume"),
+        model_settings=_settings("resume"),
+        output_type=ResumeProfile,
+        system_prompt=(
+            "你是一个简历画像生成器，输出用于职位匹配的紧凑结构化画像。根据简历文本提取："
+            "姓名、学历、技能关键词（skills 逗号分隔，skill_list 为列表，按重要性降序，最多 20 个）、"
+            "职级（实习/初级/中级/高级/资深/专家/管理）、工作年限、目标岗位方向、现居或期望城市（可含远程）、"
+            "期望薪资、语言能力、工作经历摘要（不超过 200 字，突出与求职相关的项目与成果）。"
+            "简历未提及的字段留空，不要臆测。不要输出任何解释或前缀，只输出符合 ResumeProfile 的 JSON 结构。"
+        ),
+    )
+
+
 def _poetry_agent():
     from pydantic_ai import Agent
     return Agent(
-        model=_model(),
+        model=_model("poetry"),
+        model_settings=_settings("poetry"),
         output_type=PoetryAnalysis,
         system_prompt=(
             "你是一个诗词/赏析解析器。根据用户提供的诗词或赏析文本，提取并仅返回结构化信息："
@@ -45,7 +74,8 @@ def _poetry_agent():
 def _credit_agent():
     from pydantic_ai import Agent
     return Agent(
-        model=_model(),
+        model=_model("credit"),
+        model_settings=_settings("credit"),
         output_type=CreditAnalysis,
         system_prompt=(
             "你是一个征信/信用文本解析器。根据用户提供的文本，提取并仅返回结构化信息："
@@ -54,6 +84,24 @@ def _credit_agent():
     )
 
 
+def _intent_document_agent():
+    from pydantic_ai import Agent
+    return Agent(
+        model=_model("intent_document"),
+        model_settings=_settings("intent_document"),
+        output_type=IntentDocumentAnalysis,
+        system_prompt=(
+            "你是一个意图分类与文档解析器。根据用户输入，先判断意图（取值仅限: job_match, resume_upload, poetry, credit, mbti, unknown），"
+            "job_match=求职/职位匹配，resume_upload=上传或解析简历，poetry=诗词/诗人/陪伴，credit=征信/验证，mbti=人格测评；"
+            "填写 confidence（0 到 1）与可选 slots。"
+            "意图为 resume_upload 时在 analysis 中提取姓名、学历或毕业院校、技能关键词（逗号分隔）、工作经历摘要；"
+            "poetry 时提取诗词标题、作者、朝代、正文或摘录句、主题或情感；credit 时提取主体名称、报告类型、摘要说明；"
+            "其他意图不填 analysis。原文未提及的字段留空，不要臆测。"
+            "不要输出任何解释或前缀，只输出符合 IntentDocumentAnalysis 的 JSON 结构。"
+        ),
+    )
+
+
 # 懒加载单例，避免重复创建 Agent
 _agents: dict[str, Any] = {}
 
@@ -62,10 +110,14 @@ def _get_agent(name: str):
     if name not in _agents:
         if name == "resume":
             _agents[name] = _resume_agent()
+        elif name == "resume_profile":
+            _agents[name] = _resume_profile_agent()
         elif name == "poetry":
             _agents[name] = _poetry_agent()
         elif name == "credit":
             _agents[name] = _credit_agent()
+        elif name == "intent_document":
+            _agents[name] = _intent_document_agent()
         else:
             raise ValueError(f"未知文档类型: {name}，支持 resume / poetry / credit")
     return _agents[name]
@@ -74,26 +126,47 @@ def _get_agent(name: str):
 def run_resume_analysis(text: str) -> ResumeAnalysis:
     """简历解读：类型安全，返回 ResumeAnalysis。"""
     agent = _get_agent("resume")
-    result = agent.run_sync(text)
+    result = agent.run_sync(_fit("resume", text))
+    return result.output
+
+
+def run_resume_profile(text: str) -> ResumeProfile:
+    """简历画像：供职位打分复用的紧凑结构化画像（缓存见 tatha.jobs.profile）。"""
+    agent = _get_agent("resume_profile")
+    result = agent.run_sync(_fit("resume", text))
+    return result.output
+
+
+async def arun_resume_profile(text: str) -> ResumeProfile:
+    """异步版简历画像，供异步匹配流水线使用。"""
+    agent = _get_agent("resume_profile")
+    result = await agent.run(_fit("resume", text))
     return result.output
 
 
 def run_poetry_analysis(text: str) -> PoetryAnalysis:
     """诗词/赏析解读：类型安全，返回 PoetryAnalysis。"""
     agent = _get_agent("poetry")
-    result = agent.run_sync(text)
+    result = agent.run_sync(_fit("poetry", text))
     return result.output
 
 
 def run_credit_analysis(text: str) -> CreditAnalysis:
     """征信文本解读：类型安全，返回 CreditAnalysis。"""
     agent = _get_agent("credit")
-    result = agent.run_sync(text)
+    result = agent.run_sync(_fit("credit", text))
     return result.output
 
 
 def run_document_analysis(document_type: str, text: str) -> ResumeAnalysis | PoetryAnalysis | CreditAnalysis:
     """统一入口：按 document_type 调用对应智能体，返回类型化结果。"""
     agent = _get_agent(document_type)
-    result = agent.run_sync(text)
+    result = agent.run_sync(_fit(document_type, text))
+    return result.output
+
+
+async def arun_intent_document_analysis(text: str) -> IntentDocumentAnalysis:
+    """合并模式：一次调用同时返回意图与（文档类意图的）解读结果，按 intent 区分的联合类型。"""
+    agent = _get_agent("intent_document")
+    result = await agent.run(_fit("intent_document", text))
     return result.output
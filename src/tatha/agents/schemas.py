@@ -2,7 +2,7 @@
 文档解读结果的数据边界：Pydantic 模型，保证 AI 只返回结构化字段、不夹带「好的，这是你要的 JSON」等导致解析崩溃的文本。
 """
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Annotated, Any, Literal, Optional, Union
 
 
 class ResumeAnalysis(BaseModel):
@@ -13,6 +13,34 @@ class ResumeAnalysis(BaseModel):
     experience_summary: Optional[str] = Field(None, description="工作经历摘要")
 
 
+class ResumeProfile(ResumeAnalysis):
+    """简历画像：在 ResumeAnalysis 基础上补充职位匹配所需的结构化字段，每份简历只生成一次，供多次职位打分复用。"""
+    skill_list: list[str] = Field(default_factory=list, description="技能关键词列表（按熟练度/重要性降序）")
+    seniority: Optional[str] = Field(None, description="职级：实习/初级/中级/高级/资深/专家/管理")
+    years_of_experience: Optional[float] = Field(None, description="工作年限")
+    target_roles: list[str] = Field(default_factory=list, description="目标或当前岗位方向")
+    locations: list[str] = Field(default_factory=list, description="现居或期望工作城市，可含「远程」")
+    salary_expectation: Optional[str] = Field(None, description="期望薪资，如 25-35k/月")
+    languages: list[str] = Field(default_factory=list, description="语言能力，如 英语 CET-6")
+
+    def to_prompt_text(self) -> str:
+        """紧凑的画像文本，替代原始简历放入打分提示词。"""
+        lines = [
+            ("姓名", self.name),
+            ("学历", self.education),
+            ("职级", " ".join(
+                x for x in (self.seniority, f"{self.years_of_experience:g} 年经验" if self.years_of_experience else None) if x
+            )),
+            ("方向", "、".join(self.target_roles)),
+            ("技能", "、".join(self.skill_list) or self.skills),
+            ("地点", "、".join(self.locations)),
+            ("期望薪资", self.salary_expectation),
+            ("语言", "、".join(self.languages)),
+            ("经历", self.experience_summary),
+        ]
+        return "\n".join(f"{k}：{v}" for k, v in lines if v)
+
+
 class PoetryAnalysis(BaseModel):
     """诗词/赏析解读结果：类型安全边界。"""
     title: Optional[str] = Field(None, description="诗词标题")
@@ -27,3 +55,39 @@ class CreditAnalysis(BaseModel):
     entity_name: Optional[str] = Field(None, description="主体名称")
     report_type: Optional[str] = Field(None, description="报告类型")
     summary: Optional[str] = Field(None, description="摘要说明")
+
+
+class _IntentFields(BaseModel):
+    confidence: float = Field(0.5, description="意图置信度 0–1")
+    slots: dict[str, Any] = Field(default_factory=dict, description="槽位，如 {\"query\": \"...\"}")
+
+
+class ResumeIntentAnalysis(_IntentFields):
+    """合并模式：意图为上传/解析简历，并附简历解读结果。"""
+    intent: Literal["resume_upload"]
+    analysis: ResumeAnalysis
+
+
+class PoetryIntentAnalysis(_IntentFields):
+    """合并模式：意图为诗词/诗人/陪伴，并附诗词解读结果。"""
+    intent: Literal["poetry"]
+    analysis: PoetryAnalysis
+
+
+class CreditIntentAnalysis(_IntentFields):
+    """合并模式：意图为征信/验证，并附征信解读结果。"""
+    intent: Literal["credit"]
+    analysis: CreditAnalysis
+
+
+class OtherIntent(_IntentFields):
+    """合并模式：不需要文档解读的意图，仅返回意图。"""
+    intent: Literal["job_match", "mbti", "unknown"]
+
+
+class IntentDocumentAnalysis(BaseModel):
+    """合并模式的一次结构化输出：按 intent 区分的联合类型，文档类意图同时携带对应解读结果。"""
+    result: Annotated[
+        Union[ResumeIntentAnalysis, PoetryIntentAnalysis, CreditIntentAnalysis, OtherIntent],
+        Field(discriminator="intent"),
+    ]
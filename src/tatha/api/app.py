@@ -9,18 +9,26 @@ Tatha 主仓 HTTP 入口：供 ZeroClaw 助理 Tool 调用。
 
 可选演示页：GET /demo.html 返回单文件 demo.html（与 API 同源，便于浏览器直接体验匹配结果）。
 """
+import asyncio
 import io
 import os
-from fastapi import Depends, FastAPI, File, Form, HTTPException, Request, UploadFile
-from fastapi.responses import HTMLResponse, PlainTextResponse
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI, File, Form, Header, HTTPException, Request, UploadFile
+from fastapi.responses import HTMLResponse, PlainTextResponse, StreamingResponse
 
 from .auth import AuthContext, get_auth
 from .quota import (
     RESOURCE_ASK,
+    RESOURCE_CANDIDATE_SEARCH,
     RESOURCE_JOB_MATCH,
+    RESOURCE_JOB_MATCH_BULK,
     RESOURCE_RAG,
     RESOURCE_RESUME_PARSE,
     consume,
+    refund,
+    clamp_deadline,
+    clamp_score_mode,
     clamp_top_n,
 )
 from .region import get_region_response
@@ -29,18 +37,45 @@ from .schemas import (
     AskResponse,
     AuthLoginRequest,
     AuthRegisterRequest,
+    BulkMatchRequest,
+    CandidateSearchRequest,
+    CandidateSearchResponse,
     DocumentConvertResponse,
     JobMatchRequest,
     JobMatchResponse,
+    MatchTaskSubmitResponse,
     RagQueryRequest,
     RagQueryResponse,
 )
-from .central_brain import handle_ask
+from .central_brain import ahandle_ask
+
+@asynccontextmanager
+async def _lifespan(_app: FastAPI):
+    """
+    启动/关闭钩子：启用职位目录时开启后台定时入库，多个匹配请求共享同一次职位源拉取；
+    启用示例句意图分类时预先向量化示例句；关闭时释放异步 LLM 调用共享的 HTTP 连接池。
+    """
+    from tatha.core.config import intent_embedding_enabled, job_catalog_enabled
+    from tatha.core.llm import aclose_http_client
+
+    if job_catalog_enabled():
+        from tatha.jobs.catalog import start_catalog_scheduler
+        start_catalog_scheduler()
+    if intent_embedding_enabled():
+        from .central_brain import warm_intent_index
+        await asyncio.to_thread(warm_intent_index)
+    yield
+    if job_catalog_enabled():
+        from tatha.jobs.catalog import stop_catalog_scheduler
+        stop_catalog_scheduler()
+    await aclose_http_client()
+
 
 app = FastAPI(
     title="Tatha API",
     description="Tatha 主仓：单入口 + 中央大脑，简历解析、匹配、诗人/诗词 RAG",
     version="0.1.0",
+    lifespan=_lifespan,
 )
 
 
@@ -126,12 +161,68 @@ def _quota_exceeded_response():
     )
 
 
+def _fit_input_budget(tier: str, *texts: str) -> list[str]:
+    """
+    按档位 token 预算检查本次请求的用户输入（合计）：在任何 LLM 调用之前，
+    超出时截断最长的输入（TATHA_INPUT_BUDGET_MODE=trim），或返回 413（reject）。
+    """
+    from tatha.core.config import get_default_model, input_budget_mode, input_token_budget
+    from tatha.core.tokens import TokenBudgetExceeded, fit_token_budget
+
+    try:
+        return fit_token_budget(
+            list(texts),
+            input_token_budget(tier),
+            model_name=get_default_model(),
+            trim=input_budget_mode() == "trim",
+        )
+    except TokenBudgetExceeded as e:
+        raise HTTPException(
+            status_code=413,
+            detail={
+                "code": "input_too_large",
+                "message": f"{e}，请精简输入或升级档位。",
+                "tokens": e.tokens,
+                "budget": e.budget,
+            },
+        )
+
+
+def _parse_timeout_header(value: str | None) -> float | None:
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
 @app.post("/v1/ask", response_model=AskResponse)
-def ask(request: AskRequest, auth: AuthContext = Depends(get_auth)):
-    """单入口：用户需求由此进入，中央大脑解析意图并分发到内部端口，返回统一 JSON。V1 需鉴权与配额。"""
+async def ask(
+    request: AskRequest,
+    auth: AuthContext = Depends(get_auth),
+    x_request_timeout: str | None = Header(None, description="本次请求的时间预算（秒），不超过档位上限"),
+):
+    """
+    单入口：用户需求由此进入，中央大脑解析意图并分发到内部端口，返回统一 JSON。V1 需鉴权与配额。
+    整次请求受时间预算约束（X-Request-Timeout，未传或超出时取档位默认 TATHA_ASK_DEADLINE_<TIER>），到期返回部分结果。
+    消息与简历合计受档位 token 预算约束（超出时截断或 413），不计配额。
+    """
+    context = dict(request.context or {})
+    message, resume_text, context_resume = _fit_input_budget(
+        auth.tier, request.message, request.resume_text or "", str(context.get("resume_text") or "")
+    )
+    if context.get("resume_text"):
+        context["resume_text"] = context_resume
+    request = request.model_copy(
+        update={
+            "message": message,
+            "resume_text": resume_text if request.resume_text is not None else None,
+            "context": context,
+        }
+    )
     if not consume(auth.user_id, auth.tier, RESOURCE_ASK):
         raise _quota_exceeded_response()
-    return handle_ask(request)
+    timeout = clamp_deadline(auth.tier, _parse_timeout_header(x_request_timeout))
+    return await ahandle_ask(request, timeout=timeout)
 
 
 @app.post("/v1/documents/convert", response_model=DocumentConvertResponse)
@@ -166,9 +257,11 @@ async def documents_convert(
 
     extracted = None
     if dtype and markdown:
+        # 结构化提取前按档位 token 预算检查文档正文（超出时截断或 413）；返回的 markdown 仍为全文
+        (analysis_text,) = _fit_input_budget(auth.tier, markdown)
         try:
             from tatha.api.central_brain import _document_analysis
-            extracted = _document_analysis(dtype, markdown)
+            extracted = _document_analysis(dtype, analysis_text)
         except Exception as e:
             return DocumentConvertResponse(
                 markdown=markdown,
@@ -184,21 +277,25 @@ async def documents_convert(
 
 
 @app.post("/v1/jobs/match", response_model=JobMatchResponse)
-def jobs_match(request: JobMatchRequest, auth: AuthContext = Depends(get_auth)):
+async def jobs_match(request: JobMatchRequest, auth: AuthContext = Depends(get_auth)):
     """
-    职位匹配流水线：拉取职位 → 简历 vs 职位 LLM 打分 → 按综合分排序返回 Top-N。V1 需鉴权与配额。
-    top_n 按档位限制（Free≤3，Basic≤5，Pro≤20）；超配额返回 429。
+    职位匹配流水线：拉取职位 → 简历 vs 职位并发打分（mode：llm / fast 本地 / hybrid）→ 按综合分排序返回 Top-N。V1 需鉴权与配额。
+    top_n 按档位限制（Free≤3，Basic≤5，Pro≤20）；超配额返回 429；简历超出档位 token 预算时截断或返回 413。
     """
+    (resume_text,) = _fit_input_budget(auth.tier, request.resume_text)
     if not consume(auth.user_id, auth.tier, RESOURCE_JOB_MATCH):
         raise _quota_exceeded_response()
     top_n = clamp_top_n(auth.tier, request.top_n or 5)
     try:
-        from tatha.jobs import run_job_match_pipeline
+        from tatha.jobs import arun_job_match_pipeline
 
-        results, total = run_job_match_pipeline(
-            resume_text=request.resume_text,
+        results, total = await arun_job_match_pipeline(
+            resume_text=resume_text,
             top_n=top_n,
             source_id=request.source,
+            keywords=request.keywords,
+            location=request.location,
+            mode=clamp_score_mode(auth.tier, request.mode),
         )
         return JobMatchResponse(
             matches=[r.model_dump() for r in results],
@@ -208,17 +305,162 @@ def jobs_match(request: JobMatchRequest, auth: AuthContext = Depends(get_auth)):
         return JobMatchResponse(matches=[], total_evaluated=0, error=str(e))
 
 
+@app.post("/v1/jobs/match/stream")
+async def jobs_match_stream(request: JobMatchRequest, auth: AuthContext = Depends(get_auth)):
+    """
+    流式职位匹配（Server-Sent Events）：每条职位打分完成即推送 match 事件，最后推送按综合分排序的 summary。
+    事件体为 JobMatchStreamEvent 的 JSON；鉴权、配额、top_n 档位限制与 token 预算同 /v1/jobs/match。
+    """
+    (resume_text,) = _fit_input_budget(auth.tier, request.resume_text)
+    if not consume(auth.user_id, auth.tier, RESOURCE_JOB_MATCH):
+        raise _quota_exceeded_response()
+    top_n = clamp_top_n(auth.tier, request.top_n or 5)
+
+    async def _events():
+        from tatha.jobs import JobMatchStreamEvent, astream_job_match_pipeline
+
+        try:
+            async for ev in astream_job_match_pipeline(
+                resume_text=resume_text,
+                top_n=top_n,
+                source_id=request.source,
+                keywords=request.keywords,
+                location=request.location,
+                mode=clamp_score_mode(auth.tier, request.mode),
+            ):
+                yield f"event: {ev.event}\ndata: {ev.model_dump_json()}\n\n"
+        except Exception as e:
+            err = JobMatchStreamEvent(event="error", error=str(e))
+            yield f"event: error\ndata: {err.model_dump_json()}\n\n"
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/v1/jobs/match/async", response_model=MatchTaskSubmitResponse, status_code=202)
+async def jobs_match_async(request: JobMatchRequest, auth: AuthContext = Depends(get_auth)):
+    """
+    提交异步职位匹配任务，立即返回 task_id；匹配在进程内 worker 池中运行，不占用本连接。
+    鉴权、配额、top_n 档位限制与 token 预算同 /v1/jobs/match；排队已满返回 503（退还本次配额）。
+    """
+    from tatha.jobs.queue import QueueFullError, get_match_queue
+
+    (resume_text,) = _fit_input_budget(auth.tier, request.resume_text)
+    if not consume(auth.user_id, auth.tier, RESOURCE_JOB_MATCH):
+        raise _quota_exceeded_response()
+    params = {
+        "resume_text": resume_text,
+        "top_n": clamp_top_n(auth.tier, request.top_n or 5),
+        "source_id": request.source,
+        "keywords": request.keywords,
+        "location": request.location,
+        "mode": clamp_score_mode(auth.tier, request.mode),
+    }
+    try:
+        task = await get_match_queue().submit(params, user_id=auth.user_id)
+    except QueueFullError as e:
+        refund(auth.user_id, RESOURCE_JOB_MATCH)
+        raise HTTPException(status_code=503, detail=str(e))
+    return MatchTaskSubmitResponse(task_id=task.id, status=task.status)
+
+
+@app.get("/v1/jobs/match/{task_id}")
+async def jobs_match_task(task_id: str, auth: AuthContext = Depends(get_auth)):
+    """轮询异步匹配任务：status（queued/running/done/failed）、进度（scored/total）与当前 Top-N；仅提交者可查。"""
+    from tatha.jobs.queue import get_match_queue
+
+    task = await get_match_queue().aget(task_id)
+    if task is None or task.user_id != auth.user_id:
+        raise HTTPException(status_code=404, detail="任务不存在或已过期")
+    return task.model_dump(exclude={"user_id"})
+
+
+@app.post("/v1/jobs/match/bulk")
+async def jobs_match_bulk(request: BulkMatchRequest, auth: AuthContext = Depends(get_auth)):
+    """
+    批量矩阵匹配（招聘方）：多份简历 × 职位，向量内积为每个职位选出最相近的 top_k 份简历再打分。
+    响应为 NDJSON（application/x-ndjson），每条打分完成即输出一行 BulkMatchRecord；出错时输出 {"error": ...}。
+    按「批量匹配」配额扣减（Free 不可用）；全部简历合计超出档位 token 预算时截断最长的简历或返回 413。
+    """
+    resume_texts = _fit_input_budget(auth.tier, *(r.text for r in request.resumes))
+    if not consume(auth.user_id, auth.tier, RESOURCE_JOB_MATCH_BULK):
+        raise _quota_exceeded_response()
+
+    async def _lines():
+        import asyncio
+        import json
+
+        from tatha.jobs.bulk import abulk_match
+        from tatha.jobs.pipeline import fetch_jobs
+        from tatha.jobs.schemas import JobInfo, ResumeInput
+
+        try:
+            if request.jobs is not None:
+                jobs = [JobInfo.model_validate(j) for j in request.jobs]
+            else:
+                jobs = await asyncio.to_thread(fetch_jobs, request.source, request.keywords, request.location)
+            resumes = [ResumeInput(id=r.id, text=t) for r, t in zip(request.resumes, resume_texts)]
+            async for record in abulk_match(
+                resumes, jobs, top_k=request.top_k, mode=clamp_score_mode(auth.tier, request.mode)
+            ):
+                yield record.model_dump_json() + "\n"
+        except Exception as e:
+            yield json.dumps({"error": str(e)}, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(_lines(), media_type="application/x-ndjson")
+
+
+@app.post("/v1/jobs/candidates", response_model=CandidateSearchResponse)
+async def jobs_candidates(request: CandidateSearchRequest, auth: AuthContext = Depends(get_auth)):
+    """
+    反向匹配（招聘方）：以职位描述检索 resume 索引中最相近的简历，可选对短名单打分后按综合分排序。
+    需先构建 resume 索引（scripts/build_resume_index.py）；按「候选人检索」配额扣减（Free 不可用）。
+    职位描述超出档位 token 预算时截断或返回 413。
+    """
+    if not (request.job or (request.job_description or "").strip()):
+        raise HTTPException(status_code=422, detail="请提供 job 或 job_description")
+    job_data = dict(request.job) if request.job else None
+    raw = (job_data.get("description") or "") if job_data is not None else request.job_description
+    (description,) = _fit_input_budget(auth.tier, raw)
+    if job_data is not None and raw:
+        job_data["description"] = description
+    if not consume(auth.user_id, auth.tier, RESOURCE_CANDIDATE_SEARCH):
+        raise _quota_exceeded_response()
+    try:
+        from tatha.jobs.candidates import arank_candidates
+        from tatha.jobs.schemas import JobInfo
+
+        job = (
+            JobInfo.model_validate(job_data)
+            if job_data is not None
+            else JobInfo(title="", company="", description=description)
+        )
+        candidates = await arank_candidates(
+            job,
+            top_k=request.top_k,
+            rescore=request.rescore,
+            mode=clamp_score_mode(auth.tier, request.mode),
+        )
+        return CandidateSearchResponse(candidates=[c.model_dump() for c in candidates])
+    except Exception as e:
+        return CandidateSearchResponse(candidates=[], error=str(e))
+
+
 @app.post("/v1/rag/query", response_model=RagQueryResponse)
 def rag_query(request: RagQueryRequest, auth: AuthContext = Depends(get_auth)):
     """
-    对私有索引做 RAG 查询：仅使用已构建的命名空间索引，数据不离开本地。V1 需鉴权与配额。
+    对私有索引做 RAG 查询：仅使用已构建的命名空间索引，数据不离开本地。V1 需鉴权与配额；问题超出档位 token 预算时截断或返回 413。
     """
+    (query,) = _fit_input_budget(auth.tier, request.query)
     if not consume(auth.user_id, auth.tier, RESOURCE_RAG):
         raise _quota_exceeded_response()
     try:
         from tatha.retrieval import get_query_engine
         engine = get_query_engine(namespace=request.namespace)
-        answer = str(engine.query(request.query))
+        answer = str(engine.query(query))
         return RagQueryResponse(answer=answer, namespace=request.namespace)
     except FileNotFoundError:
         return RagQueryResponse(
@@ -4,20 +4,40 @@
 设计原则：不以占位为长期方案。中央大脑需结合 LLM 进化——意图解析、多轮理解、
 编排与反思均可由 LLM 承担，通过改 Prompt 或模型即可迭代；规则仅作无 key 或
 LLM 失败时的回退，保证链路可跑通。
+
+本地意图分类：LLM 意图解析前先做关键词多模式匹配（可选示例句向量最近邻，见 tatha.api.intent_local），
+置信度达到阈值（TATHA_INTENT_LOCAL_THRESHOLD）的消息直接分发，只有判定不了的才升级到 LLM。
+
+合并模式（TATHA_ASK_COMBINED）：需要 LLM 判定意图时，一次结构化输出同时返回意图与简历/诗词/征信解读，
+文档类请求由两次串行 LLM 调用变为一次；合并调用失败时回退「意图解析 → 文档解读」两步路径。
+
+时间预算：ahandle_ask 在请求级截止时间（tatha.core.deadline）内执行，意图解析、职位源、打分与文档解析
+共享同一预算；到期时返回已完成的部分结果（status=partial）或超时说明（status=timeout），不等满各提供方默认超时。
 """
+import asyncio
+import functools
 import json
 import random
 import re
 from typing import Any
 
-from tatha.core.config import use_llm_intent
-from tatha.core.llm import completion as llm_completion
+from tatha.core.config import (
+    ask_combined_enabled,
+    intent_embedding_enabled,
+    intent_local_enabled,
+    intent_local_threshold,
+    use_llm_intent,
+)
+from tatha.core.deadline import DeadlineExceeded, clamp_timeout, deadline_scope, expired
+from tatha.core.llm import acompletion as llm_acompletion
+from tatha.core.ratelimit import llm_priority
+from .intent_local import EmbeddingIntentIndex, KeywordIntentMatcher, LocalIntent
 from .schemas import AskRequest, AskResponse
 
 # 支持的意图（与 LLM 的 system prompt 一致，便于进化）
 INTENTS = ("job_match", "resume_upload", "poetry", "credit", "mbti", "unknown")
 
-# 规则回退：关键词 → 意图（仅当 LLM 未启用或失败时使用）
+# 关键词 → 意图：本地分类第一层，也是 LLM 未启用或失败时的规则回退
 INTENT_KEYWORDS = {
     "job_match": ["匹配", "职位", "找工作", "推荐", "有没有适合", "岗位"],
     "resume_upload": ["上传", "简历", "解析简历"],
@@ -26,6 +46,29 @@ INTENT_KEYWORDS = {
     "mbti": ["人格", "MBTI", "测评", "性格"],
 }
 
+# 关键词之外的正则片段（用非捕获分组），与关键词编译进同一条多分支正则
+INTENT_PATTERNS = {
+    "job_match": [r"(?:找|换|求)(?:个|份)?工作", r"求职", r"招聘", r"适合我的(?:职位|岗位|工作)"],
+    "resume_upload": [r"履历", r"(?<![a-z])(?:cv|resume)(?![a-z])"],
+    "poetry": [r"唐诗", r"宋词", r"诗句", r"诗歌", r"赏析"],
+    "credit": [r"(?:信用|征信)报告", r"逾期", r"信用(?:分|等级|代码)"],
+    "mbti": [r"(?:人格|性格)测试", r"(?:16|十六)型"],
+}
+
+# 示例句最近邻分类用的标注示例（TATHA_INTENT_EMBED 开启时使用），可随线上误判持续补充
+INTENT_EXAMPLES = {
+    "job_match": ["帮我看看有什么工作适合我", "我想换一份后端开发的工作", "最近有哪些数据分析的机会", "根据我的经历推荐几家公司"],
+    "resume_upload": ["这是我的简历，帮我看一下", "帮我提取一下这份履历的关键信息", "我把 CV 发给你", "看看我的工作经历和技能"],
+    "poetry": ["来一句关于月亮的诗", "心情不好，想读点古人的句子", "李白写过哪些送别的作品", "给我讲讲静夜思"],
+    "credit": ["帮我看看这份信用报告", "这家公司的资信情况怎么样", "查一下有没有不良还款记录", "企业信用等级是什么意思"],
+    "mbti": ["我是 INTJ，适合做什么", "帮我分析一下我的性格类型", "内向的人适合什么工作", "做一下十六型人格分析"],
+    "unknown": ["你好", "今天天气怎么样", "你是谁", "谢谢"],
+}
+
+_keyword_matcher = KeywordIntentMatcher(INTENT_KEYWORDS, INTENT_PATTERNS)
+# 示例句向量层加载失败（如本地 embedding 模型不可用）后不再尝试
+_embedding_failed = False
+
 # 诗词推荐时随机注入主题，避免「推荐一句诗」总返回同一首、结果跑空
 POETRY_RECOMMEND_THEMES = ("思乡", "送别", "山水", "边塞", "咏物", "励志", "田园", "怀古")
 
@@ -40,9 +83,9 @@ def _poetry_is_recommendation_query(text: str) -> bool:
     return bool(re.search(r"推荐|来一句|来首|随便.*诗|一句诗", t))
 
 
-def _parse_intent_llm(message: str) -> tuple[str, float, dict[str, Any]] | None:
+async def _parse_intent_llm(message: str) -> tuple[str, float, dict[str, Any]] | None:
     """
-    用 LLM 解析意图（主路径）。返回 (intent, confidence, slots) 或 None（失败时回退）。
+    用 LLM 解析意图（主路径，异步调用：共享连接池 + 超时 + 退避重试）。返回 (intent, confidence, slots) 或 None（失败时回退）。
     通过改 prompt 或模型即可让中央大脑进化，无需改代码逻辑。
     """
     try:
@@ -52,11 +95,14 @@ def _parse_intent_llm(message: str) -> tuple[str, float, dict[str, Any]] | None:
             "\"confidence\"（0 到 1 的浮点数），可选 \"slots\"（对象，如 {\"query\": \"...\"}）。"
             "job_match=求职/职位匹配，resume_upload=上传或解析简历，poetry=诗词/诗人/陪伴，credit=征信/验证，mbti=人格测评。"
         )
-        resp = llm_completion(
+        # intent 任务配置：小输出上限、短超时、temperature=0（分类结果确定，相同消息命中 LLM 响应缓存）
+        resp = await llm_acompletion(
             messages=[
                 {"role": "system", "content": system},
                 {"role": "user", "content": message.strip() or "（无输入）"},
             ],
+            task="intent",
+            priority="high",  # 交互式请求，限流排队时优先于批量打分
         )
         text = (resp.choices[0].message.content or "").strip()
         # 允许被 markdown 代码块包裹
@@ -76,25 +122,129 @@ def _parse_intent_llm(message: str) -> tuple[str, float, dict[str, Any]] | None:
 
 
 def _parse_intent_rules(message: str) -> str:
-    """规则回退：关键词匹配。"""
-    msg = (message or "").strip().lower()
-    for intent, keywords in INTENT_KEYWORDS.items():
-        if any(kw in msg for kw in keywords):
-            return intent
-    return "unknown"
+    """规则回退：关键词多模式匹配（同一位置取更长的关键词，按命中字数计分）。"""
+    return _keyword_matcher.classify((message or "").strip())[0]
 
 
-def parse_intent(message: str) -> tuple[str, float, dict[str, Any]]:
+@functools.cache
+def _embedding_index() -> EmbeddingIntentIndex:
+    def _embed(texts: list[str]):
+        from tatha.retrieval.llama_index_rag import embed_texts
+        return embed_texts(texts)
+
+    return EmbeddingIntentIndex(INTENT_EXAMPLES, _embed)
+
+
+def _classify_embedding(message: str) -> LocalIntent | None:
+    """示例句向量最近邻；未开启或模型不可用时返回 None（首次失败后停用该层）。"""
+    global _embedding_failed
+    if _embedding_failed or not intent_embedding_enabled():
+        return None
+    try:
+        return _embedding_index().classify(message)
+    except Exception:
+        _embedding_failed = True
+        return None
+
+
+def warm_intent_index() -> None:
+    """预先向量化示例句（服务启动时调用），避免首个请求承担模型加载与示例向量化。"""
+    if intent_local_enabled():
+        _classify_embedding("你好")
+
+
+async def _aclassify_local(message: str) -> LocalIntent:
+    """本地分类：先关键词（亚毫秒），不足阈值时再用示例句向量（线程中执行），取置信度更高者。"""
+    msg = (message or "").strip()
+    best = _keyword_matcher.classify(msg)
+    if best[1] >= intent_local_threshold() or not msg or _embedding_failed or not intent_embedding_enabled():
+        return best
+    out = await asyncio.to_thread(_classify_embedding, msg)
+    return out if out is not None and out[1] > best[1] else best
+
+
+# 本地判定不出文档类意图时，消息不短于该字数才走合并模式（多为粘贴的简历/报告/诗文）
+_COMBINED_MIN_CHARS = 200
+
+
+def _looks_like_document(message: str, guess: str) -> bool:
     """
-    解析用户消息得到意图 + 置信度 + 槽位。
-    主路径：LLM（可进化）；回退：规则（保证无 key 时也能跑）。
+    是否值得走合并模式：本地最佳判定为文档类意图且确有可解读的正文，或消息足够长。
+    job_match / mbti / 短句查询仍走意图分类任务（小模型、小输出、短超时），不为其生成随后会丢弃的解读结果。
+    """
+    text = (message or "").strip()
+    if guess == "resume_upload":
+        return bool(text)
+    if guess == "poetry":
+        return bool(text) and not _poetry_is_recommendation_query(text)
+    if guess == "credit":
+        return _credit_has_document_body(text)
+    return len(text) >= _COMBINED_MIN_CHARS
+
+
+async def _parse_intent_combined(message: str) -> tuple[str, float, dict[str, Any], dict[str, Any] | None] | None:
+    """
+    合并模式：一次结构化输出返回 (intent, confidence, slots, extracted)，extracted 为文档类意图的解读结果
+    （其余意图为 None）。仅 PydanticAI 文档解读后端可用；失败时返回 None（回退两步路径）。
+    """
+    from tatha.core.config import document_analysis_backend
+    if document_analysis_backend() != "pydantic_ai" or not (message and message.strip()):
+        return None
+    try:
+        from tatha.agents import arun_intent_document_analysis
+        # 与意图分类一样是交互式请求，限流排队时优先
+        with llm_priority("high"):
+            out = (await arun_intent_document_analysis(message.strip())).result
+    except Exception:
+        return None
+    extracted = out.analysis.model_dump() if hasattr(out, "analysis") else None
+    if extracted is not None and not any(extracted.values()):
+        # 解读结果为空：交给该文档类型的专用智能体再解读一次
+        extracted = None
+    if out.intent == "poetry" and _poetry_is_recommendation_query(message):
+        # 「推荐一句诗」类短句需注入随机主题后再解读，解读结果不复用
+        extracted = None
+    return (out.intent, max(0.0, min(1.0, out.confidence)), out.slots, extracted)
+
+
+async def _aresolve_intent(
+    message: str, combined: bool = False
+) -> tuple[str, float, dict[str, Any], dict[str, Any] | None]:
     """
+    解析意图，返回 (intent, confidence, slots, extracted)。
+    本地分类置信度达到阈值时直接返回（不调用 LLM）；否则走 LLM：combined 且消息像文档（见 _looks_like_document）时
+    为合并调用，一并返回文档解读结果 extracted，其余仍为意图分类调用；LLM 未启用或失败时回退本地最佳判定 / 规则。
+    """
+    local: LocalIntent = ("unknown", 0.0)
+    if intent_local_enabled():
+        local = await _aclassify_local(message)
+        if local[0] != "unknown" and local[1] >= intent_local_threshold():
+            return (local[0], local[1], {}, None)
     if use_llm_intent():
-        out = _parse_intent_llm(message)
+        guess = local[0] if local[0] != "unknown" else _parse_intent_rules(message)
+        if combined and _looks_like_document(message, guess):
+            both = await _parse_intent_combined(message)
+            if both is not None:
+                return both
+        out = await _parse_intent_llm(message)
         if out is not None:
-            return out
-    intent = _parse_intent_rules(message)
-    return (intent, 0.8 if intent != "unknown" else 0.3, {})
+            return (*out, None)
+    intent = local[0] if local[0] != "unknown" else _parse_intent_rules(message)
+    return (intent, 0.8 if intent != "unknown" else 0.3, {}, None)
+
+
+async def aparse_intent(message: str) -> tuple[str, float, dict[str, Any]]:
+    """
+    解析用户消息得到意图 + 置信度 + 槽位。
+    本地分类置信度达到阈值时直接返回（不调用 LLM）；否则走 LLM（可进化）；LLM 未启用或失败时回退本地最佳判定 / 规则。
+    """
+    intent, confidence, slots, _ = await _aresolve_intent(message)
+    return (intent, confidence, slots)
+
+
+def parse_intent(message: str) -> tuple[str, float, dict[str, Any]]:
+    """aparse_intent 的同步包装（脚本等无事件循环的调用方使用）。"""
+    return asyncio.run(aparse_intent(message))
 
 
 def _document_analysis(document_type: str, text: str) -> dict[str, Any] | None:
@@ -110,6 +260,9 @@ def _document_analysis(document_type: str, text: str) -> dict[str, Any] | None:
             data = run_document_analysis(document_type, text)
             return data.model_dump() if data else None
         except Exception:
+            if expired():
+                # 截止时间已到，不再走 Marvin 回退
+                raise DeadlineExceeded("请求截止时间已到")
             backend = "marvin"
     if backend == "marvin":
         _ensure_extractors_loaded()
@@ -123,6 +276,29 @@ def _document_analysis(document_type: str, text: str) -> dict[str, Any] | None:
     return None
 
 
+async def _adocument_analysis(document_type: str, text: str) -> dict[str, Any] | None:
+    """
+    在线程中执行文档解读，最多等待到请求截止时间；到期抛 DeadlineExceeded
+    （线程内的 LLM 调用同样受截止时间约束，随后自行结束）。
+    """
+    timeout = clamp_timeout(None)
+    try:
+        return await asyncio.wait_for(asyncio.to_thread(_document_analysis, document_type, text), timeout=timeout)
+    except asyncio.TimeoutError as e:
+        if expired() and not isinstance(e, DeadlineExceeded):
+            raise DeadlineExceeded("请求截止时间已到") from e
+        raise
+
+
+def _timeout_result(what: str, slots: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "message": f"{what}超时",
+        "status": "timeout",
+        "hint": "请求时间预算已用尽，可稍后重试或通过 X-Request-Timeout 放宽预算（不超过档位上限）",
+        "slots": slots,
+    }
+
+
 def _credit_has_document_body(text: str) -> bool:
     """
     判断是否为「信用报告/文档片段」而非短句查询。
@@ -158,8 +334,18 @@ def _ensure_extractors_loaded() -> None:
     REGISTRY["_loaded"] = True
 
 
-def dispatch(intent: str, request: AskRequest, slots: dict[str, Any] | None = None) -> dict[str, Any]:
-    """按意图分发到内部能力端口，返回 result 字典（能力实现可逐步接入）。"""
+async def adispatch(
+    intent: str,
+    request: AskRequest,
+    slots: dict[str, Any] | None = None,
+    extracted: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """
+    按意图分发到内部能力端口，返回 result 字典（能力实现可逐步接入）。
+    职位匹配直接在事件循环上并发打分；同步的文档解读放到线程中执行，不阻塞事件循环。
+    extracted：合并模式下随意图一并返回的文档解读结果，非 None 时直接采用、不再调用文档解读。
+    请求截止时间到期时：职位匹配返回已完成打分的部分结果（status=partial），文档解读返回 status=timeout。
+    """
     slots = slots or {}
     text = (request.message or "").strip() or (slots.get("text") or slots.get("content") or "")
 
@@ -177,15 +363,25 @@ def dispatch(intent: str, request: AskRequest, slots: dict[str, Any] | None = No
                 "slots": slots,
             }
         try:
-            from tatha.jobs import run_job_match_pipeline
+            from tatha.jobs import arun_job_match_pipeline
             from tatha.core.config import job_top_n
 
-            results, total = run_job_match_pipeline(resume_text=resume_text, top_n=job_top_n())
-            matches = [r.model_dump() for r in results]
+            results, total = await arun_job_match_pipeline(resume_text=resume_text, top_n=job_top_n())
+            if expired():
+                # 截止时间内未完成的打分记为失败分，只返回已完成打分的条目
+                from tatha.jobs.scoring import is_failed_score
+
+                return {
+                    "message": "时间预算已用尽，返回已完成打分的部分匹配结果",
+                    "status": "partial",
+                    "matches": [r.model_dump() for r in results if not is_failed_score(r.score)],
+                    "total_evaluated": total,
+                    "slots": slots,
+                }
             return {
                 "message": "已根据简历完成职位匹配",
                 "status": "ok",
-                "matches": matches,
+                "matches": [r.model_dump() for r in results],
                 "total_evaluated": total,
                 "slots": slots,
             }
@@ -194,10 +390,13 @@ def dispatch(intent: str, request: AskRequest, slots: dict[str, Any] | None = No
     if intent == "resume_upload":
         if text:
             try:
-                extracted = _document_analysis("resume", text)
+                if extracted is None:
+                    extracted = await _adocument_analysis("resume", text)
                 if extracted is not None:
                     return {"message": "已解析简历结构化信息", "status": "ok", "extracted": extracted, "slots": slots}
                 return {"message": "简历解析未返回结果", "status": "pending", "hint": "请检查 .env 中 OPENAI/DEEPSEEK 等 API Key 及 TATHA_DOCUMENT_ANALYSIS_BACKEND", "slots": slots}
+            except DeadlineExceeded:
+                return _timeout_result("简历解析", slots)
             except Exception as e:
                 return {"message": "简历解析失败", "status": "error", "error": str(e), "slots": slots}
         return {"message": "简历上传与解析服务开发中", "status": "pending", "hint": "V0 将接入 MarkItDown + 解析", "slots": slots}
@@ -208,10 +407,13 @@ def dispatch(intent: str, request: AskRequest, slots: dict[str, Any] | None = No
                 theme = random.choice(POETRY_RECOMMEND_THEMES)
                 prompt = f"请推荐一句古诗，主题倾向：{theme}。推荐后请以诗词解析格式返回该诗的标题、作者、朝代、正文与主题。"
             try:
-                extracted = _document_analysis("poetry", prompt)
+                if extracted is None:
+                    extracted = await _adocument_analysis("poetry", prompt)
                 if extracted is not None:
                     return {"message": "已解析诗词相关信息", "status": "ok", "extracted": extracted, "slots": slots}
                 return {"message": "诗词解析未返回结果", "status": "pending", "hint": "请检查 .env 中 API Key 与 TATHA_DOCUMENT_ANALYSIS_BACKEND，或稍后重试", "slots": slots}
+            except DeadlineExceeded:
+                return _timeout_result("诗词解析", slots)
             except Exception as e:
                 return {"message": "诗词解析失败", "status": "error", "error": str(e), "slots": slots}
         return {"message": "诗人/诗词推荐开发中", "status": "pending", "hint": "将接入 poetry-knowledge-base RAG", "slots": slots}
@@ -219,10 +421,13 @@ def dispatch(intent: str, request: AskRequest, slots: dict[str, Any] | None = No
         # 仅当消息像「信用报告/文档片段」时才调用解析；短句查询（如「查一下征信」）视为无正文
         if _credit_has_document_body(text):
             try:
-                extracted = _document_analysis("credit", text)
+                if extracted is None:
+                    extracted = await _adocument_analysis("credit", text)
                 if extracted is not None:
                     return {"message": "已解析征信相关信息", "status": "ok", "extracted": extracted, "slots": slots}
                 return {"message": "征信解析未返回结果", "status": "pending", "hint": "请检查 API Key 与 TATHA_DOCUMENT_ANALYSIS_BACKEND", "slots": slots}
+            except DeadlineExceeded:
+                return _timeout_result("征信解析", slots)
             except Exception as e:
                 return {"message": "征信解析失败", "status": "error", "error": str(e), "slots": slots}
         return {"message": "征信/验证服务开发中", "status": "pending", "hint": "请提供信用报告摘要或主体/报告类型/摘要等文本后再解析", "slots": slots}
@@ -260,12 +465,28 @@ def dispatch(intent: str, request: AskRequest, slots: dict[str, Any] | None = No
     return {"message": "暂未识别到明确意图", "status": "unknown", "received": (request.message or "")[:100]}
 
 
-def handle_ask(request: AskRequest) -> AskResponse:
-    """单入口处理：解析意图（LLM 主路径 + 规则回退）→ 分发 → 统一响应。"""
-    intent, confidence, slots = parse_intent(request.message)
-    result = dispatch(intent, request, slots)
+def dispatch(intent: str, request: AskRequest, slots: dict[str, Any] | None = None) -> dict[str, Any]:
+    """adispatch 的同步包装。"""
+    return asyncio.run(adispatch(intent, request, slots))
+
+
+async def ahandle_ask(request: AskRequest, timeout: float | None = None) -> AskResponse:
+    """
+    单入口处理：解析意图（本地分类 → LLM，合并模式下一并完成文档解读；规则回退）→ 分发 → 统一响应。
+    timeout：整次请求的时间预算（秒），不传则沿用外层截止时间（如有）；到期时 result.deadline_exceeded=true。
+    """
+    with deadline_scope(timeout):
+        intent, confidence, slots, extracted = await _aresolve_intent(request.message, combined=ask_combined_enabled())
+        result = await adispatch(intent, request, slots, extracted=extracted)
+        if expired():
+            result["deadline_exceeded"] = True
     result["confidence"] = confidence
     suggestions = []
     if intent == "unknown":
         suggestions.append("可以说：帮我匹配职位、上传简历、推荐一句诗 等")
     return AskResponse(intent=intent, result=result, suggestions=suggestions)
+
+
+def handle_ask(request: AskRequest, timeout: float | None = None) -> AskResponse:
+    """ahandle_ask 的同步包装。"""
+    return asyncio.run(ahandle_ask(request, timeout))
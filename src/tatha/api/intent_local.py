@@ -0,0 +1,139 @@
+"""
+本地意图分类：在 LLM 意图解析之前先在本地判定，置信度足够时不再调用 LLM，省去一次 LLM 往返。
+
+- KeywordIntentMatcher：所有意图的关键词与正则编译成一条多分支正则，一次扫描得到各意图命中；
+  同一位置优先匹配更长（更具体）的关键词，按命中字数计分，置信度由领先幅度与命中强度决定（亚毫秒级）；
+  紧跟在否定词后的命中（如「不想找工作」）不计分；只命中单个短关键词视为弱信号，不足以单独跳过 LLM。
+- EmbeddingIntentIndex：对带标注的示例句向量化（与检索层同一 embedding 模型），按余弦相似度取最近邻加权投票；
+  示例矩阵首次使用时构建并常驻，模型不可用时该层自动停用。
+两层均不足阈值时由调用方（中央大脑）升级到 LLM。
+"""
+from __future__ import annotations
+
+import re
+import threading
+from typing import Callable, Sequence
+
+import numpy as np
+
+# 本地分类结果：(意图, 置信度 0–1)
+LocalIntent = tuple[str, float]
+
+# 命中字数达到该值、或命中两个不同关键词，视为强信号（如「匹配职位」「上传简历」）；
+# 否则为弱信号（单个短关键词），命中强度按半计，置信度低于 0.8，交由向量层或 LLM 复核
+_STRONG_HITS = 4
+# 命中前紧邻的否定词：该命中不计分（「能不能推荐」中的「不」不在此列）
+_NEGATION = re.compile(r"(?:不想|不要|不用|不需要|无需|别|不再)再?$")
+
+
+class KeywordIntentMatcher:
+    """
+    多模式关键词匹配：keywords 为意图 → 字面关键词，patterns 为意图 → 正则片段（可选）。
+    同分时按 keywords 的声明顺序取先者，与原规则回退一致。
+    """
+
+    def __init__(
+        self,
+        keywords: dict[str, Sequence[str]],
+        patterns: dict[str, Sequence[str]] | None = None,
+    ):
+        self._order = list(dict.fromkeys([*keywords, *(patterns or {})]))
+        alternatives: list[tuple[int, str, str]] = []
+        for intent, words in keywords.items():
+            alternatives.extend((len(w), re.escape(w.lower()), intent) for w in words if w)
+        for intent, regexes in (patterns or {}).items():
+            # 正则片段无法直接得到长度，按去掉元字符后的字面长度排序
+            alternatives.extend((len(re.sub(r"[\\()\[\]?*+|.^$]", "", p)), p, intent) for p in regexes if p)
+        alternatives.sort(key=lambda a: -a[0])
+        # 每个分支一个命名组（g0, g1, …），lastgroup 即命中的分支（正则片段内部的分组不影响编号）
+        self._groups = {f"g{i}": intent for i, (_, _, intent) in enumerate(alternatives)}
+        branches = [f"(?P<g{i}>{pattern})" for i, (_, pattern, _) in enumerate(alternatives)]
+        self._regex = re.compile("|".join(branches)) if branches else None
+
+    def scores(self, message: str) -> dict[str, int]:
+        """各意图命中字数（不重叠扫描，同一位置取更长的分支）。"""
+        return {intent: sum(len(t) for t in terms) for intent, terms in self._hits(message).items()}
+
+    def _hits(self, message: str) -> dict[str, list[str]]:
+        """各意图命中的文本片段（按出现顺序，可重复），跳过紧跟否定词的命中。"""
+        out: dict[str, list[str]] = {}
+        if self._regex is None or not message:
+            return out
+        text = message.lower()
+        for m in self._regex.finditer(text):
+            if _NEGATION.search(text[max(0, m.start() - 4) : m.start()]):
+                continue
+            out.setdefault(self._groups[m.lastgroup], []).append(m.group(0))
+        return out
+
+    def classify(self, message: str) -> LocalIntent:
+        """
+        返回 (意图, 置信度)。无命中为 ("unknown", 0.0)；
+        置信度 = 领先幅度（(第一 - 第二) / 第一）×（0.6 + 0.4 × 命中强度），只命中一个意图且命中足够多时为 1；
+        领先意图只命中单个短关键词（不足 _STRONG_HITS 字）时命中强度减半。
+        """
+        hits = self._hits(message)
+        if not hits:
+            return ("unknown", 0.0)
+        scores = {intent: sum(len(t) for t in terms) for intent, terms in hits.items()}
+        ranked = sorted(scores.items(), key=lambda kv: (-kv[1], self._order.index(kv[0])))
+        intent, first = ranked[0]
+        second = ranked[1][1] if len(ranked) > 1 else 0
+        margin = (first - second) / first
+        strength = min(1.0, first / _STRONG_HITS)
+        if first < _STRONG_HITS and len(set(hits[intent])) < 2:
+            strength /= 2
+        return (intent, round(margin * (0.6 + 0.4 * strength), 4))
+
+
+class EmbeddingIntentIndex:
+    """
+    示例句最近邻分类：examples 为意图 → 示例句，embed 为批量向量化函数（文本列表 → 向量列表）。
+    取与输入最相近的 k 条示例按相似度加权投票；置信度 = 得票占比 × 该意图最高相似度。
+    """
+
+    def __init__(
+        self,
+        examples: dict[str, Sequence[str]],
+        embed: Callable[[list[str]], Sequence[Sequence[float]]],
+        k: int = 3,
+    ):
+        self._labels = [intent for intent, texts in examples.items() for _ in texts]
+        self._texts = [t for texts in examples.values() for t in texts]
+        self._embed = embed
+        self._k = max(1, k)
+        self._matrix: np.ndarray | None = None
+        self._lock = threading.Lock()
+
+    def _normalize(self, vectors: Sequence[Sequence[float]]) -> np.ndarray:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1.0, norms)
+
+    def warm(self) -> None:
+        """向量化全部示例句（仅一次）；并发首次调用只构建一次。"""
+        if self._matrix is not None:
+            return
+        with self._lock:
+            if self._matrix is None:
+                self._matrix = self._normalize(self._embed(self._texts))
+
+    def classify(self, message: str) -> LocalIntent:
+        if not (message and message.strip()) or not self._texts:
+            return ("unknown", 0.0)
+        self.warm()
+        query = self._normalize(self._embed([message.strip()]))[0]
+        sims = self._matrix @ query
+        k = min(self._k, sims.shape[0])
+        top = np.argpartition(-sims, k - 1)[:k]
+        votes: dict[str, float] = {}
+        best: dict[str, float] = {}
+        for i in top:
+            label, sim = self._labels[i], max(0.0, float(sims[i]))
+            votes[label] = votes.get(label, 0.0) + sim
+            best[label] = max(best.get(label, 0.0), sim)
+        total = sum(votes.values())
+        if total <= 0:
+            return ("unknown", 0.0)
+        intent = max(votes, key=votes.get)
+        return (intent, round(votes[intent] / total * best[intent], 4))
@@ -8,6 +8,8 @@ from datetime import datetime, timezone
 from threading import Lock
 from typing import Literal
 
+from tatha.core.config import ask_deadline, job_score_mode
+
 from .auth import Tier
 
 # 资源名，与 API 对应
@@ -15,6 +17,8 @@ RESOURCE_JOB_MATCH = "job_match"
 RESOURCE_ASK = "ask"
 RESOURCE_RESUME_PARSE = "resume_parse"
 RESOURCE_RAG = "rag"
+RESOURCE_JOB_MATCH_BULK = "job_match_bulk"
+RESOURCE_CANDIDATE_SEARCH = "candidate_search"
 
 # 各档位每日上限（与认证订阅与档位设计一致）；pro 用大数表示「高/不限」
 QUOTA_LIMITS: dict[Tier, dict[str, int]] = {
@@ -23,18 +27,24 @@ QUOTA_LIMITS: dict[Tier, dict[str, int]] = {
         RESOURCE_ASK: 1,
         RESOURCE_RESUME_PARSE: 1,
         RESOURCE_RAG: 0,
+        RESOURCE_JOB_MATCH_BULK: 0,
+        RESOURCE_CANDIDATE_SEARCH: 0,
     },
     "basic": {
         RESOURCE_JOB_MATCH: 20,
         RESOURCE_ASK: 15,
         RESOURCE_RESUME_PARSE: 5,
         RESOURCE_RAG: 10,
+        RESOURCE_JOB_MATCH_BULK: 2,
+        RESOURCE_CANDIDATE_SEARCH: 10,
     },
     "pro": {
         RESOURCE_JOB_MATCH: 9999,
         RESOURCE_ASK: 9999,
         RESOURCE_RESUME_PARSE: 9999,
         RESOURCE_RAG: 9999,
+        RESOURCE_JOB_MATCH_BULK: 9999,
+        RESOURCE_CANDIDATE_SEARCH: 9999,
     },
 }
 
@@ -83,7 +93,35 @@ def consume(user_id: str, tier: Tier, resource: str) -> bool:
     return True
 
 
+def refund(user_id: str, resource: str) -> None:
+    """退还 1 次已扣减的配额（扣减后业务未能受理时调用，如异步任务排队已满）。"""
+    key = _storage_key(user_id, resource)
+    with _lock:
+        if _memory.get(key, 0) > 0:
+            _memory[key] -= 1
+
+
 def clamp_top_n(tier: Tier, requested: int) -> int:
     """按档位限制 top_n，返回允许的最大值。"""
     max_n = TOP_N_LIMIT.get(tier, TOP_N_LIMIT["free"])
     return min(max(requested, 1), max_n)
+
+
+# 打分模式的成本档次：fast 无 LLM；llm 与 hybrid（LLM 失败时回退 fast）成本相同
+_SCORE_MODE_COST = {"fast": 0, "llm": 1, "hybrid": 1}
+
+
+def clamp_score_mode(tier: Tier, requested: str | None) -> str:
+    """按档位限制打分模式：未指定时取档位配置（job_score_mode），指定的模式成本高于档位配置时回落到档位配置。"""
+    allowed = job_score_mode(tier)
+    if not requested or _SCORE_MODE_COST.get(requested, 2) > _SCORE_MODE_COST[allowed]:
+        return allowed
+    return requested
+
+
+def clamp_deadline(tier: Tier, requested: float | None) -> float:
+    """按档位限制请求时间预算（秒）：未指定或无效时取档位默认，指定时不超过档位上限。"""
+    cap = ask_deadline(tier)
+    if requested is None or not requested > 0:
+        return cap
+    return min(requested, cap)
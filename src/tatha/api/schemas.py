@@ -2,7 +2,7 @@
 单入口 /v1/ask 的请求与响应模型。
 """
 from pydantic import BaseModel, Field
-from typing import Any, Optional
+from typing import Any, Literal, Optional
 
 
 class AskRequest(BaseModel):
@@ -44,7 +44,12 @@ class JobMatchRequest(BaseModel):
     """POST /v1/jobs/match 请求（也可通过 /v1/ask 的 job_match 意图触发）。"""
     resume_text: str = Field(..., description="简历全文或摘要")
     top_n: Optional[int] = Field(5, ge=1, le=20, description="返回前 N 条匹配")
-    source: Optional[str] = Field(None, description="职位源：mock | apify_linkedin，不传用配置")
+    source: Optional[str] = Field(None, description="职位源：mock | apify_linkedin | 逗号分隔多个或 all，不传用配置")
+    keywords: Optional[str] = Field(None, description="可选：职位关键词（空格分隔），启用职位目录时用于检索")
+    location: Optional[str] = Field(None, description="可选：期望工作地点，启用职位目录时用于过滤")
+    mode: Optional[Literal["fast", "llm", "hybrid"]] = Field(
+        None, description="打分模式：fast（本地，无 LLM）| llm | hybrid（LLM 失败回退 fast），不传按档位配置，且不超出档位配置的成本"
+    )
 
 
 class JobMatchResponse(BaseModel):
@@ -55,6 +60,46 @@ class JobMatchResponse(BaseModel):
     error: Optional[str] = None
 
 
+class MatchTaskSubmitResponse(BaseModel):
+    """POST /v1/jobs/match/async 响应：任务 ID，用 GET /v1/jobs/match/{task_id} 轮询。"""
+    task_id: str = Field(..., description="任务 ID")
+    status: str = Field("queued", description="任务状态")
+
+
+class BulkResume(BaseModel):
+    """批量匹配中的一份简历。"""
+    id: str = Field(..., description="简历标识（候选人 ID 或文件名）")
+    text: str = Field(..., description="简历全文或摘要")
+
+
+class BulkMatchRequest(BaseModel):
+    """POST /v1/jobs/match/bulk 请求：多份简历 × 职位，每个职位取向量最相近的 top_k 份简历打分。"""
+    resumes: list[BulkResume] = Field(..., min_length=1, max_length=500, description="简历列表")
+    jobs: Optional[list[dict[str, Any]]] = Field(
+        None, description="职位列表（JobInfo 结构）；不传则按 source/keywords/location 从职位源或职位目录获取"
+    )
+    source: Optional[str] = Field(None, description="职位源，jobs 未传时使用")
+    keywords: Optional[str] = Field(None, description="可选：职位关键词，启用职位目录时用于检索")
+    location: Optional[str] = Field(None, description="可选：工作地点，启用职位目录时用于过滤")
+    top_k: int = Field(5, ge=1, le=50, description="每个职位进入打分的候选简历数")
+    mode: Optional[Literal["fast", "llm", "hybrid"]] = Field(None, description="打分模式，同 /v1/jobs/match")
+
+
+class CandidateSearchRequest(BaseModel):
+    """POST /v1/jobs/candidates 请求：以职位检索简历索引中最相近的候选人。"""
+    job: Optional[dict[str, Any]] = Field(None, description="职位（JobInfo 结构）；与 job_description 二选一")
+    job_description: Optional[str] = Field(None, description="职位描述全文")
+    top_k: int = Field(10, ge=1, le=50, description="返回候选人数")
+    rescore: bool = Field(False, description="是否对检索出的候选人再打分并按综合分排序")
+    mode: Optional[Literal["fast", "llm", "hybrid"]] = Field(None, description="rescore 时的打分模式，同 /v1/jobs/match")
+
+
+class CandidateSearchResponse(BaseModel):
+    """POST /v1/jobs/candidates 响应。"""
+    candidates: list[dict[str, Any]] = Field(default_factory=list, description="排序后的候选人列表")
+    error: Optional[str] = None
+
+
 class AuthLoginRequest(BaseModel):
     """POST /v1/auth/login 请求（Web 端登录测试用）。"""
     email: str = Field(..., description="邮箱")
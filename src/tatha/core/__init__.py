@@ -8,8 +8,16 @@ from .config import (
     document_analysis_backend,
     embed_model_type,
 )
-from .llm import completion, ask_ai
-from .tokens import count_tokens, estimate_input_cost
+from .llm import completion, ask_ai, acompletion, ask_ai_async
+from .tokens import (
+    chunk_tokens,
+    count_tokens,
+    count_tokens_many,
+    estimate_input_cost,
+    estimate_tokens_fast,
+    fit_token_budget,
+    truncate_tokens,
+)
 
 __all__ = [
     "use_llm_intent",
@@ -20,6 +28,13 @@ __all__ = [
     "embed_model_type",
     "completion",
     "ask_ai",
+    "acompletion",
+    "ask_ai_async",
     "count_tokens",
+    "count_tokens_many",
+    "estimate_tokens_fast",
+    "fit_token_budget",
+    "truncate_tokens",
+    "chunk_tokens",
     "estimate_input_cost",
 ]
@@ -2,6 +2,7 @@
 配置：从环境变量读取，供中央大脑与各能力模块使用。
 """
 import os
+from dataclasses import dataclass
 from pathlib import Path
 
 # 可选加载 .env（若存在）：先项目根（与 pyproject.toml 同层），再当前工作目录
@@ -18,21 +19,322 @@ for _p in _env_paths:
         except Exception:
             pass
 
-# 中央大脑：是否用 LLM 做意图解析（有任一 key 且为 true 时走 LLM，否则规则回退）
-def use_llm_intent() -> bool:
-    key = (
+def has_llm_api_key() -> bool:
+    """是否配置了任一 LLM 提供方的 API Key。"""
+    return bool(
         os.getenv("OPENAI_API_KEY")
         or os.getenv("ANTHROPIC_API_KEY")
         or os.getenv("DEEPSEEK_API_KEY")
     )
+
+
+# 中央大脑：是否用 LLM 做意图解析（有任一 key 且为 true 时走 LLM，否则规则回退）
+def use_llm_intent() -> bool:
     use = os.getenv("TATHA_USE_LLM_INTENT", "true").lower() in ("true", "1", "yes")
-    return bool(key) and use
+    return has_llm_api_key() and use
+
+
+def intent_local_enabled() -> bool:
+    """LLM 意图解析前是否先做本地分类（关键词 / 示例句向量），默认开启；关闭时每次都调用 LLM。"""
+    return os.getenv("TATHA_INTENT_LOCAL", "true").lower() in ("true", "1", "yes")
+
+
+def intent_local_threshold() -> float:
+    """本地意图分类置信度不低于该值时直接采用、不再调用 LLM，默认 0.85。"""
+    try:
+        return min(1.0, max(0.0, float(os.getenv("TATHA_INTENT_LOCAL_THRESHOLD", "0.85"))))
+    except ValueError:
+        return 0.85
+
+
+def intent_embedding_enabled() -> bool:
+    """关键词不足以判定时是否再用示例句向量最近邻分类（TATHA_EMBED_MODEL，首次使用需加载模型），默认关闭。"""
+    return os.getenv("TATHA_INTENT_EMBED", "false").lower() in ("true", "1", "yes")
+
+
+def ask_combined_enabled() -> bool:
+    """
+    /v1/ask 合并模式：需要 LLM 判定意图时，一次结构化输出同时返回意图与简历/诗词/征信解读，
+    省去随后的文档解读调用；失败时回退两步路径。默认开启（仅 PydanticAI 文档解读后端生效）。
+    """
+    return os.getenv("TATHA_ASK_COMBINED", "true").lower() in ("true", "1", "yes")
 
 
 def get_default_model() -> str:
     return os.getenv("TATHA_DEFAULT_MODEL", "openai/gpt-4o")
 
 
+def llm_timeout() -> float:
+    """单次 LLM 请求超时（秒），默认 60；异步调用路径（acompletion）使用。"""
+    try:
+        return max(1.0, float(os.getenv("TATHA_LLM_TIMEOUT", "60")))
+    except ValueError:
+        return 60.0
+
+
+def llm_max_retries() -> int:
+    """LLM 调用遇限流/超时/5xx 等可重试错误时的最多重试次数，默认 2（0 关闭重试）。"""
+    try:
+        return max(0, min(10, int(os.getenv("TATHA_LLM_MAX_RETRIES", "2"))))
+    except ValueError:
+        return 2
+
+
+def llm_backoff() -> tuple[float, float]:
+    """重试退避（秒）：(基数, 上限)，第 n 次重试等待 uniform(0, min(上限, 基数 × 2^n))，默认 (0.5, 8)。"""
+    try:
+        base = max(0.0, float(os.getenv("TATHA_LLM_BACKOFF_BASE", "0.5")))
+        cap = max(base, float(os.getenv("TATHA_LLM_BACKOFF_MAX", "8")))
+        return base, cap
+    except ValueError:
+        return 0.5, 8.0
+
+
+def llm_http_max_connections() -> int:
+    """异步 LLM 调用共享 HTTP 连接池的最大连接数，默认 100（其中保活连接最多 20）。"""
+    try:
+        return max(1, int(os.getenv("TATHA_LLM_MAX_CONNECTIONS", "100")))
+    except ValueError:
+        return 100
+
+
+# 按任务的模型配置：任务 → (默认输出 token 上限, 默认温度, 默认超时秒数)；超时为 None 时取该任务既有的超时配置
+MODEL_TASKS: dict[str, tuple[int, float, float | None]] = {
+    "intent": (200, 0.0, 15.0),
+    # 合并模式：一次调用同时返回意图与文档解读（见 ask_combined_enabled）
+    "intent_document": (1500, 0.0, 60.0),
+    "resume": (1500, 0.0, 60.0),
+    "poetry": (1000, 0.7, 45.0),
+    "credit": (1000, 0.0, 45.0),
+    "job_scoring": (600, 0.0, None),
+    "rag": (1000, 0.2, 60.0),
+}
+
+
+@dataclass(frozen=True)
+class ModelProfile:
+    """单个任务的模型、输出 token 上限、温度与超时；model 为 None 时用 TATHA_DEFAULT_MODEL（或 TATHA_MODEL_ROUTE 路由）。"""
+
+    task: str
+    model: str | None
+    max_tokens: int
+    temperature: float
+    timeout: float
+
+    @property
+    def model_name(self) -> str:
+        """实际使用的模型名（用于缓存键、token 计数等）。"""
+        return self.model or get_default_model()
+
+    def completion_kwargs(self) -> dict:
+        """LiteLLM completion 的生成参数。"""
+        return {"max_tokens": self.max_tokens, "temperature": self.temperature}
+
+    def agent_settings(self) -> dict:
+        """PydanticAI Agent 的 model_settings。"""
+        settings: dict = {"max_tokens": self.max_tokens, "temperature": self.temperature, "timeout": self.timeout}
+        if self.temperature == 0:
+            # pydantic_ai_litellm 不透传为假值的 temperature，0 经 extra_body 写入请求体
+            settings["extra_body"] = {"temperature": 0}
+        return settings
+
+
+def model_profile(task: str) -> ModelProfile:
+    """
+    任务模型配置，任务取值见 MODEL_TASKS。环境变量（<TASK> 为任务名大写）：
+    TATHA_MODEL_<TASK>、TATHA_MAX_TOKENS_<TASK>、TATHA_TEMPERATURE_<TASK>、TATHA_TIMEOUT_<TASK>，
+    如 TATHA_MODEL_INTENT=deepseek/deepseek-chat、TATHA_MAX_TOKENS_INTENT=100。
+    """
+    if task not in MODEL_TASKS:
+        raise ValueError(f"未知模型任务: {task}（可选 {', '.join(MODEL_TASKS)}）")
+    max_tokens, temperature, timeout = MODEL_TASKS[task]
+    suffix = task.upper()
+    if timeout is None:
+        timeout = job_score_timeout()
+    try:
+        max_tokens = max(1, int(os.getenv(f"TATHA_MAX_TOKENS_{suffix}", str(max_tokens))))
+    except ValueError:
+        pass
+    try:
+        temperature = max(0.0, min(2.0, float(os.getenv(f"TATHA_TEMPERATURE_{suffix}", str(temperature)))))
+    except ValueError:
+        pass
+    try:
+        timeout = max(1.0, float(os.getenv(f"TATHA_TIMEOUT_{suffix}", str(timeout))))
+    except ValueError:
+        pass
+    return ModelProfile(
+        task=task,
+        model=(os.getenv(f"TATHA_MODEL_{suffix}") or "").strip() or None,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        timeout=timeout,
+    )
+
+
+def model_route() -> list[str]:
+    """
+    多提供方路由的候选模型（LiteLLM 格式，按优先顺序逗号分隔），如
+    TATHA_MODEL_ROUTE=deepseek/deepseek-chat,openai/gpt-4o-mini；少于两个时不启用路由。
+    """
+    return [m.strip() for m in (os.getenv("TATHA_MODEL_ROUTE") or "").split(",") if m.strip()]
+
+
+def model_hedge_enabled() -> bool:
+    """路由时是否对慢请求向下一候选发对冲请求，默认开启。"""
+    return os.getenv("TATHA_MODEL_HEDGE", "true").lower() in ("true", "1", "yes")
+
+
+def model_hedge_percentile() -> float:
+    """对冲阈值取首选模型近期延迟的分位数（0–100），默认 95。"""
+    try:
+        return max(50.0, min(99.9, float(os.getenv("TATHA_MODEL_HEDGE_PERCENTILE", "95"))))
+    except ValueError:
+        return 95.0
+
+
+def model_hedge_delay() -> float:
+    """延迟样本不足时的对冲阈值（秒），默认 2。"""
+    try:
+        return max(0.0, float(os.getenv("TATHA_MODEL_HEDGE_DELAY", "2")))
+    except ValueError:
+        return 2.0
+
+
+def model_breaker_failures() -> int:
+    """连续失败多少次后熔断该模型，默认 5。"""
+    try:
+        return max(1, int(os.getenv("TATHA_MODEL_BREAKER_FAILURES", "5")))
+    except ValueError:
+        return 5
+
+
+def model_breaker_cooldown() -> float:
+    """熔断持续时间（秒），到期后半开试探，默认 30。"""
+    try:
+        return max(0.0, float(os.getenv("TATHA_MODEL_BREAKER_COOLDOWN", "30")))
+    except ValueError:
+        return 30.0
+
+
+def _rpm_tpm(raw: str) -> tuple[int, int]:
+    rpm, _, tpm = raw.partition(":")
+    return max(0, int(rpm or 0)), max(0, int(tpm or 0))
+
+
+def llm_rate_limits() -> dict[str, tuple[int, int]]:
+    """
+    按提供方/模型的限流额度：TATHA_LLM_RATE_LIMITS="deepseek=300:1000000,openai/gpt-4o=500:30000"，
+    值为 每分钟请求数:每分钟 token 数（0 不限）；格式错误的项忽略。
+    """
+    out: dict[str, tuple[int, int]] = {}
+    for item in (os.getenv("TATHA_LLM_RATE_LIMITS") or "").split(","):
+        key, _, value = item.partition("=")
+        if not key.strip() or not value.strip():
+            continue
+        try:
+            out[key.strip().lower()] = _rpm_tpm(value.strip())
+        except ValueError:
+            continue
+    return out
+
+
+def llm_default_rate_limit() -> tuple[int, int]:
+    """未在 TATHA_LLM_RATE_LIMITS 中列出的模型的 (RPM, TPM)，来自 TATHA_LLM_RPM / TATHA_LLM_TPM，默认 0（不限流）。"""
+    try:
+        return _rpm_tpm(f"{os.getenv('TATHA_LLM_RPM', '0')}:{os.getenv('TATHA_LLM_TPM', '0')}")
+    except ValueError:
+        return 0, 0
+
+
+def llm_rate_max_wait() -> float:
+    """限流排队最长等待（秒），超过则放弃本次调用，默认 30。"""
+    try:
+        return max(0.0, float(os.getenv("TATHA_LLM_RATE_MAX_WAIT", "30")))
+    except ValueError:
+        return 30.0
+
+
+def llm_coalesce_enabled() -> bool:
+    """是否合并并发的相同 LLM 调用（单飞：同模型 + 同消息 + 同参数只发一次上游请求），默认开启。"""
+    return os.getenv("TATHA_LLM_COALESCE", "true").lower() in ("true", "1", "yes")
+
+
+def llm_cache_enabled() -> bool:
+    """是否启用 LLM 响应精确匹配缓存（默认开启；仅 temperature=0 或显式 cache=True 的调用会读写）。"""
+    return os.getenv("TATHA_LLM_CACHE", "true").lower() in ("true", "1", "yes")
+
+
+def llm_cache_ttl() -> float:
+    """LLM 响应缓存有效期（秒），默认 1 天。"""
+    try:
+        return max(0.0, float(os.getenv("TATHA_LLM_CACHE_TTL", str(24 * 3600))))
+    except ValueError:
+        return 24 * 3600.0
+
+
+def llm_cache_max_entries() -> int:
+    """LLM 响应缓存内存层（LRU）最多条数，默认 1000。"""
+    try:
+        return max(1, int(os.getenv("TATHA_LLM_CACHE_MAX", "1000")))
+    except ValueError:
+        return 1000
+
+
+def llm_cache_disk_enabled() -> bool:
+    """是否启用 LLM 响应缓存的磁盘层（SQLite，位于 TATHA_CACHE_DIR，跨进程/重启复用），默认关闭。"""
+    return os.getenv("TATHA_LLM_CACHE_DISK", "false").lower() in ("true", "1", "yes")
+
+
+def llm_cache_disk_max_entries() -> int:
+    """LLM 响应缓存磁盘层最多条数，超出按最久未访问淘汰，默认 10000。"""
+    try:
+        return max(1, int(os.getenv("TATHA_LLM_CACHE_DISK_MAX", "10000")))
+    except ValueError:
+        return 10000
+
+
+# /v1/ask 请求级截止时间默认值（秒），按档位
+ASK_DEADLINE_DEFAULTS = {"free": 15.0, "basic": 30.0, "pro": 60.0}
+
+
+def ask_deadline(tier: str | None = None) -> float:
+    """
+    /v1/ask 整次请求的时间预算（秒），意图解析、职位源、打分与文档解析的各次调用共享该预算。
+    TATHA_ASK_DEADLINE_<TIER> 优先于 TATHA_ASK_DEADLINE，默认 free 15 / basic 30 / pro 60；
+    请求头 X-Request-Timeout 只能在此之内收紧。
+    """
+    default = ASK_DEADLINE_DEFAULTS.get((tier or "").lower(), ASK_DEADLINE_DEFAULTS["free"])
+    raw = (os.getenv(f"TATHA_ASK_DEADLINE_{tier.upper()}") if tier else None) or os.getenv("TATHA_ASK_DEADLINE")
+    try:
+        return max(1.0, float(raw)) if raw else default
+    except ValueError:
+        return default
+
+
+# 单次请求输入 token 预算默认值，按档位
+INPUT_TOKEN_BUDGET_DEFAULTS = {"free": 8000, "basic": 32000, "pro": 120000}
+
+
+def input_token_budget(tier: str | None = None) -> int:
+    """
+    单次请求用户输入（消息、简历、文档正文、检索问题等）合计的 token 预算，在调用 LLM 之前检查。
+    TATHA_INPUT_TOKEN_BUDGET_<TIER> 优先于 TATHA_INPUT_TOKEN_BUDGET，默认 free 8000 / basic 32000 / pro 120000；0 表示不限。
+    """
+    default = INPUT_TOKEN_BUDGET_DEFAULTS.get((tier or "").lower(), INPUT_TOKEN_BUDGET_DEFAULTS["free"])
+    raw = (os.getenv(f"TATHA_INPUT_TOKEN_BUDGET_{tier.upper()}") if tier else None) or os.getenv("TATHA_INPUT_TOKEN_BUDGET")
+    try:
+        return max(0, int(raw)) if raw else default
+    except ValueError:
+        return default
+
+
+def input_budget_mode() -> str:
+    """输入超出 token 预算时：trim（默认，截断最长的输入）| reject（返回 413，不调用 LLM）。"""
+    mode = (os.getenv("TATHA_INPUT_BUDGET_MODE") or "trim").strip().lower()
+    return mode if mode in ("trim", "reject") else "trim"
+
+
 def get_extractors_schema_path() -> Path | None:
     """提取器/分类器 JSON schema 路径；为空则使用默认示例路径（若存在）。"""
     env_path = os.getenv("TATHA_EXTRACTORS_SCHEMA")
@@ -58,10 +360,30 @@ def embed_model_type() -> str:
 
 
 def job_source_id() -> str:
-    """职位源：mock（默认，无需 Key）| apify_linkedin（需 APIFY_API_KEY）。"""
+    """
+    职位源：mock（默认，无需 Key）| apify_linkedin（需 APIFY_API_KEY）；
+    多个源逗号分隔（如 mock,apify_linkedin）或 all 表示并发拉取并合并去重。
+    """
     return (os.getenv("TATHA_JOB_SOURCE") or "mock").strip().lower()
 
 
+def job_source_timeout(source_id: str) -> float:
+    """组合职位源中单个源的拉取超时（秒）：TATHA_JOB_SOURCE_TIMEOUT_<SOURCE> 优先，其次 TATHA_JOB_SOURCE_TIMEOUT，默认 20。"""
+    raw = os.getenv(f"TATHA_JOB_SOURCE_TIMEOUT_{source_id.upper()}") or os.getenv("TATHA_JOB_SOURCE_TIMEOUT", "20")
+    try:
+        return max(0.1, float(raw))
+    except ValueError:
+        return 20.0
+
+
+def job_source_cache_ttl() -> float:
+    """职位源结果缓存 TTL（秒），默认 600；0 表示不缓存、每次请求实时拉取。"""
+    try:
+        return max(0.0, float(os.getenv("TATHA_JOB_SOURCE_CACHE_TTL", "600")))
+    except ValueError:
+        return 600.0
+
+
 def job_top_n() -> int:
     """匹配结果返回条数，默认 5。"""
     try:
@@ -70,6 +392,243 @@ def job_top_n() -> int:
         return 5
 
 
+def job_catalog_enabled() -> bool:
+    """是否从本地职位目录（SQLite FTS5）检索职位，而非每次请求实时调用职位源；默认关闭。"""
+    return os.getenv("TATHA_JOB_CATALOG", "false").lower() in ("true", "1", "yes")
+
+
+def job_catalog_sources() -> list[str]:
+    """定时入库的职位源列表（逗号分隔），默认同 TATHA_JOB_SOURCE。"""
+    raw = os.getenv("TATHA_JOB_CATALOG_SOURCES") or job_source_id()
+    return [s.strip().lower() for s in raw.split(",") if s.strip()]
+
+
+def job_catalog_refresh_interval() -> float:
+    """职位目录各源的刷新间隔（秒），默认 3600；超过间隔的源由后台调度重新入库。"""
+    try:
+        return max(60.0, float(os.getenv("TATHA_JOB_CATALOG_REFRESH", "3600")))
+    except ValueError:
+        return 3600.0
+
+
+def job_catalog_retry_backoff() -> float:
+    """职位源入库失败后的重试退避（秒），默认 600；退避期内调度与请求路径都不再拉取该源。"""
+    try:
+        return max(30.0, float(os.getenv("TATHA_JOB_CATALOG_RETRY_BACKOFF", "600")))
+    except ValueError:
+        return 600.0
+
+
+def job_catalog_max_age() -> float:
+    """职位多久未在任一次入库中出现即从目录清除（秒），默认 14 天。"""
+    try:
+        return max(3600.0, float(os.getenv("TATHA_JOB_CATALOG_MAX_AGE", str(14 * 24 * 3600))))
+    except ValueError:
+        return 14 * 24 * 3600.0
+
+
+def get_job_catalog_path() -> Path:
+    """
+    本地职位目录数据库路径。
+    默认：项目根下的 .data/jobs/catalog.sqlite3；可通过 TATHA_JOB_CATALOG_PATH 覆盖。
+    """
+    env_path = os.getenv("TATHA_JOB_CATALOG_PATH")
+    if env_path:
+        return Path(env_path)
+    return Path(__file__).resolve().parents[3] / ".data" / "jobs" / "catalog.sqlite3"
+
+
+def job_fetch_limit() -> int:
+    """
+    每次从职位源拉取的职位上限（漏斗入口），默认 20（与引入粗筛前一致）；粗筛后只有少量进入 LLM 打分。
+    调大可让粗筛在更大的池子里挑，但按条计费的职位源（如 Apify）单次运行成本随之等比增加。
+    """
+    try:
+        return max(1, min(5000, int(os.getenv("TATHA_JOB_FETCH_LIMIT", "20"))))
+    except ValueError:
+        return 20
+
+
+def job_funnel_stages() -> list[tuple[str, int]]:
+    """
+    LLM 打分前的粗筛漏斗，按顺序执行：TATHA_JOB_FUNNEL=<阶段>:<保留条数>,...
+    默认 embedding:20（向量相似度保留前 20 条进入 LLM）；设为空字符串则不做粗筛。
+    """
+    raw = os.getenv("TATHA_JOB_FUNNEL", "embedding:20")
+    stages: list[tuple[str, int]] = []
+    for part in raw.split(","):
+        name, _, size = part.strip().partition(":")
+        if not name.strip():
+            continue
+        try:
+            stages.append((name.strip().lower(), max(1, int(size or 20))))
+        except ValueError:
+            continue
+    return stages
+
+
+def job_score_concurrency() -> int:
+    """异步流水线同时在途的 LLM 打分请求数上限，默认 5。"""
+    try:
+        return max(1, min(50, int(os.getenv("TATHA_JOB_SCORE_CONCURRENCY", "5"))))
+    except ValueError:
+        return 5
+
+
+def job_score_timeout() -> float:
+    """单条职位 LLM 打分超时（秒），默认 30；超时记为打分失败，不拖慢整体。"""
+    try:
+        return max(1.0, float(os.getenv("TATHA_JOB_SCORE_TIMEOUT", "30")))
+    except ValueError:
+        return 30.0
+
+
+JOB_SCORE_MODES = ("fast", "llm", "hybrid")
+
+
+def job_score_mode(tier: str | None = None) -> str:
+    """
+    职位打分模式：fast（本地确定性打分，无 LLM）| llm（默认）| hybrid（LLM 打分，失败时回退 fast）。
+    TATHA_JOB_SCORE_MODE_<TIER>（如 TATHA_JOB_SCORE_MODE_FREE=fast）优先于 TATHA_JOB_SCORE_MODE；
+    未配置任何 LLM API Key 时一律 fast。
+    """
+    if not has_llm_api_key():
+        return "fast"
+    raw = (os.getenv(f"TATHA_JOB_SCORE_MODE_{tier.upper()}") if tier else None) or os.getenv("TATHA_JOB_SCORE_MODE", "llm")
+    mode = raw.strip().lower()
+    return mode if mode in JOB_SCORE_MODES else "llm"
+
+
+def job_score_batch_enabled() -> bool:
+    """是否启用批量打分（一次 LLM 调用对多条职位打分，简历只发送一次），默认关闭。"""
+    return os.getenv("TATHA_JOB_SCORE_BATCH", "false").lower() in ("true", "1", "yes")
+
+
+def job_batch_max_size() -> int:
+    """批量打分单批最多职位数，默认 8。"""
+    try:
+        return max(1, min(50, int(os.getenv("TATHA_JOB_BATCH_SIZE", "8"))))
+    except ValueError:
+        return 8
+
+
+def resume_max_tokens() -> int:
+    """打分提示词中简历（或画像）的 token 上限，超出按句截断，默认 4000。"""
+    try:
+        return max(200, int(os.getenv("TATHA_RESUME_MAX_TOKENS", "4000")))
+    except ValueError:
+        return 4000
+
+
+def job_description_max_tokens() -> int:
+    """打分提示词中单条职位描述的 token 上限，超出按句截断，默认 1500。"""
+    try:
+        return max(100, int(os.getenv("TATHA_JOB_DESCRIPTION_MAX_TOKENS", "1500")))
+    except ValueError:
+        return 1500
+
+
+def job_source_description_max_tokens() -> int:
+    """职位源入库时单条职位描述的 token 上限（如 Apify），默认 500（约合原 2000 字符英文描述）。"""
+    try:
+        return max(100, int(os.getenv("TATHA_JOB_SOURCE_DESCRIPTION_MAX_TOKENS", "500")))
+    except ValueError:
+        return 500
+
+
+def document_max_tokens() -> int:
+    """文档解读智能体（简历/诗词/征信/简历画像）单次输入的 token 上限，超出按句截断，默认 8000。"""
+    try:
+        return max(500, int(os.getenv("TATHA_DOCUMENT_MAX_TOKENS", "8000")))
+    except ValueError:
+        return 8000
+
+
+def job_batch_token_budget() -> int:
+    """批量打分单次请求的输入 token 预算（简历 + 本批职位描述），默认 12000。"""
+    try:
+        return max(1000, int(os.getenv("TATHA_JOB_BATCH_TOKEN_BUDGET", "12000")))
+    except ValueError:
+        return 12000
+
+
+def job_score_cache_enabled() -> bool:
+    """是否启用简历×职位打分的磁盘缓存（默认开启）。"""
+    return os.getenv("TATHA_JOB_SCORE_CACHE", "true").lower() in ("true", "1", "yes")
+
+
+def job_score_cache_ttl() -> float:
+    """打分缓存有效期（秒），默认 7 天。"""
+    try:
+        return max(0.0, float(os.getenv("TATHA_JOB_SCORE_CACHE_TTL", str(7 * 24 * 3600))))
+    except ValueError:
+        return 7 * 24 * 3600.0
+
+
+def job_score_cache_max_entries() -> int:
+    """打分缓存最多保留条数，超出按最久未访问淘汰，默认 10000。"""
+    try:
+        return max(1, int(os.getenv("TATHA_JOB_SCORE_CACHE_MAX", "10000")))
+    except ValueError:
+        return 10000
+
+
+def match_queue_workers() -> int:
+    """异步匹配任务的进程内 worker 数（同时运行的匹配任务上限），默认 4。"""
+    try:
+        return max(1, min(64, int(os.getenv("TATHA_MATCH_WORKERS", "4"))))
+    except ValueError:
+        return 4
+
+
+def match_queue_max_pending() -> int:
+    """异步匹配任务排队上限，超出时提交返回 503，默认 100。"""
+    try:
+        return max(1, int(os.getenv("TATHA_MATCH_QUEUE_SIZE", "100")))
+    except ValueError:
+        return 100
+
+
+def match_queue_result_ttl() -> float:
+    """异步匹配任务结果保留时长（秒），默认 3600。"""
+    try:
+        return max(60.0, float(os.getenv("TATHA_MATCH_RESULT_TTL", "3600")))
+    except ValueError:
+        return 3600.0
+
+
+def match_queue_backend() -> str:
+    """异步匹配任务状态存储：memory（默认，单进程）| redis（需 REDIS_URL，多进程共享轮询）。"""
+    return (os.getenv("TATHA_MATCH_QUEUE_BACKEND") or "memory").strip().lower()
+
+
+def resume_profile_enabled() -> bool:
+    """
+    LLM 打分前是否先生成简历画像（每份简历一次 LLM 调用，按简历哈希缓存），
+    打分提示词用紧凑画像替代原始简历；默认关闭。
+    """
+    return os.getenv("TATHA_RESUME_PROFILE", "false").lower() in ("true", "1", "yes")
+
+
+def resume_profile_cache_max_entries() -> int:
+    """简历画像缓存最多保留条数，超出按最久未访问淘汰，默认 5000。"""
+    try:
+        return max(1, int(os.getenv("TATHA_RESUME_PROFILE_CACHE_MAX", "5000")))
+    except ValueError:
+        return 5000
+
+
+def get_cache_root() -> Path:
+    """
+    本地缓存根目录（打分缓存等，可随时删除重建，不提交到仓库）。
+    默认：项目根下的 .data/cache；可通过 TATHA_CACHE_DIR 覆盖。
+    """
+    env_path = os.getenv("TATHA_CACHE_DIR")
+    if env_path:
+        return Path(env_path)
+    return Path(__file__).resolve().parents[3] / ".data" / "cache"
+
+
 def get_index_storage_root() -> Path:
     """
     私有索引存储根目录（简历等敏感数据仅存于此，不提交到仓库）。
@@ -0,0 +1,94 @@
+"""
+请求级截止时间（deadline）：一次请求（如 /v1/ask）的总时间预算经 contextvar 向下传递，
+LLM、职位源、检索等下游调用把各自超时收紧到剩余时间，预算耗尽时快速失败，而不是各自等满提供方默认超时。
+
+- deadline_scope(seconds)：在其内设置截止时间（嵌套时取更早者），退出时恢复；其中创建的 Task 与
+  asyncio.to_thread 的工作线程都继承该截止时间。
+- without_deadline()：在其内清除截止时间（供多个请求共享的后台任务）。
+- remaining() / expired()：剩余秒数（未设置时为 None）/ 是否已过期。
+- clamp_timeout(timeout)：把单次调用超时收紧到剩余时间；已过期时抛 DeadlineExceeded。
+- deadline_model(model)：包装 PydanticAI 模型，每次请求按剩余时间收紧 model_settings 的 timeout 并整体限时。
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+_deadline: contextvars.ContextVar[float | None] = contextvars.ContextVar("tatha_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """请求级截止时间已到，不再发起下游调用。"""
+
+
+@contextmanager
+def deadline_scope(seconds: float | None) -> Iterator[None]:
+    """在当前上下文内设置 seconds 秒后的截止时间；seconds 为 None 时沿用外层（如有）。"""
+    if seconds is None:
+        yield
+        return
+    at = time.monotonic() + max(0.0, seconds)
+    outer = _deadline.get()
+    token = _deadline.set(at if outer is None else min(outer, at))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+@contextmanager
+def without_deadline() -> Iterator[None]:
+    """在其内清除截止时间：用于多个请求共享的后台任务（如单飞合并的上游调用），各请求自行按剩余时间等待。"""
+    token = _deadline.set(None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> float | None:
+    """距截止时间的剩余秒数（可能为负）；未设置截止时间时返回 None。"""
+    at = _deadline.get()
+    return None if at is None else at - time.monotonic()
+
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def clamp_timeout(timeout: float | None) -> float | None:
+    """单次调用超时收紧到剩余时间：未设置截止时间时原样返回，已过期时抛 DeadlineExceeded。"""
+    left = remaining()
+    if left is None:
+        return timeout
+    if left <= 0:
+        raise DeadlineExceeded("请求截止时间已到")
+    return left if timeout is None else min(timeout, left)
+
+
+def deadline_model(model: Any) -> Any:
+    """包装 PydanticAI 模型：存在截止时间时，每次请求的 timeout 收紧到剩余时间，超过剩余时间即取消。"""
+    return _deadline_model_cls()(model)
+
+
+@functools.cache
+def _deadline_model_cls() -> type:
+    from pydantic_ai.models.wrapper import WrapperModel
+
+    class DeadlineModel(WrapperModel):
+        async def request(self, messages, model_settings, model_request_parameters):
+            if remaining() is None:
+                return await super().request(messages, model_settings, model_request_parameters)
+            settings = dict(model_settings or {})
+            settings["timeout"] = clamp_timeout(settings.get("timeout"))
+            return await asyncio.wait_for(
+                super().request(messages, settings, model_request_parameters),
+                timeout=settings["timeout"],
+            )
+
+    return DeadlineModel
@@ -4,31 +4,159 @@ LiteLLM 统一多平台模型调用：一套请求逻辑、一套错误处理，
 环境变量（任选其一即可）：OPENAI_API_KEY、ANTHROPIC_API_KEY、DEEPSEEK_API_KEY 等，
 LiteLLM 会自动读取，无需在代码里区分厂商。
 模型名使用 LiteLLM 格式，例如：openai/gpt-4o、anthropic/claude-3-5-sonnet、deepseek/deepseek-chat。
+
+响应缓存：temperature=0（或显式 cache=True）的调用按模型 + 消息 + 参数精确匹配缓存（tatha.core.llm_cache），
+cache=False 单次跳过。
+单飞合并：并发的相同调用（同步或异步）只发一次上游请求，共享结果（tatha.core.singleflight），coalesce=False 单次跳过。
+限流：每次上游请求前按提供方/模型的 RPM/TPM 令牌桶排队（tatha.core.ratelimit），priority 为排队优先级。
+任务配置：传 task（intent / resume / poetry / credit / job_scoring / rag）时按 tatha.core.config.model_profile
+取该任务的模型、max_tokens、temperature 与超时，显式参数优先。
+路由：不指定 model（且任务未指定模型）并配置了 TATHA_MODEL_ROUTE 时，在多个提供方间按健康度路由、对冲慢请求并熔断故障模型（tatha.core.router）。
+截止时间：处于请求级截止时间内（tatha.core.deadline）时，每次上游请求与限流排队的超时都收紧到剩余时间，到期不再重试。
+异步路径（acompletion / ask_ai_async）：不占用工作线程；同一事件循环内复用一个长连接池
+（keep-alive，装有 h2 时启用 HTTP/2），带超时与抖动指数退避重试（TATHA_LLM_* 配置）。
 """
 from __future__ import annotations
 
+import asyncio
+import random
+import threading
+import weakref
 from typing import Any
 
-from tatha.core.config import get_default_model
+from tatha.core.config import (
+    ModelProfile,
+    get_default_model,
+    llm_backoff,
+    llm_coalesce_enabled,
+    llm_http_max_connections,
+    llm_max_retries,
+    llm_timeout,
+    model_profile,
+)
+from tatha.core.deadline import DeadlineExceeded, clamp_timeout, remaining
+from tatha.core.ratelimit import current_priority, estimate_tokens, get_rate_limiter, response_tokens
+from tatha.core.router import get_model_router
+from tatha.core.singleflight import SingleFlight
+
+# 可重试的 HTTP 状态码：超时、冲突、限流与上游 5xx
+RETRYABLE_STATUS = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+# 进程内在途 LLM 调用表（同步与异步共用）
+_flight = SingleFlight()
+
+
+def _cache_lookup(model: str, messages: list[dict[str, str]], kwargs: dict[str, Any], cache: bool | None):
+    """返回 (缓存实例, 键, 命中的响应)；本次调用不走缓存时前两项为 None。"""
+    from tatha.core.llm_cache import get_llm_cache, make_key, should_cache
+
+    store = get_llm_cache() if should_cache(kwargs, cache) else None
+    if store is None:
+        return None, None, None
+    key = make_key(model, messages, kwargs)
+    return store, key, store.get(key)
+
+
+def _flight_key(
+    model: str, messages: list[dict[str, str]], kwargs: dict[str, Any], coalesce: bool | None, priority: str
+) -> str | None:
+    """
+    需合并时返回在途表键（缓存键 + 限流优先级），否则 None；流式调用不合并。
+    优先级入键：高优先级调用不会搭上低优先级的排队；截止时间不入键，由 SingleFlight 让各调用方自行等待。
+    """
+    from tatha.core.llm_cache import make_key
+
+    if kwargs.get("stream"):
+        return None
+    if not (coalesce if coalesce is not None else llm_coalesce_enabled()):
+        return None
+    return f"{make_key(model, messages, kwargs)}|{priority}"
+
+
+def _apply_profile(task: str | None, model: str | None, kwargs: dict[str, Any]) -> tuple[ModelProfile | None, str | None]:
+    """按任务配置补齐模型与生成参数（调用方显式传入的优先），返回 (任务配置, 模型)。"""
+    if not task:
+        return None, model
+    profile = model_profile(task)
+    for k, v in profile.completion_kwargs().items():
+        kwargs.setdefault(k, v)
+    return profile, model or profile.model
 
 
 def completion(
     model: str | None = None,
     messages: list[dict[str, str]] | None = None,
+    cache: bool | None = None,
+    coalesce: bool | None = None,
+    priority: str | None = None,
+    task: str | None = None,
     **kwargs: Any,
 ) -> Any:
     """
     统一 completion 调用：GPT、Claude、DeepSeek 等逻辑完全一致。
-    model: 不传则使用 TATHA_DEFAULT_MODEL。
+    model: 不传则使用 TATHA_DEFAULT_MODEL；配置 TATHA_MODEL_ROUTE 时改为按路由顺序故障转移（同步路径不对冲）。
     messages: [{"role": "user", "content": "..."}] 或含 system 的多轮消息。
-    返回 litellm 的 response，调用方取 response.choices[0].message.content。
+    cache: None 时仅 temperature=0 的调用走响应缓存；True 强制缓存，False 跳过。
+    coalesce: None 时按 TATHA_LLM_COALESCE 合并并发的相同调用；False 单次跳过。
+    priority: 限流排队优先级 high | normal | low，不传则取 llm_priority() 上下文（默认 normal）。
+    task: 任务名，按任务配置补齐模型、max_tokens、temperature 与超时。
+    返回 litellm 的 response，调用方取 response.choices[0].message.content（合并时多方共享同一对象，只读）。
     """
     from litellm import completion as litellm_completion
 
+    profile, model = _apply_profile(task, model, kwargs)
+    if profile is not None:
+        kwargs.setdefault("timeout", profile.timeout)
+    router = None if model else get_model_router()
     model = model or get_default_model()
     if not messages:
         messages = [{"role": "user", "content": ""}]
-    return litellm_completion(model=model, messages=messages, **kwargs)
+    route_key = router.name if router is not None else model
+    # 优先级在此定下：合并后的上游调用可能运行在别的上下文中
+    priority = priority or current_priority()
+    store, key, hit = _cache_lookup(route_key, messages, kwargs, cache)
+    if hit is not None:
+        return hit
+
+    def _call_model(m: str) -> Any:
+        limiter = get_rate_limiter()
+        estimated = estimate_tokens(m, messages, kwargs.get("max_tokens")) if limiter.limited(m) else 0
+        limiter.acquire(m, estimated, priority, max_wait=clamp_timeout(limiter.max_wait))
+        timeout = clamp_timeout(kwargs.get("timeout"))
+        call_kwargs = {**kwargs, "timeout": timeout} if timeout is not None else kwargs
+        resp = litellm_completion(model=m, messages=messages, **call_kwargs)
+        limiter.settle(m, estimated, response_tokens(resp))
+        return resp
+
+    def _call() -> Any:
+        resp = router.call(_call_model) if router is not None else _call_model(model)
+        if store is not None:
+            store.put(key, resp)
+        return resp
+
+    flight_key = _flight_key(route_key, messages, kwargs, coalesce, priority)
+    return _flight.do(flight_key, _call) if flight_key else _call()
+
+
+def agent_model(task: str | None = None) -> Any:
+    """
+    PydanticAI Agent 使用的模型：任务配置指定了模型时用该模型，否则 TATHA_DEFAULT_MODEL；
+    未指定且配置了 TATHA_MODEL_ROUTE 时为在路由各模型间选择、对冲与熔断的路由模型。均经提供方限流，并受请求截止时间约束。
+    生成参数（max_tokens / temperature / 超时）由调用方以 model_profile(task).agent_settings() 传给 Agent。
+    """
+    from pydantic_ai_litellm import LiteLLMModel
+
+    from tatha.core.deadline import deadline_model
+    from tatha.core.ratelimit import rate_limited_model
+    from tatha.core.router import routed_model
+
+    task_model = model_profile(task).model if task else None
+    router = None if task_model else get_model_router()
+    if router is None:
+        return deadline_model(rate_limited_model(LiteLLMModel(model_name=task_model or get_default_model())))
+    return deadline_model(
+        routed_model(router, {m: rate_limited_model(LiteLLMModel(model_name=m)) for m in router.models})
+    )
 
 
 def ask_ai(
@@ -47,3 +175,199 @@ def ask_ai(
     messages.append({"role": "user", "content": prompt or ""})
     resp = completion(model=model, messages=messages, **kwargs)
     return (resp.choices[0].message.content or "").strip()
+
+
+# 共享异步 HTTP 客户端：httpx 连接池绑定创建它的事件循环，按循环各建一个（线程内 asyncio.run 与主循环互不覆盖）
+_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+_http_clients_lock = threading.Lock()
+_litellm_session: Any = None
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+async def _close_with_loop(client: Any) -> None:
+    """随所属事件循环结束关闭客户端：asyncio.run 退出时会取消并等待剩余 Task，finally 中关闭连接池。"""
+    try:
+        await asyncio.Event().wait()
+    finally:
+        if not client.is_closed:
+            await client.aclose()
+
+
+def get_async_http_client() -> Any:
+    """当前事件循环上的共享 httpx.AsyncClient（keep-alive 连接池，可用时 HTTP/2）；循环结束时自动关闭。"""
+    import httpx
+
+    loop = asyncio.get_running_loop()
+    with _http_clients_lock:
+        client = _http_clients.get(loop)
+        if client is not None and not client.is_closed:
+            return client
+        max_conn = llm_http_max_connections()
+        client = httpx.AsyncClient(
+            http2=_http2_available(),
+            limits=httpx.Limits(
+                max_connections=max_conn,
+                max_keepalive_connections=min(20, max_conn),
+                keepalive_expiry=60.0,
+            ),
+            timeout=httpx.Timeout(llm_timeout(), connect=10.0),
+        )
+        _http_clients[loop] = client
+    loop.create_task(_close_with_loop(client))
+    return client
+
+
+def _install_litellm_session() -> None:
+    """
+    一次性把 litellm.aclient_session 设为转发客户端：每次发送交给当前事件循环的 get_async_http_client()。
+    litellm 按参数缓存 AsyncOpenAI（不区分事件循环），转发保证各循环只使用本循环创建的连接池。
+    """
+    global _litellm_session
+    import litellm
+
+    if _litellm_session is not None and litellm.aclient_session is _litellm_session:
+        return
+    with _http_clients_lock:
+        if _litellm_session is None:
+            import httpx
+
+            class _LoopLocalAsyncClient(httpx.AsyncClient):
+                async def send(self, request, **kwargs):
+                    return await get_async_http_client().send(request, **kwargs)
+
+            _litellm_session = _LoopLocalAsyncClient()
+    litellm.aclient_session = _litellm_session
+
+
+async def aclose_http_client() -> None:
+    """关闭当前事件循环的共享客户端（应用关闭时调用）。"""
+    with _http_clients_lock:
+        client = _http_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None and not client.is_closed:
+        await client.aclose()
+
+
+def is_retryable_error(exc: BaseException) -> bool:
+    """限流、超时、连接错误与 5xx 可重试；鉴权、参数错误等直接抛出；请求截止时间已到不重试。"""
+    if isinstance(exc, DeadlineExceeded):
+        return False
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    status = getattr(exc, "status_code", None)
+    if isinstance(status, int):
+        return status in RETRYABLE_STATUS
+    try:
+        import httpx
+        if isinstance(exc, httpx.TransportError):
+            return True
+    except ImportError:
+        pass
+    try:
+        import litellm
+        return isinstance(exc, (litellm.Timeout, litellm.APIConnectionError, litellm.RateLimitError))
+    except (ImportError, AttributeError):
+        return False
+
+
+def backoff_delay(attempt: int, base: float | None = None, cap: float | None = None) -> float:
+    """第 attempt 次重试（从 0 计）前的等待秒数：full jitter，uniform(0, min(cap, base × 2^attempt))。"""
+    if base is None or cap is None:
+        default_base, default_cap = llm_backoff()
+        base = default_base if base is None else base
+        cap = default_cap if cap is None else cap
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+async def acompletion(
+    model: str | None = None,
+    messages: list[dict[str, str]] | None = None,
+    timeout: float | None = None,
+    max_retries: int | None = None,
+    cache: bool | None = None,
+    coalesce: bool | None = None,
+    priority: str | None = None,
+    task: str | None = None,
+    **kwargs: Any,
+) -> Any:
+    """
+    completion 的异步版本：litellm.acompletion + 共享连接池 + 超时 + 抖动退避重试；响应缓存、单飞合并与限流规则同 completion。
+    timeout: 单次尝试超时（秒），不传则取任务配置的超时，再否则 TATHA_LLM_TIMEOUT；处于请求截止时间内时收紧到剩余时间。
+    max_retries: 可重试错误的最多重试次数，不传则 TATHA_LLM_MAX_RETRIES；重试由本函数统一负责，不叠加 SDK 内部重试。
+    """
+    import litellm
+
+    profile, model = _apply_profile(task, model, kwargs)
+    if timeout is None and profile is not None:
+        timeout = profile.timeout
+    router = None if model else get_model_router()
+    model = model or get_default_model()
+    if not messages:
+        messages = [{"role": "user", "content": ""}]
+    route_key = router.name if router is not None else model
+    # 优先级在此定下：合并后的上游调用可能运行在别的上下文中
+    priority = priority or current_priority()
+    store, key, hit = _cache_lookup(route_key, messages, kwargs, cache)
+    if hit is not None:
+        return hit
+    timeout = timeout if timeout is not None else llm_timeout()
+    retries = max_retries if max_retries is not None else llm_max_retries()
+    kwargs.setdefault("max_retries", 0)
+    # OpenAI 兼容提供方（openai / deepseek 等）经 aclient_session 复用当前事件循环的连接池
+    _install_litellm_session()
+
+    async def _call_model(m: str) -> Any:
+        limiter = get_rate_limiter()
+        estimated = estimate_tokens(m, messages, kwargs.get("max_tokens")) if limiter.limited(m) else 0
+        attempt = 0
+        while True:
+            # 每次尝试（含重试）都占用一次请求额度；排队与单次超时均不超过请求截止时间
+            await limiter.aacquire(m, estimated, priority, max_wait=clamp_timeout(limiter.max_wait))
+            attempt_timeout = clamp_timeout(timeout)
+            try:
+                resp = await asyncio.wait_for(
+                    litellm.acompletion(model=m, messages=messages, timeout=attempt_timeout, **kwargs),
+                    timeout=attempt_timeout,
+                )
+            except Exception as e:
+                if attempt >= retries or not is_retryable_error(e):
+                    raise
+                delay = backoff_delay(attempt)
+                left = remaining()
+                if left is not None and delay >= left:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            limiter.settle(m, estimated, response_tokens(resp))
+            return resp
+
+    async def _call() -> Any:
+        resp = await (router.acall(_call_model) if router is not None else _call_model(model))
+        if store is not None:
+            store.put(key, resp)
+        return resp
+
+    flight_key = _flight_key(route_key, messages, kwargs, coalesce, priority)
+    return await (_flight.ado(flight_key, _call) if flight_key else _call())
+
+
+async def ask_ai_async(
+    prompt: str,
+    model: str | None = None,
+    system: str | None = None,
+    **kwargs: Any,
+) -> str:
+    """ask_ai 的异步版本：单轮问答，返回模型回复正文。"""
+    messages: list[dict[str, str]] = []
+    if system:
+        messages.append({"role": "system", "content": system})
+    messages.append({"role": "user", "content": prompt or ""})
+    resp = await acompletion(model=model, messages=messages, **kwargs)
+    return (resp.choices[0].message.content or "").strip()
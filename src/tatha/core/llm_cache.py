@@ -0,0 +1,196 @@
+"""
+LLM 响应精确匹配缓存：同一模型 + 同一消息 + 同一生成参数的确定性调用（temperature=0，如意图分类）
+第二次起直接返回已有响应，不再请求提供方。
+
+- 键 = sha256(模型, 消息, 影响输出的参数)；超时、重试、连接、鉴权等传输参数不参与。
+- 内存层：按最近访问的 LRU，容量 TATHA_LLM_CACHE_MAX；可选磁盘层（SQLite，TATHA_LLM_CACHE_DISK），
+  内存未命中时查磁盘并回填内存。两层共用 TTL（TATHA_LLM_CACHE_TTL）。
+- 响应以 JSON 存储（litellm ModelResponse.model_dump），取出时重建，调用方拿到的是独立对象。
+- 计数：命中（内存/磁盘）、未命中、淘汰、内存层字节数与命中返回的字节数。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from tatha.core.config import (
+    get_cache_root,
+    llm_cache_disk_enabled,
+    llm_cache_disk_max_entries,
+    llm_cache_enabled,
+    llm_cache_max_entries,
+    llm_cache_ttl,
+)
+from tatha.core.sqlite_cache import SqliteLRUCache
+
+# 不影响输出内容的传输/控制参数，不参与缓存键
+_TRANSPORT_KWARGS = frozenset({
+    "timeout", "max_retries", "num_retries", "api_key", "api_base", "base_url", "api_version",
+    "client", "metadata", "headers", "extra_headers", "cache", "coalesce", "priority", "mock_response",
+})
+
+
+def should_cache(kwargs: dict[str, Any], cache: bool | None) -> bool:
+    """是否对本次调用读写缓存：显式 cache 优先；未指定时仅 temperature=0 的非流式调用缓存。"""
+    if kwargs.get("stream"):
+        return False
+    if cache is not None:
+        return cache
+    return kwargs.get("temperature") == 0
+
+
+def make_key(model: str, messages: list[dict[str, Any]], kwargs: dict[str, Any]) -> str:
+    """缓存键：模型 + 消息 + 影响输出的参数，按键排序后序列化再取 sha256。"""
+    params = {k: v for k, v in kwargs.items() if k not in _TRANSPORT_KWARGS}
+    raw = json.dumps(
+        {"model": model, "messages": messages, "params": params},
+        ensure_ascii=False, sort_keys=True, default=str,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def dump_response(resp: Any) -> str | None:
+    """响应序列化为 JSON；不支持 model_dump 的对象（如测试替身）返回 None，不缓存。"""
+    dump = getattr(resp, "model_dump", None)
+    if dump is None:
+        return None
+    try:
+        # litellm 响应的可选字段类型与声明不完全一致，关闭 pydantic 序列化告警
+        return json.dumps(dump(warnings=False), ensure_ascii=False, default=str)
+    except (TypeError, ValueError):
+        return None
+
+
+def load_response(payload: str) -> Any:
+    from litellm import ModelResponse
+
+    return ModelResponse(**json.loads(payload))
+
+
+class _DiskTier(SqliteLRUCache):
+    """SQLite 磁盘层：直接存取响应 JSON（get_raw / put_raw），TTL 与淘汰策略同打分缓存。"""
+
+    table = "llm_responses"
+
+
+class LLMResponseCache:
+    """两层 LLM 响应缓存：内存 LRU（必有）+ SQLite 磁盘层（可选）；线程安全，可在线程池与事件循环中共用。"""
+
+    def __init__(self, max_entries: int, ttl: float, disk_path: Path | str | None = None, disk_max_entries: int = 10000):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.hit_bytes = 0
+        self._bytes = 0
+        self._memory: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = _DiskTier(disk_path, ttl, disk_max_entries) if disk_path else None
+
+    def _remember(self, key: str, payload: str, created_at: float) -> None:
+        """写入内存层（调用方持锁），超出容量淘汰最久未访问条目。"""
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old[0].encode("utf-8"))
+        self._memory[key] = (payload, created_at)
+        self._bytes += len(payload.encode("utf-8"))
+        while len(self._memory) > self.max_entries:
+            _, (evicted, _) = self._memory.popitem(last=False)
+            self._bytes -= len(evicted.encode("utf-8"))
+            self.evictions += 1
+
+    def get_payload(self, key: str) -> str | None:
+        """命中且未过期时返回响应 JSON；先查内存，再查磁盘并回填内存。"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[1] > self.ttl:
+                self._bytes -= len(self._memory.pop(key)[0].encode("utf-8"))
+                entry = None
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                self.memory_hits += 1
+                self.hit_bytes += len(entry[0].encode("utf-8"))
+                return entry[0]
+        found = self._disk.get_raw(key) if self._disk is not None else None
+        with self._lock:
+            if found is None:
+                self.misses += 1
+                return None
+            payload, created_at = found
+            self._remember(key, payload, created_at)
+            self.hits += 1
+            self.disk_hits += 1
+            self.hit_bytes += len(payload.encode("utf-8"))
+        return payload
+
+    def get(self, key: str) -> Any | None:
+        """命中时返回重建的 ModelResponse。"""
+        payload = self.get_payload(key)
+        return load_response(payload) if payload is not None else None
+
+    def put(self, key: str, resp: Any) -> bool:
+        """写入响应；无法序列化时跳过并返回 False。"""
+        payload = dump_response(resp)
+        if payload is None:
+            return False
+        now = time.time()
+        with self._lock:
+            self._remember(key, payload, now)
+        if self._disk is not None:
+            evicted = self._disk.put_raw(key, payload, now)
+            with self._lock:
+                self.evictions += evicted
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._bytes = 0
+        if self._disk is not None:
+            self._disk.clear()
+
+    def stats(self) -> dict[str, int]:
+        """命中（内存/磁盘）/未命中/淘汰计数、内存层条数与字节数、命中返回的字节数、磁盘层条数。"""
+        with self._lock:
+            out = {
+                "hits": self.hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._memory),
+                "bytes": self._bytes,
+                "hit_bytes": self.hit_bytes,
+            }
+        out["disk_entries"] = self._disk.count() if self._disk is not None else 0
+        return out
+
+
+_cache: LLMResponseCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache | None:
+    """进程内单例；TATHA_LLM_CACHE=false 时返回 None。"""
+    global _cache
+    if not llm_cache_enabled():
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMResponseCache(
+                max_entries=llm_cache_max_entries(),
+                ttl=llm_cache_ttl(),
+                disk_path=get_cache_root() / "llm_responses.sqlite3" if llm_cache_disk_enabled() else None,
+                disk_max_entries=llm_cache_disk_max_entries(),
+            )
+    return _cache
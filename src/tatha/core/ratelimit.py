@@ -0,0 +1,290 @@
+"""
+LLM 调用限流：按提供方/模型的令牌桶（每分钟请求数 RPM、每分钟 token 数 TPM），调用前按 tiktoken 估算的
+输入 token（+ max_tokens）取令牌；额度不足时排队等待，超过最长等待时间抛 RateLimitTimeout，
+而不是把请求打到提供方换回一串 429。
+
+- 配置：TATHA_LLM_RATE_LIMITS="deepseek=300:1000000,openai/gpt-4o=500:30000"（键为提供方或 提供方/模型，
+  值为 rpm:tpm，0 表示不限）；未列出的模型用 TATHA_LLM_RPM / TATHA_LLM_TPM（默认 0，即不限流）。
+  以提供方为键时该提供方下所有模型共用一组桶。
+- 排队：同一组桶的等待方按 (优先级, 到达顺序) 出队；high（交互式，如意图解析）先于 normal（在线匹配）先于 low（批量/后台）。
+  优先级可显式传入，也可由调用方用 llm_priority() 为其下所有调用设置。
+- 调用结束后按实际用量（usage）校正 TPM 桶，估算偏差不累积。
+- 同步（time.sleep）与异步（asyncio.sleep）调用方共用同一组桶。
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from tatha.core.config import llm_default_rate_limit, llm_rate_limits, llm_rate_max_wait
+
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+
+_priority: contextvars.ContextVar[str] = contextvars.ContextVar("tatha_llm_priority", default="normal")
+
+
+class RateLimitTimeout(RuntimeError):
+    """在最长等待时间内未取得限流令牌。"""
+
+
+@contextmanager
+def llm_priority(name: str) -> Iterator[None]:
+    """在当前上下文（及其中创建的 Task）内为未显式指定优先级的 LLM 调用设置排队优先级。"""
+    token = _priority.set(name if name in PRIORITIES else "normal")
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> str:
+    return _priority.get()
+
+
+class _Bucket:
+    """每分钟额度的令牌桶：容量 = 每分钟额度，按秒匀速回填。"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_for(self, n: float) -> float:
+        return 0.0 if self.level >= n else (n - self.level) / self.rate
+
+
+class _Limit:
+    """一组桶（RPM + TPM）及其等待队列。"""
+
+    def __init__(self, rpm: int, tpm: int):
+        self.requests = _Bucket(rpm) if rpm > 0 else None
+        self.tokens = _Bucket(tpm) if tpm > 0 else None
+        self.waiters: list[tuple[int, int, float]] = []  # 堆：(优先级, 序号, token 数)
+        self.acquired = 0
+        self.rejected = 0
+        self.waited = 0.0
+
+    def clamp(self, tokens: float) -> float:
+        # 单次估算超过整桶容量时按整桶计，否则永远取不到
+        return min(tokens, self.tokens.capacity) if self.tokens is not None else 0.0
+
+    def wait_for(self, tokens: float) -> float:
+        w = self.requests.wait_for(1) if self.requests is not None else 0.0
+        if self.tokens is not None:
+            w = max(w, self.tokens.wait_for(tokens))
+        return w
+
+
+class RateLimiter:
+    """进程内限流器；线程安全。limits 键为提供方或 提供方/模型，值为 (rpm, tpm)。"""
+
+    def __init__(self, limits: dict[str, tuple[int, int]], default: tuple[int, int] = (0, 0), max_wait: float = 30.0):
+        self.limits = {k.strip().lower(): v for k, v in limits.items()}
+        self.default = default
+        self.max_wait = max_wait
+        self._buckets: dict[str, _Limit] = {}
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def _resolve(self, model: str) -> _Limit | None:
+        """模型 → 桶组：先精确匹配 提供方/模型，再匹配提供方，最后用默认额度（按模型分桶）；均不限时返回 None。"""
+        name = (model or "").strip().lower()
+        provider = name.split("/", 1)[0]
+        for key in (name, provider):
+            if key in self.limits:
+                rpm, tpm = self.limits[key]
+                break
+        else:
+            key, (rpm, tpm) = name, self.default
+        if rpm <= 0 and tpm <= 0:
+            return None
+        with self._lock:
+            if key not in self._buckets:
+                self._buckets[key] = _Limit(rpm, tpm)
+            return self._buckets[key]
+
+    def limited(self, model: str) -> bool:
+        """该模型是否配置了限流（未配置时调用方可跳过 token 估算）。"""
+        return self._resolve(model) is not None
+
+    def _try(self, limit: _Limit, ticket: tuple[int, int, float]) -> float:
+        """轮到本票且额度足够时扣减并返回 0；否则返回建议等待秒数。"""
+        now = time.monotonic()
+        with self._lock:
+            for bucket in (limit.requests, limit.tokens):
+                if bucket is not None:
+                    bucket.refill(now)
+            head = limit.waiters[0]
+            wait = limit.wait_for(head[2])
+            if head != ticket:
+                return max(wait, 0.005)
+            if wait > 0:
+                return wait
+            heapq.heappop(limit.waiters)
+            if limit.requests is not None:
+                limit.requests.level -= 1
+            if limit.tokens is not None:
+                limit.tokens.level -= ticket[2]
+            limit.acquired += 1
+            return 0.0
+
+    def _enqueue(self, limit: _Limit, tokens: float, priority: str | None) -> tuple[int, int, float]:
+        rank = PRIORITIES.get(priority or current_priority(), PRIORITIES["normal"])
+        ticket = (rank, next(self._seq), limit.clamp(tokens))
+        with self._lock:
+            heapq.heappush(limit.waiters, ticket)
+        return ticket
+
+    def _dequeue(self, limit: _Limit, ticket: tuple[int, int, float], waited: float, acquired: bool) -> None:
+        with self._lock:
+            limit.waited += waited
+            if acquired:
+                return
+            limit.rejected += 1
+            if ticket in limit.waiters:
+                limit.waiters.remove(ticket)
+                heapq.heapify(limit.waiters)
+
+    def _timeout(self, model: str, max_wait: float) -> RateLimitTimeout:
+        return RateLimitTimeout(f"{model} 限流排队超过 {max_wait:g}s")
+
+    def acquire(self, model: str, tokens: float = 0, priority: str | None = None, max_wait: float | None = None) -> float:
+        """同步取令牌，返回等待秒数；预计等待超过 max_wait（默认 TATHA_LLM_RATE_MAX_WAIT）时抛 RateLimitTimeout。"""
+        limit = self._resolve(model)
+        if limit is None:
+            return 0.0
+        max_wait = self.max_wait if max_wait is None else max_wait
+        ticket = self._enqueue(limit, tokens, priority)
+        start = time.monotonic()
+        acquired = False
+        try:
+            while True:
+                wait = self._try(limit, ticket)
+                if wait == 0:
+                    acquired = True
+                    return time.monotonic() - start
+                remaining = max_wait - (time.monotonic() - start)
+                if wait > remaining:
+                    raise self._timeout(model, max_wait)
+                time.sleep(wait)
+        finally:
+            self._dequeue(limit, ticket, time.monotonic() - start, acquired)
+
+    async def aacquire(
+        self, model: str, tokens: float = 0, priority: str | None = None, max_wait: float | None = None
+    ) -> float:
+        """异步取令牌，语义同 acquire。"""
+        limit = self._resolve(model)
+        if limit is None:
+            return 0.0
+        max_wait = self.max_wait if max_wait is None else max_wait
+        ticket = self._enqueue(limit, tokens, priority)
+        start = time.monotonic()
+        acquired = False
+        try:
+            while True:
+                wait = self._try(limit, ticket)
+                if wait == 0:
+                    acquired = True
+                    return time.monotonic() - start
+                remaining = max_wait - (time.monotonic() - start)
+                if wait > remaining:
+                    raise self._timeout(model, max_wait)
+                await asyncio.sleep(wait)
+        finally:
+            self._dequeue(limit, ticket, time.monotonic() - start, acquired)
+
+    def settle(self, model: str, estimated: float, actual: float) -> None:
+        """按实际 token 用量校正 TPM 桶：多估的退回，少估的补扣。"""
+        limit = self._resolve(model)
+        if limit is None or limit.tokens is None or actual <= 0:
+            return
+        with self._lock:
+            bucket = limit.tokens
+            bucket.level = min(bucket.capacity, bucket.level + limit.clamp(estimated) - actual)
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """各桶组的剩余额度、排队数、成功/拒绝次数与累计等待秒数。"""
+        with self._lock:
+            return {
+                key: {
+                    "requests_left": round(lim.requests.level, 2) if lim.requests else None,
+                    "tokens_left": round(lim.tokens.level, 2) if lim.tokens else None,
+                    "waiting": len(lim.waiters),
+                    "acquired": lim.acquired,
+                    "rejected": lim.rejected,
+                    "waited_s": round(lim.waited, 3),
+                }
+                for key, lim in self._buckets.items()
+            }
+
+
+_limiter: RateLimiter | None = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """进程内单例，额度见 TATHA_LLM_RATE_LIMITS / TATHA_LLM_RPM / TATHA_LLM_TPM。"""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter(llm_rate_limits(), llm_default_rate_limit(), llm_rate_max_wait())
+    return _limiter
+
+
+def estimate_tokens(model: str, messages: list[dict[str, Any]], max_tokens: int | None = None) -> int:
+    """请求 token 估算：消息正文的 tiktoken 计数 + 输出上限 max_tokens。"""
+    from tatha.core.tokens import count_tokens
+
+    text = "\n".join(str(m.get("content") or "") for m in messages)
+    return count_tokens(text, model_name=model) + int(max_tokens or 0)
+
+
+def response_tokens(resp: Any) -> int:
+    """litellm 响应的实际 token 总量；无 usage 时返回 0（不校正）。"""
+    usage = getattr(resp, "usage", None)
+    return int(getattr(usage, "total_tokens", 0) or 0)
+
+
+def rate_limited_model(model: Any, priority: str | None = None) -> Any:
+    """包装 PydanticAI 模型：每次请求前按消息估算 token 取令牌，返回后按实际用量校正。"""
+    return _rate_limited_model_cls()(model, priority)
+
+
+@functools.cache
+def _rate_limited_model_cls() -> type:
+    from pydantic_ai.models.wrapper import WrapperModel
+
+    class RateLimitedModel(WrapperModel):
+        def __init__(self, wrapped: Any, priority: str | None = None):
+            super().__init__(wrapped)
+            self.priority = priority
+
+        async def request(self, messages, model_settings, model_request_parameters):
+            text = "\n".join(
+                str(getattr(part, "content", "") or "") for message in messages for part in message.parts
+            )
+            limiter = get_rate_limiter()
+            if not limiter.limited(self.model_name):
+                return await super().request(messages, model_settings, model_request_parameters)
+            max_tokens = (model_settings or {}).get("max_tokens") or 0
+            estimated = estimate_tokens(self.model_name, [{"content": text}], max_tokens)
+            await limiter.aacquire(self.model_name, estimated, self.priority)
+            response = await super().request(messages, model_settings, model_request_parameters)
+            usage = response.usage
+            limiter.settle(self.model_name, estimated, (usage.input_tokens or 0) + (usage.output_tokens or 0))
+            return response
+
+    return RateLimitedModel
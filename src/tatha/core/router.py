@@ -0,0 +1,262 @@
+"""
+多提供方模型路由：对 TATHA_MODEL_ROUTE 中按顺序列出的 LiteLLM 模型（如 deepseek、openai、anthropic）
+统计滑动窗口内的延迟与错误率，每次调用路由到当前最健康的模型。
+
+- 对冲（hedging）：首选模型在其延迟 p{TATHA_MODEL_HEDGE_PERCENTILE} 内未返回时，向下一候选再发一份请求，取先成功者，
+  另一份取消；样本不足时以 TATHA_MODEL_HEDGE_DELAY 为对冲阈值。只在异步路径上对冲，同步路径仅顺序故障转移。
+- 故障转移：当前模型报错时立即改用下一候选。
+- 熔断：某模型连续失败 TATHA_MODEL_BREAKER_FAILURES 次后熔断 TATHA_MODEL_BREAKER_COOLDOWN 秒，期间不参与路由；
+  冷却结束后半开，下一次调用成功即恢复、失败则再次熔断。全部熔断时仍按配置顺序尝试，不至于无模型可用。
+- 请求级预算：请求截止时间（tatha.core.deadline）已到导致的失败（DeadlineExceeded、收紧到剩余时间的超时）
+  与限流排队超时（RateLimitTimeout）不计为模型失败，不触发熔断；预算耗尽后不再转移或对冲，直接抛出。
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable
+
+from tatha.core.deadline import DeadlineExceeded, remaining
+from tatha.core.ratelimit import RateLimitTimeout
+from tatha.core.config import (
+    model_breaker_cooldown,
+    model_breaker_failures,
+    model_hedge_delay,
+    model_hedge_enabled,
+    model_hedge_percentile,
+    model_route,
+)
+
+# 延迟分位数至少需要的成功样本数，不足时用固定对冲阈值、排序按配置顺序
+MIN_SAMPLES = 5
+WINDOW = 100
+# 截止时间前该秒数内失败的调用视为被请求预算截断（超时收紧到剩余时间，触发时刻与截止时间基本重合）
+_DEADLINE_SLACK = 0.05
+
+
+class AllModelsFailed(RuntimeError):
+    """路由中所有候选模型均失败。"""
+
+
+def _budget_exhausted() -> bool:
+    """请求截止时间已到（或只剩不足 _DEADLINE_SLACK 秒）。"""
+    left = remaining()
+    return left is not None and left <= _DEADLINE_SLACK
+
+
+def _is_provider_failure(e: BaseException) -> bool:
+    """是否计入模型失败：请求预算耗尽与本地限流排队超时不是提供方的问题。"""
+    return not isinstance(e, (DeadlineExceeded, RateLimitTimeout)) and not _budget_exhausted()
+
+
+class ModelHealth:
+    """单个模型的滑动窗口统计与熔断状态（调用方持路由锁访问）。"""
+
+    def __init__(self, window: int = WINDOW):
+        self.latencies: deque[float] = deque(maxlen=window)
+        self.outcomes: deque[bool] = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+
+    def percentile(self, p: float) -> float | None:
+        if len(self.latencies) < MIN_SAMPLES:
+            return None
+        xs = sorted(self.latencies)
+        return xs[min(len(xs) - 1, int(round((len(xs) - 1) * p / 100)))]
+
+    @property
+    def error_rate(self) -> float:
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+    def is_open(self, now: float) -> bool:
+        return now < self.open_until
+
+
+class ModelRouter:
+    """按健康度排序候选模型并执行（可对冲的）调用；线程安全。"""
+
+    def __init__(
+        self,
+        models: list[str],
+        hedge: bool = True,
+        hedge_percentile: float = 95.0,
+        hedge_delay: float = 2.0,
+        breaker_failures: int = 5,
+        breaker_cooldown: float = 30.0,
+    ):
+        if not models:
+            raise ValueError("路由至少需要一个模型")
+        self.models = list(dict.fromkeys(models))
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_delay = hedge_delay
+        self.breaker_failures = breaker_failures
+        self.breaker_cooldown = breaker_cooldown
+        self.hedges = 0
+        self._health = {m: ModelHealth() for m in self.models}
+        self._lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        """路由标识（用于缓存键等）：route:模型1,模型2,..."""
+        return "route:" + ",".join(self.models)
+
+    def candidates(self) -> list[str]:
+        """可用模型按健康度排序：未熔断优先 → 错误率低 → p50 延迟低（样本不足的排在有数据的之后）→ 配置顺序。"""
+        now = time.monotonic()
+        with self._lock:
+            def _key(item: tuple[int, str]) -> tuple:
+                i, m = item
+                h = self._health[m]
+                p50 = h.percentile(50)
+                return (h.is_open(now), round(h.error_rate, 1), p50 is None, p50 or 0.0, i)
+
+            return [m for _, m in sorted(enumerate(self.models), key=_key)]
+
+    def _hedge_after(self, model: str) -> float:
+        with self._lock:
+            p = self._health[model].percentile(self.hedge_percentile)
+        return p if p is not None else self.hedge_delay
+
+    def record(self, model: str, latency: float | None, ok: bool) -> None:
+        """记录一次调用结果；连续失败达到阈值时熔断。"""
+        with self._lock:
+            h = self._health[model]
+            h.outcomes.append(ok)
+            if ok:
+                h.latencies.append(latency or 0.0)
+                h.consecutive_failures = 0
+                h.open_until = 0.0
+            else:
+                h.consecutive_failures += 1
+                if h.consecutive_failures >= self.breaker_failures:
+                    h.open_until = time.monotonic() + self.breaker_cooldown
+                    h.consecutive_failures = 0
+
+    def call(self, fn: Callable[[str], Any]) -> Any:
+        """同步调用：按候选顺序尝试，失败即转移到下一个。"""
+        errors: list[str] = []
+        for model in self.candidates():
+            start = time.monotonic()
+            try:
+                result = fn(model)
+            except Exception as e:
+                if _is_provider_failure(e):
+                    self.record(model, None, False)
+                if _budget_exhausted():
+                    raise
+                errors.append(f"{model}: {e}")
+                continue
+            self.record(model, time.monotonic() - start, True)
+            return result
+        raise AllModelsFailed("; ".join(errors))
+
+    async def acall(self, fn: Callable[[str], Awaitable[Any]]) -> Any:
+        """
+        异步调用：首选模型超过对冲阈值未返回时向下一候选并发再发一份，取先成功者；
+        任一份失败立即补发下一候选，直至成功或候选耗尽。
+        """
+        queue = self.candidates()
+        running: dict[asyncio.Task, tuple[str, float]] = {}
+        errors: list[str] = []
+
+        def _launch() -> None:
+            model = queue.pop(0)
+            running[asyncio.ensure_future(fn(model))] = (model, time.monotonic())
+
+        _launch()
+        try:
+            while running:
+                timeout = None
+                if self.hedge and queue and len(running) == 1 and not _budget_exhausted():
+                    (model, started), = running.values()
+                    timeout = max(0.0, self._hedge_after(model) - (time.monotonic() - started))
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    if _budget_exhausted():
+                        # 预算已耗尽：不再对冲，等在途请求（其超时已收紧到截止时间）结束
+                        continue
+                    with self._lock:
+                        self.hedges += 1
+                    _launch()
+                    continue
+                for task in done:
+                    model, started = running.pop(task)
+                    if task.exception() is None:
+                        self.record(model, time.monotonic() - started, True)
+                        return task.result()
+                    e = task.exception()
+                    if _is_provider_failure(e):
+                        self.record(model, None, False)
+                    if _budget_exhausted():
+                        raise e
+                    errors.append(f"{model}: {e}")
+                if not running and queue:
+                    _launch()
+        finally:
+            for task in running:
+                task.cancel()
+        raise AllModelsFailed("; ".join(errors))
+
+    def stats(self) -> dict[str, Any]:
+        """各模型样本数、错误率、p50/p95 延迟、是否熔断，以及累计对冲次数。"""
+        now = time.monotonic()
+        with self._lock:
+            models = {
+                m: {
+                    "samples": len(h.outcomes),
+                    "error_rate": round(h.error_rate, 3),
+                    "p50_s": h.percentile(50),
+                    "p95_s": h.percentile(95),
+                    "open": h.is_open(now),
+                }
+                for m, h in self._health.items()
+            }
+        return {"models": models, "hedges": self.hedges}
+
+
+_router: ModelRouter | None = None
+_router_models: tuple[str, ...] = ()
+_router_lock = threading.Lock()
+
+
+def get_model_router() -> ModelRouter | None:
+    """按 TATHA_MODEL_ROUTE 构建的进程内单例；未配置或只有一个模型时返回 None（直接用该模型）。"""
+    global _router, _router_models
+    models = tuple(model_route())
+    if len(models) < 2:
+        return None
+    with _router_lock:
+        if _router is None or _router_models != models:
+            _router = ModelRouter(
+                list(models),
+                hedge=model_hedge_enabled(),
+                hedge_percentile=model_hedge_percentile(),
+                hedge_delay=model_hedge_delay(),
+                breaker_failures=model_breaker_failures(),
+                breaker_cooldown=model_breaker_cooldown(),
+            )
+            _router_models = models
+    return _router
+
+
+def routed_model(router: ModelRouter, models: dict[str, Any]) -> Any:
+    """PydanticAI 路由模型：每次请求经 router.acall 在 models（模型名 → PydanticAI 模型）间选择/对冲/转移。"""
+    from pydantic_ai.models.wrapper import WrapperModel
+
+    class RoutedModel(WrapperModel):
+        def __init__(self) -> None:
+            super().__init__(models[router.models[0]])
+
+        @property
+        def model_name(self) -> str:
+            return router.name
+
+        async def request(self, messages, model_settings, model_request_parameters):
+            return await router.acall(
+                lambda m: models[m].request(messages, model_settings, model_request_parameters)
+            )
+
+    return RoutedModel()
@@ -0,0 +1,138 @@
+"""
+单飞（single-flight）合并：同一键的并发调用只执行一次上游请求，其余调用方等待并共享其结果（或异常）。
+
+- 同步与异步调用方共用一张在途表，在途项为 concurrent.futures.Future：同步方 result() 阻塞等待，
+  异步方经 asyncio.wrap_future 等待，跨线程、跨事件循环均可合并。
+- 异步领头方的上游请求作为独立 Task 运行：领头方自身被取消（如调用方超时）不会中断上游，跟随方照常拿到结果；
+  所有等待方都离开后上游 Task 才被取消，并从在途表移除（之后的调用重新发起）。
+- 该 Task 不继承领头方的请求截止时间（tatha.core.deadline）：各调用方按自己的剩余时间等待，
+  截止时间短的领头方不会把 DeadlineExceeded 或收紧后的超时传给预算更长的跟随方。
+- 同步领头方在自身线程内执行：其因自身截止时间失败时，仍有预算的跟随方重新发起而不是共享该失败。
+- 结果对象在调用方之间共享，调用方应只读。
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Awaitable, Callable
+
+from tatha.core.deadline import DeadlineExceeded, clamp_timeout, expired, without_deadline
+
+
+class SingleFlight:
+    """按键合并在途调用；线程安全。"""
+
+    def __init__(self) -> None:
+        self._calls: dict[str, Future] = {}
+        # 每个在途 Future 的等待方数量，及异步领头方的上游 Task（最后一个等待方离开时取消）
+        self._waiters: dict[Future, int] = {}
+        self._tasks: dict[Future, asyncio.Task] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.shared = 0
+
+    def _join(self, key: str) -> tuple[Future, bool]:
+        """返回 (在途 Future, 是否为领头方)，并登记一个等待方。"""
+        with self._lock:
+            fut = self._calls.get(key)
+            if fut is not None:
+                self.shared += 1
+                self._waiters[fut] += 1
+                return fut, False
+            fut = Future()
+            self._calls[key] = fut
+            self._waiters[fut] = 1
+            self.leaders += 1
+            return fut, True
+
+    def _leave(self, key: str, fut: Future) -> None:
+        """注销一个等待方；最后一个离开且上游未完成时取消上游 Task，并让之后的调用重新发起。"""
+        with self._lock:
+            self._waiters[fut] -= 1
+            if self._waiters[fut] > 0:
+                return
+            del self._waiters[fut]
+            task = self._tasks.pop(fut, None)
+            if fut.done() or task is None:
+                return
+            if self._calls.get(key) is fut:
+                del self._calls[key]
+        task.get_loop().call_soon_threadsafe(task.cancel)
+
+    def _finish(self, key: str, fut: Future, result: Any = None, error: BaseException | None = None) -> None:
+        with self._lock:
+            if self._calls.get(key) is fut:
+                del self._calls[key]
+            self._tasks.pop(fut, None)
+        if fut.done():
+            return
+        if error is not None:
+            fut.set_exception(error)
+        else:
+            fut.set_result(result)
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """同步合并：领头方执行 fn，其余调用方阻塞等待同一结果（不超过自身截止时间）。"""
+        fut, leader = self._join(key)
+        try:
+            if not leader:
+                return fut.result(timeout=clamp_timeout(None))
+            try:
+                result = fn()
+            except BaseException as e:
+                self._finish(key, fut, error=e)
+                raise
+            self._finish(key, fut, result)
+            return result
+        except DeadlineExceeded:
+            # 领头方的截止时间到了，不代表本调用方的：仍有预算则重新合并（可能成为新的领头方）
+            if leader or expired():
+                raise
+        except FutureTimeoutError as e:
+            if fut.done():
+                raise
+            raise DeadlineExceeded("请求截止时间已到") from e
+        finally:
+            self._leave(key, fut)
+        return self.do(key, fn)
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        异步合并：领头方把 fn() 作为独立 Task 运行（不带请求截止时间），
+        所有调用方（含领头方）各自按剩余时间等待同一 Future，超时抛 DeadlineExceeded。
+        """
+        fut, leader = self._join(key)
+        if leader:
+            with without_deadline():
+                task = asyncio.ensure_future(fn())
+            with self._lock:
+                self._tasks[fut] = task
+
+            def _done(t: asyncio.Task) -> None:
+                if t.cancelled():
+                    self._finish(key, fut, error=asyncio.CancelledError())
+                elif t.exception() is not None:
+                    self._finish(key, fut, error=t.exception())
+                else:
+                    self._finish(key, fut, t.result())
+
+            task.add_done_callback(_done)
+        try:
+            # shield：某个等待方被取消（或超时）时只取消它自己的等待，不把取消传回共享 Future
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(fut)), timeout=clamp_timeout(None))
+        except asyncio.TimeoutError as e:
+            if fut.done() and fut.exception() is not None:
+                raise
+            raise DeadlineExceeded("请求截止时间已到") from e
+        finally:
+            self._leave(key, fut)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> dict[str, int]:
+        """领头（实际上游请求）次数、被合并的调用次数与当前在途键数。"""
+        return {"leaders": self.leaders, "shared": self.shared, "in_flight": self.in_flight()}
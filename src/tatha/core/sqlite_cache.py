@@ -0,0 +1,108 @@
+"""
+SQLite 键值缓存基类：TTL（读到过期条目即删除）+ 按最久未访问的容量淘汰（写入时修剪），并提供命中/未命中/淘汰计数。
+
+单连接 + 锁，可在线程池与事件循环中共用。子类指定表名 table；存 Pydantic 模型时再指定 model，
+用 get / put 存取模型实例，否则用 get_raw / put_raw 直接存取 JSON 文本（如 LLM 响应缓存的磁盘层）。
+使用方：打分缓存（tatha.jobs.score_cache）、简历画像缓存（tatha.jobs.profile）、LLM 响应缓存磁盘层（tatha.core.llm_cache）。
+"""
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from pydantic import BaseModel
+
+
+class SqliteLRUCache:
+    """SQLite LRU 缓存；子类指定 table（及可选的 model）。"""
+
+    table: str
+    model: type[BaseModel] | None = None
+
+    def __init__(self, path: Path | str, ttl: float, max_entries: int):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            " key TEXT PRIMARY KEY,"
+            " payload TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        # 旧版表无 accessed_at 列时补上（旧条目视为最久未访问，优先淘汰）
+        columns = {row[1] for row in self._conn.execute(f"PRAGMA table_info({self.table})")}
+        if "accessed_at" not in columns:
+            self._conn.execute(f"ALTER TABLE {self.table} ADD COLUMN accessed_at REAL NOT NULL DEFAULT 0")
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.table}_accessed ON {self.table}(accessed_at)")
+        self._conn.commit()
+
+    def get_raw(self, key: str) -> tuple[str, float] | None:
+        """命中且未过期时返回 (payload, 写入时间) 并刷新访问时间；过期条目顺带删除。"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT payload, created_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now - row[1] > self.ttl:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return row[0], row[1]
+
+    def put_raw(self, key: str, payload: str, created_at: float | None = None) -> int:
+        """写入条目（created_at 默认当前时间）；超出容量时淘汰最久未访问的条目，返回淘汰条数。"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, payload, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, payload, now if created_at is None else created_at, now),
+            )
+            (count,) = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()
+            overflow = max(0, count - self.max_entries)
+            if overflow:
+                self._conn.execute(
+                    f"DELETE FROM {self.table} WHERE key IN "
+                    f"(SELECT key FROM {self.table} ORDER BY accessed_at ASC LIMIT ?)",
+                    (overflow,),
+                )
+                self.evictions += overflow
+            self._conn.commit()
+        return overflow
+
+    def get(self, key: str):
+        """命中且未过期时返回 model 实例。"""
+        found = self.get_raw(key)
+        return self.model.model_validate_json(found[0]) if found is not None else None
+
+    def put(self, key: str, value: BaseModel) -> None:
+        self.put_raw(key, value.model_dump_json())
+
+    def count(self) -> int:
+        with self._lock:
+            (n,) = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()
+        return n
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+
+    def stats(self) -> dict[str, int]:
+        """命中/未命中/淘汰计数与当前条目数。"""
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "entries": self.count()}
@@ -2,9 +2,19 @@
 tiktoken：请求前算账，精准计算 Token 消耗，控制单次调用与月度成本。
 
 使用前可对 prompt / 回复做 token 计数，避免超长请求导致意外扣费。
+
+- 编码表按模型名缓存（lru_cache），热路径上不再重复查表与加载编码。
+- count_tokens_many：批量计数（tiktoken encode_batch 多线程编码）。
+- estimate_tokens_fast：不做分词的快速估算（中日韩字符约 1.2 token/字，其余约 4 字符/token），供热路径粗判。
+- fit_token_budget：一次请求的多段输入共享 token 预算（按档位，见 input_token_budget），
+  超出时拒绝（TokenBudgetExceeded）或从最长的一段截断，在任何 LLM 调用之前完成。
+- truncate_tokens / chunk_tokens：按 token 精确截断、按 token 切成可重叠的片段，均优先在句末（中英文句号、
+  问号、叹号、分号、换行，含其后的右引号/括号）断开，提示词大小可预期且不截断半句话。
 """
 from __future__ import annotations
 
+import functools
+import re
 from typing import Optional
 
 # 常用模型与 tiktoken 编码的映射（OpenAI 兼容 API 多用 cl100k_base）
@@ -18,9 +28,33 @@ _MODEL_ENCODING = {
 }
 _DEFAULT_ENCODING = "cl100k_base"
 
+# 中日韩统一表意文字、扩展 A、兼容表意文字、CJK 标点与全角字符
+_CJK = re.compile(r"[　-〿㐀-䶿一-鿿豈-﫿＀-￯]")
+# cl100k_base 下中文常用字约 1.2 token/字，英文等约 4 字符/token（偏保守）
+_CJK_TOKENS_PER_CHAR = 1.2
+_OTHER_CHARS_PER_TOKEN = 4.0
+# 快速估算不超过预算的该比例时，视为必然在预算内，跳过精确计数
+_FAST_PATH_RATIO = 0.5
+# 句末：中英文句号/问号/叹号/分号与换行（其后紧跟的右引号、右括号归入本句），或英文句号后的空格
+_SENTENCE_END = re.compile(
+    r"(?<=[。！？；!?;\n])(?![”’」』）)\"'])|(?<=[。！？!?][”’」』）)\"'])|(?<=[.] )"
+)
+# 截断时回退到句末最多舍弃的比例，超过则在 token 处直接截断
+_MAX_BOUNDARY_BACKOFF = 0.3
+
+
+class TokenBudgetExceeded(ValueError):
+    """输入 token 数超出预算（拒绝模式）。"""
+
+    def __init__(self, tokens: int, budget: int):
+        super().__init__(f"输入约 {tokens} token，超出预算 {budget} token")
+        self.tokens = tokens
+        self.budget = budget
+
 
+@functools.lru_cache(maxsize=64)
 def _get_encoding_for_model(model_name: Optional[str] = None) -> "tiktoken.Encoding | None":
-    """根据模型名获取 tiktoken 编码；未知模型用 cl100k_base。失败时返回 None（count_tokens 用近似）。"""
+    """根据模型名获取 tiktoken 编码（按模型名缓存）；未知模型用 cl100k_base。失败时返回 None（count_tokens 用近似）。"""
     import tiktoken
     try:
         if not model_name:
@@ -54,6 +88,161 @@ def count_tokens(
     return max(1, len(text) // 2)
 
 
+def count_tokens_many(
+    texts: list[str],
+    model_name: Optional[str] = None,
+) -> list[int]:
+    """批量计算 token 数量，结果与输入一一对应；编码表不可用时回退近似值（同 count_tokens）。"""
+    if not texts:
+        return []
+    enc = _get_encoding_for_model(model_name)
+    if enc is None:
+        return [max(1, len(t) // 2) if t else 0 for t in texts]
+    return [len(ids) for ids in enc.encode_batch([t or "" for t in texts])]
+
+
+def estimate_tokens_fast(text: str) -> int:
+    """不分词的快速估算：中日韩字符按 1.2 token/字，其余按 4 字符/token，向上取整。"""
+    if not text:
+        return 0
+    cjk = len(_CJK.findall(text))
+    return int(cjk * _CJK_TOKENS_PER_CHAR + (len(text) - cjk) / _OTHER_CHARS_PER_TOKEN) + 1
+
+
+def split_sentences(text: str) -> list[str]:
+    """按句末切分，保留标点与空白，拼接后等于原文。"""
+    return [p for p in _SENTENCE_END.split(text or "") if p]
+
+
+def _cut_at_sentence(cut: str) -> str:
+    """截断后的文本回退到最后一个句末；需舍弃超过 _MAX_BOUNDARY_BACKOFF 时保持原样。"""
+    parts = split_sentences(cut)
+    if len(parts) < 2:
+        return cut
+    head = "".join(parts[:-1])
+    return head if len(head) >= len(cut) * (1 - _MAX_BOUNDARY_BACKOFF) else cut
+
+
+def truncate_tokens(
+    text: str,
+    max_tokens: int,
+    model_name: Optional[str] = None,
+    at_sentence: bool = True,
+) -> str:
+    """
+    保留不超过 max_tokens 个 token 的前缀；at_sentence 时优先在句末断开。
+    编码表不可用时按近似（2 字符/token）截断。
+    """
+    if not text or max_tokens <= 0:
+        return ""
+    # 每个 token 至少 1 字节：UTF-8 字节数不超过上限时必然不超，免编码
+    if len(text.encode("utf-8")) <= max_tokens:
+        return text
+    enc = _get_encoding_for_model(model_name)
+    if enc is None:
+        if len(text) <= max_tokens * 2:
+            return text
+        cut = text[: max_tokens * 2]
+    else:
+        ids = enc.encode(text)
+        if len(ids) <= max_tokens:
+            return text
+        # 多字节字符可能被拆在边界上，去掉解码出的残缺字符
+        cut = enc.decode(ids[:max_tokens]).rstrip("\ufffd")
+    return _cut_at_sentence(cut) if at_sentence else cut
+
+
+def _split_long(sentence: str, max_tokens: int, model_name: Optional[str]) -> list[str]:
+    """单句超过 max_tokens 时按 token 硬切。"""
+    enc = _get_encoding_for_model(model_name)
+    if enc is None:
+        step = max_tokens * 2
+        return [sentence[i : i + step] for i in range(0, len(sentence), step)]
+    ids = enc.encode(sentence)
+    return [enc.decode(ids[i : i + max_tokens]) for i in range(0, len(ids), max_tokens)]
+
+
+def _unit_tokens(texts: list[str], model_name: Optional[str]) -> list[int]:
+    """分段用的逐句计数；近似计数时向上取整，保证拼接后的片段不因取整超出上限。"""
+    if _get_encoding_for_model(model_name) is None:
+        return [max(1, (len(t) + 1) // 2) for t in texts]
+    return count_tokens_many(texts, model_name=model_name)
+
+
+def chunk_tokens(
+    text: str,
+    max_tokens: int,
+    overlap_tokens: int = 0,
+    model_name: Optional[str] = None,
+) -> list[str]:
+    """
+    按句把文本装入每段不超过 max_tokens 的片段；相邻片段重叠约 overlap_tokens（以整句计，不超过该值），
+    供长文分段送入模型或建索引。单句超长时按 token 硬切。
+    """
+    if not text or max_tokens <= 0:
+        return []
+    overlap_tokens = max(0, min(overlap_tokens, max_tokens // 2))
+    sentences = split_sentences(text)
+    units: list[tuple[str, int]] = []
+    for sentence, n in zip(sentences, _unit_tokens(sentences, model_name)):
+        if n <= max_tokens:
+            units.append((sentence, n))
+        else:
+            pieces = _split_long(sentence, max_tokens, model_name)
+            units.extend(zip(pieces, _unit_tokens(pieces, model_name)))
+    chunks: list[str] = []
+    current: list[tuple[str, int]] = []
+    used = 0
+    for unit in units:
+        if current and used + unit[1] > max_tokens:
+            chunks.append("".join(s for s, _ in current))
+            # 新片段以上一片段末尾不超过 overlap_tokens 的整句开头
+            tail: list[tuple[str, int]] = []
+            kept = 0
+            for s, n in reversed(current):
+                if kept + n > overlap_tokens or kept + n + unit[1] > max_tokens:
+                    break
+                tail.insert(0, (s, n))
+                kept += n
+            current, used = tail, kept
+        current.append(unit)
+        used += unit[1]
+    if current:
+        chunks.append("".join(s for s, _ in current))
+    return chunks
+
+
+def fit_token_budget(
+    texts: list[str],
+    budget: int,
+    model_name: Optional[str] = None,
+    trim: bool = True,
+) -> list[str]:
+    """
+    多段输入共享 budget 个 token：快速估算明显在预算内时直接返回；否则精确计数，
+    超出时 trim=True 从当前最长的一段起依次截断至总量不超过预算，trim=False 抛 TokenBudgetExceeded。
+    budget <= 0 表示不限。
+    """
+    texts = [t or "" for t in texts]
+    if budget <= 0 or sum(estimate_tokens_fast(t) for t in texts) <= budget * _FAST_PATH_RATIO:
+        return texts
+    counts = count_tokens_many(texts, model_name=model_name)
+    total = sum(counts)
+    if total <= budget:
+        return texts
+    if not trim:
+        raise TokenBudgetExceeded(total, budget)
+    out = list(texts)
+    excess = total - budget
+    for i in sorted(range(len(out)), key=lambda j: counts[j], reverse=True):
+        if excess <= 0:
+            break
+        keep = max(0, counts[i] - excess)
+        out[i] = truncate_tokens(out[i], keep, model_name=model_name)
+        excess -= counts[i] - keep
+    return out
+
+
 def estimate_input_cost(
     text: str,
     model_name: Optional[str] = None,
@@ -8,8 +8,9 @@ from .schemas import (
     MatchResult,
     JobMatchRequest,
     JobMatchResponse,
+    JobMatchStreamEvent,
 )
-from .pipeline import run_job_match_pipeline
+from .pipeline import run_job_match_pipeline, arun_job_match_pipeline, astream_job_match_pipeline
 
 __all__ = [
     "JobInfo",
@@ -17,5 +18,8 @@ __all__ = [
     "MatchResult",
     "JobMatchRequest",
     "JobMatchResponse",
+    "JobMatchStreamEvent",
     "run_job_match_pipeline",
+    "arun_job_match_pipeline",
+    "astream_job_match_pipeline",
 ]
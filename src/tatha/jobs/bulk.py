@@ -0,0 +1,145 @@
+"""
+批量矩阵匹配（招聘方）：多份简历 × 职位目录。
+
+1. 所有简历与职位一次批量向量化（与粗筛漏斗同一 embedding 模型）；
+2. 归一化后做内积检索（已安装 faiss 时用 IndexFlatIP，否则 NumPy 矩阵乘 + argpartition），
+   每个职位只保留相似度最高的 top_k 份简历；
+3. 仅这些 (职位, 简历) 对进入打分（llm / fast / hybrid，同 pipeline），并发上限 + 单条超时；
+4. 结果按完成顺序逐条产出，可增量写入 JSONL（中途中断也保留已完成部分）。
+embedding 不可用时退化为本地快速打分矩阵做候选筛选。
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+from typing import AsyncIterator
+
+import numpy as np
+
+from tatha.core.config import job_score_concurrency, job_score_mode, job_score_timeout
+from tatha.core.ratelimit import llm_priority
+from tatha.jobs.fast_scoring import FastScorer
+from tatha.jobs.pipeline import job_description
+from tatha.jobs.profile import aresume_for_scoring
+from tatha.jobs.schemas import BulkMatchRecord, JobInfo, MatchResult, ResumeInput
+from tatha.jobs.scoring import ascore_resume_vs_job, is_failed_score
+from tatha.jobs.shortlist import embed, job_text
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+def inner_product_top_k(queries: np.ndarray, base: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    对每个 query 行在 base 中取内积最大的 k 行，返回 (相似度, 下标)，形状均为 (n_queries, k)，按相似度降序。
+    输入需已归一化（内积即余弦相似度）。
+    """
+    k = min(k, base.shape[0])
+    if k <= 0 or queries.shape[0] == 0:
+        return np.empty((queries.shape[0], 0), np.float32), np.empty((queries.shape[0], 0), np.int64)
+    try:
+        import faiss
+
+        index = faiss.IndexFlatIP(base.shape[1])
+        index.add(base)
+        sims, idx = index.search(queries, k)
+        return sims, idx.astype(np.int64)
+    except ImportError:
+        pass
+    scores = queries @ base.T
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind="stable")
+    return np.take_along_axis(top_scores, order, axis=1), np.take_along_axis(top, order, axis=1)
+
+
+def _similarity_matrix(resumes: list[ResumeInput], jobs: list[JobInfo]) -> tuple[np.ndarray, np.ndarray]:
+    """返回归一化后的 (职位向量, 简历向量)；embedding 失败时以本地快速打分构造 (职位 × 简历) 相似度。"""
+    try:
+        vectors = embed([r.text for r in resumes] + [job_text(j) for j in jobs])
+        return _normalize(vectors[len(resumes):]), _normalize(vectors[: len(resumes)])
+    except Exception:
+        # 职位 i 的「向量」为其对各简历的快速打分，简历 j 的「向量」为单位基 e_j，内积即打分
+        scores = np.array(
+            [[s.overall / 100.0 for s in FastScorer(r.text).score_jobs(jobs)] for r in resumes],
+            dtype=np.float32,
+        )
+        return np.ascontiguousarray(scores.T), np.eye(len(resumes), dtype=np.float32)
+
+
+async def abulk_match(
+    resumes: list[ResumeInput],
+    jobs: list[JobInfo],
+    top_k: int = 5,
+    mode: str | None = None,
+    concurrency: int | None = None,
+    timeout: float | None = None,
+) -> AsyncIterator[BulkMatchRecord]:
+    """
+    批量矩阵匹配：每个职位取向量最相近的 top_k 份简历打分，按完成顺序产出 BulkMatchRecord。
+    mode / concurrency / timeout 含义与默认值同 arun_job_match_pipeline。
+    """
+    resumes = [r for r in resumes if (r.text or "").strip()]
+    if not resumes or not jobs:
+        return
+    mode = mode or job_score_mode()
+    timeout = timeout if timeout is not None else job_score_timeout()
+
+    job_vecs, resume_vecs = await asyncio.to_thread(_similarity_matrix, resumes, jobs)
+    sims, idx = inner_product_top_k(job_vecs, resume_vecs, top_k)
+    pairs = [(j, int(r), float(s)) for j in range(len(jobs)) for r, s in zip(idx[j], sims[j]) if r >= 0]
+
+    # 每份简历的本地打分器与画像只构造一次，供其所有候选职位复用
+    scorers = {r: FastScorer(resumes[r].text) for _, r, _ in pairs} if mode in ("fast", "hybrid") else {}
+    limit = asyncio.Semaphore(concurrency or job_score_concurrency())
+    scoring_resumes: dict[int, str] = {}
+    if mode != "fast":
+        # 画像提取与打分共用并发上限与低优先级（子任务在 llm_priority 作用域内创建，继承该优先级）
+        async def _profile(r: int) -> str:
+            async with limit:
+                return await aresume_for_scoring(resumes[r].text)
+
+        indices = list(dict.fromkeys(r for _, r, _ in pairs))
+        with llm_priority("low"):
+            profiles = await asyncio.gather(*(_profile(r) for r in indices))
+        scoring_resumes = dict(zip(indices, profiles))
+
+    async def _score(j: int, r: int, sim: float) -> BulkMatchRecord:
+        job = jobs[j]
+        if mode == "fast":
+            score = scorers[r].score_jobs([job])[0]
+        else:
+            # 批量任务以低优先级排队，不挤占在线匹配与 /v1/ask 的提供方额度
+            async with limit:
+                with llm_priority("low"):
+                    score = await ascore_resume_vs_job(scoring_resumes[r], job_description(job), timeout=timeout)
+            if mode == "hybrid" and is_failed_score(score):
+                score = scorers[r].score_jobs([job])[0]
+        return BulkMatchRecord(
+            job_index=j, resume_id=resumes[r].id, similarity=round(sim, 4), result=MatchResult(job=job, score=score)
+        )
+
+    tasks = [asyncio.ensure_future(_score(j, r, s)) for j, r, s in pairs]
+    try:
+        for done in asyncio.as_completed(tasks):
+            yield await done
+    finally:
+        for t in tasks:
+            t.cancel()
+
+
+async def abulk_match_to_jsonl(path: Path | str, resumes: list[ResumeInput], jobs: list[JobInfo], **kwargs) -> int:
+    """批量匹配并逐条追加写入 JSONL（每条完成即 flush），返回写入条数。kwargs 同 abulk_match。"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    n = 0
+    with path.open("a", encoding="utf-8") as f:
+        async for record in abulk_match(resumes, jobs, **kwargs):
+            f.write(json.dumps(record.model_dump(), ensure_ascii=False) + "\n")
+            f.flush()
+            n += 1
+    return n
@@ -0,0 +1,90 @@
+"""
+反向匹配：职位 → 候选人。以职位描述为查询，在 resume 命名空间的 FAISS 索引（scripts/build_resume_index.py）中
+检索最相近的简历，可选对候选短名单再做一次打分（llm / fast / hybrid），按分数排序返回。
+
+向量检索与简历池规模几乎无关（亚秒级），只有短名单才进入打分，避免对全量简历逐条调用 LLM。
+同一简历被切成多个片段时按文档去重，保留最高相似度。
+"""
+from __future__ import annotations
+
+import asyncio
+
+from tatha.core.config import job_score_concurrency, job_score_mode, job_score_timeout
+from tatha.jobs.fast_scoring import FastScorer
+from tatha.jobs.pipeline import job_description
+from tatha.jobs.schemas import CandidateMatch, JobInfo
+from tatha.jobs.scoring import ascore_resume_vs_job, is_failed_score
+from tatha.jobs.shortlist import job_text
+
+RESUME_NAMESPACE = "resume"
+# 每名候选人平均被切成的片段数估计：多取片段以便按文档去重后仍有 top_k 人
+_CHUNK_OVERFETCH = 3
+
+
+def _retrieve(query: str, k: int) -> list[tuple[str, str, str, float]]:
+    """检索 resume 索引，返回 [(候选 ID, 简历全文, 命中片段, 相似度)]，按文档去重、相似度降序。"""
+    from tatha.retrieval import load_index_cached
+
+    index = load_index_cached(RESUME_NAMESPACE)
+    hits = index.as_retriever(similarity_top_k=k * _CHUNK_OVERFETCH).retrieve(query)
+    # resume 索引为 IndexFlatL2：检索结果按距离升序返回，score 为 L2 距离平方；
+    # embedding 已归一化时换算为余弦相似度 1 - d/2。按返回顺序取每个文档的首个片段即其最佳片段。
+    best: dict[str, tuple[str, float]] = {}
+    for hit in hits:
+        node = hit.node
+        doc_id = node.ref_doc_id or node.node_id
+        if doc_id not in best:
+            best[doc_id] = (node.get_content(), 1.0 - float(hit.score or 0.0) / 2)
+    out = []
+    for doc_id, (excerpt, similarity) in list(best.items())[:k]:
+        name, full = doc_id, excerpt
+        try:
+            info = index.docstore.get_ref_doc_info(doc_id)
+            if info is not None:
+                full = "\n".join(n.get_content() for n in index.docstore.get_nodes(info.node_ids)) or excerpt
+                name = (info.metadata or {}).get("file_name") or doc_id
+        except Exception:
+            pass
+        out.append((name, full, excerpt, similarity))
+    return out
+
+
+async def arank_candidates(
+    job: JobInfo,
+    top_k: int = 10,
+    rescore: bool = False,
+    mode: str | None = None,
+    concurrency: int | None = None,
+    timeout: float | None = None,
+) -> list[CandidateMatch]:
+    """
+    为职位检索最相近的 top_k 名候选人。rescore=True 时对其打分并按 overall 排序，否则按相似度排序。
+    mode / concurrency / timeout 含义同 arun_job_match_pipeline。
+    """
+    hits = await asyncio.to_thread(_retrieve, job_text(job), top_k)
+    candidates = [
+        CandidateMatch(candidate_id=cid, resume_excerpt=excerpt, similarity=round(sim, 4))
+        for cid, _, excerpt, sim in hits
+    ]
+    if not rescore or not candidates:
+        return candidates
+
+    mode = mode or job_score_mode()
+    jd = job_description(job)
+    limit = asyncio.Semaphore(concurrency or job_score_concurrency())
+    timeout = timeout if timeout is not None else job_score_timeout()
+
+    async def _score(resume_text: str):
+        if mode == "fast":
+            return FastScorer(resume_text).score_jobs([job])[0]
+        async with limit:
+            score = await ascore_resume_vs_job(resume_text, jd, timeout=timeout)
+        if mode == "hybrid" and is_failed_score(score):
+            score = FastScorer(resume_text).score_jobs([job])[0]
+        return score
+
+    scores = await asyncio.gather(*(_score(text) for _, text, _, _ in hits))
+    for cand, score in zip(candidates, scores):
+        cand.score = score
+    candidates.sort(key=lambda c: c.score.overall, reverse=True)
+    return candidates
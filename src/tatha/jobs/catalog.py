@@ -0,0 +1,313 @@
+"""
+本地职位目录：SQLite + FTS5 全文索引，职位源定时入库、多用户共享一次拉取。
+
+- 入库：从已注册职位源（不经 TTL 缓存）拉取，按 URL（无 URL 时按内容哈希）去重，记录每个源的最近入库时间（新鲜度）
+  与最近尝试时间；拉取失败的源在 TATHA_JOB_CATALOG_RETRY_BACKOFF 内不再重试，请求路径不为故障源反复买单。
+- 检索：按关键词（FTS5 trigram，适配中文子串）与工作地点查询，流水线不再每次请求实时调用职位源，
+  匹配延迟不再取决于爬虫（如 Apify actor）运行时间。
+- 调度：start_catalog_scheduler 在后台线程中按 TATHA_JOB_CATALOG_REFRESH 刷新过期的源；
+  也可用 scripts/ingest_job_catalog.py 由 cron 驱动。
+存储位置：TATHA_JOB_CATALOG_PATH（默认 .data/jobs/catalog.sqlite3）。
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from tatha.core.config import (
+    get_job_catalog_path,
+    job_catalog_max_age,
+    job_catalog_refresh_interval,
+    job_catalog_retry_backoff,
+    job_catalog_sources,
+)
+from tatha.jobs.schemas import JobInfo
+
+# trigram 分词对长度不足 3 的词无法走 MATCH，此类词用 LIKE 兜底
+_MIN_FTS_TERM = 3
+
+
+def job_dedupe_key(job: JobInfo) -> str:
+    """去重键：优先职位 URL；无 URL 时用标题/公司/地点/描述的规范化内容哈希。"""
+    if job.url:
+        return "url:" + job.url.strip()
+    content = "|".join(
+        re.sub(r"\s+", " ", (x or "").strip().lower())
+        for x in (job.title, job.company, job.location, job.description)
+    )
+    return "sha:" + hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class JobCatalog:
+    """职位目录；单连接 + 锁，可在工作线程与后台调度线程中共用。"""
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._init_schema()
+
+    def _init_schema(self) -> None:
+        c = self._conn
+        c.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id INTEGER PRIMARY KEY,"
+            " dedupe_key TEXT NOT NULL UNIQUE,"
+            " title TEXT NOT NULL, company TEXT NOT NULL,"
+            " url TEXT, location TEXT, description TEXT, source TEXT,"
+            " first_seen REAL NOT NULL, last_seen REAL NOT NULL)"
+        )
+        c.execute("CREATE INDEX IF NOT EXISTS idx_jobs_source_seen ON jobs(source, last_seen)")
+        try:
+            c.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5("
+                "title, company, location, description, content='jobs', content_rowid='id', tokenize='trigram')"
+            )
+        except sqlite3.OperationalError:
+            # 旧版 SQLite 无 trigram 分词器：退回 unicode61（中文检索退化为 LIKE）
+            c.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5("
+                "title, company, location, description, content='jobs', content_rowid='id')"
+            )
+        # 外部内容表：用触发器保持 FTS 与 jobs 同步
+        c.executescript(
+            """
+            CREATE TRIGGER IF NOT EXISTS jobs_ai AFTER INSERT ON jobs BEGIN
+              INSERT INTO jobs_fts(rowid, title, company, location, description)
+              VALUES (new.id, new.title, new.company, new.location, new.description);
+            END;
+            CREATE TRIGGER IF NOT EXISTS jobs_ad AFTER DELETE ON jobs BEGIN
+              INSERT INTO jobs_fts(jobs_fts, rowid, title, company, location, description)
+              VALUES ('delete', old.id, old.title, old.company, old.location, old.description);
+            END;
+            CREATE TRIGGER IF NOT EXISTS jobs_au AFTER UPDATE OF title, company, location, description ON jobs BEGIN
+              INSERT INTO jobs_fts(jobs_fts, rowid, title, company, location, description)
+              VALUES ('delete', old.id, old.title, old.company, old.location, old.description);
+              INSERT INTO jobs_fts(rowid, title, company, location, description)
+              VALUES (new.id, new.title, new.company, new.location, new.description);
+            END;
+            """
+        )
+        c.execute(
+            "CREATE TABLE IF NOT EXISTS source_state ("
+            " source_id TEXT PRIMARY KEY,"
+            " last_ingested_at REAL, job_count INTEGER, last_error TEXT, last_attempt_at REAL)"
+        )
+        # 旧版表无 last_attempt_at 列时补上
+        columns = {row[1] for row in c.execute("PRAGMA table_info(source_state)")}
+        if "last_attempt_at" not in columns:
+            c.execute("ALTER TABLE source_state ADD COLUMN last_attempt_at REAL")
+        c.commit()
+
+    # ---------- 入库 ----------
+
+    def ingest(self, source_id: str, jobs: list[JobInfo]) -> int:
+        """写入一批职位（按去重键 upsert），并更新该源新鲜度。返回本批去重后的条数。"""
+        now = time.time()
+        keys: set[str] = set()
+        with self._lock:
+            for job in jobs:
+                key = job_dedupe_key(job)
+                if key in keys:
+                    continue
+                keys.add(key)
+                self._conn.execute(
+                    "INSERT INTO jobs (dedupe_key, title, company, url, location, description, source, first_seen, last_seen)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                    " ON CONFLICT(dedupe_key) DO UPDATE SET"
+                    " title=excluded.title, company=excluded.company, url=excluded.url,"
+                    " location=excluded.location, description=excluded.description,"
+                    " source=excluded.source, last_seen=excluded.last_seen",
+                    (key, job.title, job.company, job.url, job.location, job.description,
+                     job.source or source_id, now, now),
+                )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO source_state (source_id, last_ingested_at, job_count, last_error, last_attempt_at)"
+                " VALUES (?, ?, ?, NULL, ?)",
+                (source_id, now, len(keys), now),
+            )
+            self._conn.commit()
+        return len(keys)
+
+    def ingest_from_source(self, source_id: str, limit: int = 500) -> int:
+        """
+        从注册的职位源拉取并入库；拉取失败时记录错误与尝试时间，保留旧数据。
+        直接调用底层源而非 TTL 缓存包装，入库时间戳对应一次真实拉取。
+        """
+        from tatha.jobs.sources.registry import get_uncached_job_source
+
+        try:
+            jobs = get_uncached_job_source(source_id).fetch_jobs(limit=limit)
+        except Exception as e:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT INTO source_state (source_id, last_error, last_attempt_at) VALUES (?, ?, ?)"
+                    " ON CONFLICT(source_id) DO UPDATE SET"
+                    " last_error=excluded.last_error, last_attempt_at=excluded.last_attempt_at",
+                    (source_id, str(e)[:200], time.time()),
+                )
+                self._conn.commit()
+            return 0
+        return self.ingest(source_id, jobs)
+
+    def prune(self, max_age: float | None = None) -> int:
+        """清除超过 max_age 秒未再出现的职位（已下架），返回删除条数。"""
+        cutoff = time.time() - (max_age if max_age is not None else job_catalog_max_age())
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM jobs WHERE last_seen < ?", (cutoff,))
+            self._conn.commit()
+        return cur.rowcount
+
+    # ---------- 查询 ----------
+
+    def freshness(self) -> dict[str, float | None]:
+        """各源最近一次成功入库时间（Unix 时间戳）。"""
+        with self._lock:
+            rows = self._conn.execute("SELECT source_id, last_ingested_at FROM source_state").fetchall()
+        return {sid: ts for sid, ts in rows}
+
+    def last_attempts(self) -> dict[str, float]:
+        """各源最近一次入库尝试时间（成功或失败）；从未尝试的源不在结果中。"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT source_id, COALESCE(last_attempt_at, last_ingested_at) FROM source_state"
+            ).fetchall()
+        return {sid: ts for sid, ts in rows if ts is not None}
+
+    def count(self, source_id: str | None = None) -> int:
+        with self._lock:
+            if source_id:
+                (n,) = self._conn.execute("SELECT COUNT(*) FROM jobs WHERE source = ?", (source_id,)).fetchone()
+            else:
+                (n,) = self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()
+        return n
+
+    def search(
+        self,
+        keywords: str | None = None,
+        location: str | None = None,
+        limit: int = 200,
+        sources: list[str] | None = None,
+    ) -> list[JobInfo]:
+        """
+        按关键词（空格/逗号分隔，任一命中即可）与工作地点检索。
+        有可走全文索引的关键词时按 BM25 相关度排序，否则按最近出现时间排序。
+        """
+        terms = [t for t in re.split(r"[\s,，、;；]+", keywords or "") if t]
+        fts_terms = [t for t in terms if len(t) >= _MIN_FTS_TERM]
+        like_terms = [t for t in terms if len(t) < _MIN_FTS_TERM]
+
+        match_expr = " OR ".join('"' + t.replace('"', '""') + '"' for t in fts_terms)
+        where: list[str] = []
+        params: list[object] = []
+        conds: list[str] = []
+        if fts_terms:
+            conds.append("r.rowid IS NOT NULL")
+        for t in like_terms:
+            conds.append("(jobs.title LIKE ? OR jobs.description LIKE ? OR jobs.company LIKE ?)")
+            params.extend([f"%{t}%"] * 3)
+        if conds:
+            where.append("(" + " OR ".join(conds) + ")")
+        if location:
+            where.append("jobs.location LIKE ?")
+            params.append(f"%{location.strip()}%")
+        if sources:
+            where.append("jobs.source IN (%s)" % ",".join("?" * len(sources)))
+            params.extend(sources)
+
+        sql = "SELECT jobs.title, jobs.company, jobs.url, jobs.location, jobs.description, jobs.source FROM jobs"
+        if fts_terms:
+            # bm25 越小越相关；仅 LIKE 命中（短词）的结果排在全文命中之后
+            sql += (
+                " LEFT JOIN (SELECT rowid, bm25(jobs_fts) AS rank FROM jobs_fts WHERE jobs_fts MATCH ?) r"
+                " ON r.rowid = jobs.id"
+            )
+            params.insert(0, match_expr)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY " + ("COALESCE(r.rank, 0) ASC, " if fts_terms else "") + "jobs.last_seen DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [
+            JobInfo(title=r[0], company=r[1], url=r[2], location=r[3], description=r[4], source=r[5])
+            for r in rows
+        ]
+
+
+_catalog: JobCatalog | None = None
+_catalog_lock = threading.Lock()
+
+
+def get_job_catalog() -> JobCatalog:
+    """进程内单例，路径见 TATHA_JOB_CATALOG_PATH。"""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = JobCatalog(get_job_catalog_path())
+    return _catalog
+
+
+def refresh_stale_sources(
+    catalog: JobCatalog | None = None,
+    source_ids: list[str] | None = None,
+    limit: int = 500,
+) -> dict[str, int]:
+    """
+    对超过刷新间隔（或从未入库）的源重新入库（每源至多 limit 条），并清除下架职位。返回 {source_id: 入库条数}。
+    上次尝试失败的源在重试退避（TATHA_JOB_CATALOG_RETRY_BACKOFF）内跳过。
+    """
+    catalog = catalog or get_job_catalog()
+    fresh = catalog.freshness()
+    attempts = catalog.last_attempts()
+    interval = job_catalog_refresh_interval()
+    backoff = job_catalog_retry_backoff()
+    now = time.time()
+    ingested: dict[str, int] = {}
+    from tatha.jobs.sources.registry import expand_source_ids
+
+    raw_ids = source_ids or job_catalog_sources()
+    for sid in dict.fromkeys(s for raw in raw_ids for s in expand_source_ids(raw)):
+        last, attempt = fresh.get(sid), attempts.get(sid)
+        if last is not None and now - last < interval:
+            continue
+        # 上次尝试晚于上次成功即失败过：退避期内不再拉取
+        if attempt is not None and (last is None or attempt > last) and now - attempt < backoff:
+            continue
+        ingested[sid] = catalog.ingest_from_source(sid, limit=limit)
+    if ingested:
+        catalog.prune()
+    return ingested
+
+
+_scheduler: threading.Thread | None = None
+_scheduler_stop = threading.Event()
+
+
+def start_catalog_scheduler() -> None:
+    """启动后台入库线程（幂等）：按刷新间隔轮询各源新鲜度，多个用户请求共享同一次拉取。"""
+    global _scheduler
+    if _scheduler is not None and _scheduler.is_alive():
+        return
+    _scheduler_stop.clear()
+
+    def _loop() -> None:
+        while not _scheduler_stop.is_set():
+            try:
+                refresh_stale_sources()
+            except Exception:
+                pass
+            _scheduler_stop.wait(min(300.0, job_catalog_refresh_interval()))
+
+    _scheduler = threading.Thread(target=_loop, name="tatha-job-catalog", daemon=True)
+    _scheduler.start()
+
+
+def stop_catalog_scheduler() -> None:
+    _scheduler_stop.set()
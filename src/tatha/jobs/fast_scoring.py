@@ -0,0 +1,235 @@
+"""
+本地快速打分（无 LLM）：确定性地填充与 LLM 打分相同的 JobMatchScore 字段，单批职位毫秒级完成。
+
+用于：未配置 API Key、免费档大流量、或 LLM 服务不可用时的兜底（hybrid 模式），以及粗筛漏斗的 fast 阶段。
+维度来源：
+- 技能重叠：内置技能词表 + 职位描述中的英文技术词，与简历取交集；
+- 背景/经历：中英混合分词（汉字二元组）上的 BM25 与 IDF 加权覆盖率；
+- 离家近：JobInfo.location 与简历中出现的城市/远程偏好比对；
+- 职级：工作年限与「初级/高级/资深/专家」等关键词估计；
+- 语言、薪资、工作强度：关键词启发式，未提及给 5 分中性。
+"""
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter
+
+from tatha.jobs.schemas import JobInfo, JobMatchScore
+from tatha.jobs.textutil import tokenize
+
+# 常见技能词（小写匹配）；职位描述中出现的其它英文技术词也会被纳入
+SKILL_TERMS = (
+    "python", "java", "go", "golang", "c++", "c#", "javascript", "typescript", "react", "vue", "node",
+    "fastapi", "django", "flask", "spring", "sql", "mysql", "postgresql", "redis", "mongodb", "kafka",
+    "spark", "hadoop", "flink", "hive", "docker", "kubernetes", "k8s", "linux", "aws", "gcp", "azure",
+    "pytorch", "tensorflow", "nlp", "llm", "rag", "ai", "机器学习", "深度学习", "数据分析", "数据挖掘",
+    "数仓", "爬虫", "自动化", "前端", "后端", "全栈", "算法", "产品", "运营", "测试", "架构", "多模态",
+    "推荐系统", "搜索", "大模型", "招聘", "hr", "saas", "b端", "项目管理",
+)
+CITIES = (
+    "北京", "上海", "广州", "深圳", "杭州", "南京", "苏州", "成都", "重庆", "武汉", "西安", "天津",
+    "长沙", "厦门", "青岛", "合肥", "郑州", "香港", "新加坡", "东京", "伦敦", "纽约",
+)
+_REMOTE = ("远程", "remote", "居家", "在家办公")
+_LANGUAGES = {"英语": ("英语", "english", "cet", "雅思", "托福", "ielts", "toefl"), "日语": ("日语", "japanese", "n1", "n2")}
+# 职级：关键词 → 级别（0 实习/应届 … 4 专家/管理）；英文词按整词匹配（head 不命中 headquarters）
+_LEVEL_TERMS = (
+    (4, ("总监", "专家", "架构师", "director", "principal", "head")),
+    (3, ("资深", "高级", "senior", "lead", "主管")),
+    (1, ("初级", "junior", "助理")),
+    (0, ("实习", "应届", "intern", "校招")),
+)
+# 工作年限：同一分句内须带「以上 / 经验 / 经历」上下文（如「5 年 Python 开发经验」），且数字不与相邻数字相连
+# （「2019年-2023年」不会读成 19、23 年）
+_YEARS_RE = re.compile(r"(?<!\d)(\d{1,2})(?!\d)\s*\+?\s*年[^\d，。,.;；\n]{0,16}?(?:以上|经验|经历)")
+_SALARY_RE = re.compile(r"(\d{1,3})\s*[kK千]?\s*[-~至到]\s*(\d{1,3})\s*[kK千]")
+_HEAVY = ("996", "大小周", "加班", "抗压", "高强度")
+_LIGHT = ("弹性", "双休", "不加班", "965", "work-life", "氛围好", "远程")
+
+_K1, _B = 1.5, 0.75
+
+
+def _job_text(job: JobInfo) -> str:
+    return " ".join(p for p in (job.title, job.company, job.location or "", job.description or "") if p)
+
+
+def _skills(text: str, extra_from_latin: bool = False) -> set[str]:
+    low = (text or "").lower()
+    # 短英文词（go、ai、hr）需按整词匹配，避免误命中
+    found = {
+        t for t in SKILL_TERMS
+        if t in low and (len(t) > 2 or re.search(rf"(?<![a-z]){re.escape(t)}(?![a-z])", low))
+    }
+    if extra_from_latin:
+        found |= {w.lower() for w in re.findall(r"[A-Za-z][A-Za-z0-9+#]{2,}", text or "")}
+    return found
+
+
+def _term_re(terms: tuple[str, ...]) -> re.Pattern:
+    return re.compile("|".join(
+        re.escape(t) if not t.isascii() else rf"(?<![a-z]){re.escape(t)}(?![a-z])" for t in terms
+    ))
+
+
+_LEVEL_RES = tuple((level, _term_re(terms)) for level, terms in _LEVEL_TERMS)
+
+
+def _level(text: str) -> int | None:
+    low = (text or "").lower()
+    for level, regex in _LEVEL_RES:
+        if regex.search(low):
+            return level
+    years = [int(y) for y in _YEARS_RE.findall(text or "")]
+    if years:
+        y = max(years)
+        return 0 if y < 1 else 1 if y < 3 else 2 if y < 5 else 3 if y < 10 else 4
+    return None
+
+
+def _cities(text: str) -> set[str]:
+    return {c for c in CITIES if c in (text or "")}
+
+
+def _is_remote(text: str) -> bool:
+    low = (text or "").lower()
+    return any(r in low for r in _REMOTE)
+
+
+def _salary_range(text: str) -> tuple[int, int] | None:
+    m = _SALARY_RE.search(text or "")
+    return (int(m.group(1)), int(m.group(2))) if m else None
+
+
+def _clamp(v: float, hi: int) -> int:
+    return int(max(0, min(hi, round(v))))
+
+
+class FastScorer:
+    """对同一份简历的一批职位做本地打分；BM25 的 IDF 在本批职位上统计。"""
+
+    def __init__(self, resume_text: str):
+        self.resume_text = resume_text or ""
+        self.resume_tokens = Counter(tokenize(self.resume_text))
+        self.resume_skills = _skills(self.resume_text, extra_from_latin=True)
+        self.resume_level = _level(self.resume_text)
+        self.resume_cities = _cities(self.resume_text)
+        self.resume_salary = _salary_range(self.resume_text)
+
+    def _bm25(self, docs: list[Counter]) -> list[float]:
+        n = len(docs)
+        avgdl = sum(sum(d.values()) for d in docs) / max(1, n) or 1.0
+        df = Counter(t for d in docs for t in d)
+        out = []
+        for d in docs:
+            dl = sum(d.values()) or 1
+            s = 0.0
+            for t in self.resume_tokens:
+                tf = d.get(t, 0)
+                if tf:
+                    idf = math.log(1 + (n - df[t] + 0.5) / (df[t] + 0.5))
+                    s += idf * tf * (_K1 + 1) / (tf + _K1 * (1 - _B + _B * dl / avgdl))
+            out.append(s)
+        return out
+
+    def _coverage(self, doc: Counter) -> float:
+        """职位词在简历中出现的比例（按词频加权），与批大小无关的绝对相关度。"""
+        total = sum(doc.values())
+        if not total:
+            return 0.0
+        return sum(c for t, c in doc.items() if t in self.resume_tokens) / total
+
+    def score_jobs(self, jobs: list[JobInfo]) -> list[JobMatchScore]:
+        docs = [Counter(tokenize(_job_text(j))) for j in jobs]
+        bm25 = self._bm25(docs)
+        top = max(bm25) if bm25 else 0.0
+        return [
+            self._score_one(job, doc, (b / top) if top > 0 and len(jobs) > 1 else None)
+            for job, doc, b in zip(jobs, docs, bm25)
+        ]
+
+    def _score_one(self, job: JobInfo, doc: Counter, bm25_norm: float | None) -> JobMatchScore:
+        text = _job_text(job)
+        coverage = self._coverage(doc)
+        relevance = coverage if bm25_norm is None else 0.6 * coverage + 0.4 * bm25_norm
+
+        job_skills = _skills(text, extra_from_latin=True)
+        matched = sorted(job_skills & self.resume_skills)
+        skills_ratio = len(matched) / len(job_skills) if job_skills else relevance
+
+        job_level = _level(text)
+        if job_level is None or self.resume_level is None:
+            seniority = 5
+        else:
+            seniority = _clamp(10 - 3 * abs(job_level - self.resume_level), 10)
+
+        languages = [lang for lang, terms in _LANGUAGES.items() if any(t in text.lower() for t in terms)]
+        if not languages:
+            language = 5
+        else:
+            have = [any(t in self.resume_text.lower() for t in _LANGUAGES[lang]) for lang in languages]
+            language = 10 if all(have) else 2
+
+        job_loc = job.location or ""
+        job_cities = _cities(job_loc) or _cities(job.description or "")
+        if _is_remote(job_loc):
+            location = 9
+        elif job_cities and self.resume_cities:
+            location = 10 if job_cities & self.resume_cities else 2
+        else:
+            location = 5
+
+        job_salary = _salary_range(text)
+        if job_salary and self.resume_salary:
+            salary = 8 if job_salary[1] >= self.resume_salary[0] else 3
+        else:
+            salary = 5
+
+        culture = 5 + 2 * any(t in text.lower() for t in _LIGHT) - 2 * any(t in text for t in _HEAVY)
+
+        background = _clamp(relevance * 10 * 1.5, 10)
+        skills_overlap = _clamp(skills_ratio * 30, 30)
+        experience = _clamp(relevance * 30 * 1.5, 30)
+        base = background + skills_overlap + experience + seniority + language + 5
+        extra = (salary + location + culture) / 30 * 100
+        overall = _clamp(0.8 * base + 0.2 * extra, 100)
+
+        bullets = []
+        if matched:
+            bullets.append("技能匹配：" + "、".join(matched[:6]))
+        if location >= 9:
+            bullets.append("地点匹配：" + (job_loc or "远程"))
+        if seniority >= 8 and job_level is not None:
+            bullets.append("职级相符")
+        return JobMatchScore(
+            overall=overall,
+            background_match=background,
+            skills_overlap=skills_overlap,
+            experience_relevance=experience,
+            seniority=seniority,
+            language_requirement=language,
+            company_score=5,
+            salary_match=salary,
+            location_match=location,
+            culture_workload_match=_clamp(culture, 10),
+            summary=f"快速匹配：技能重叠 {len(matched)} 项，文本相关度 {relevance:.0%}",
+            keywords=matched[:10],
+            fit_bullets=bullets[:5],
+        )
+
+
+def fast_score_jobs(resume_text: str, jobs: list[JobInfo]) -> list[JobMatchScore]:
+    """对一批职位做本地快速打分，结果与输入一一对应。"""
+    return FastScorer(resume_text).score_jobs(jobs)
+
+
+def fast_score_resume_vs_job(resume_text: str, job: JobInfo) -> JobMatchScore:
+    """单条职位的本地快速打分（无批内 BM25 相对排序，仅用绝对覆盖率）。"""
+    return FastScorer(resume_text).score_jobs([job])[0]
+
+
+def fast_shortlist(resume_text: str, jobs: list[JobInfo], k: int) -> list[JobInfo]:
+    """粗筛漏斗的 fast 阶段：按本地快速打分保留前 k 条。"""
+    scores = fast_score_jobs(resume_text, jobs)
+    order = sorted(range(len(jobs)), key=lambda i: scores[i].overall, reverse=True)
+    return [jobs[i] for i in order[:k]]
@@ -1,45 +1,287 @@
 """
-职位匹配流水线：拉取职位 → 逐条 LLM 打分 → 排序取 Top-N。
+职位匹配流水线：拉取职位 → 粗筛漏斗（embedding 等）→ 逐条打分 → 排序取 Top-N。
+
+打分模式（mode）：llm 逐条 LLM 打分；fast 本地确定性打分（tatha.jobs.fast_scoring，无 LLM 调用）；
+hybrid 先 LLM 打分，失败或超时的职位回退本地快速打分。不传按 TATHA_JOB_SCORE_MODE（未配置 API Key 时为 fast）。
+
+- run_job_match_pipeline：同步逐条打分，供脚本与简单调用。
+- arun_job_match_pipeline：异步并发打分（并发上限 + 单条超时），墙钟时间取决于最慢的一次调用而非所有调用之和；
+  /v1/jobs/match 与中央大脑 job_match 走此路径。
+- astream_job_match_pipeline：同上但逐条推送结果并维护 Top-N，供 /v1/jobs/match/stream（SSE）使用。
+
+处于请求截止时间（tatha.core.deadline）内时：拉取职位最多等到截止时间（到期视为无候选，后台拉取完成后照常写入缓存），
+打分超时收紧到剩余时间，到期未完成的打分记为失败分（hybrid 下回退本地快速打分）。
 """
 from __future__ import annotations
 
-from tatha.core.config import job_source_id, job_top_n
-from tatha.jobs.schemas import JobInfo, JobMatchScore, MatchResult
-from tatha.jobs.sources.registry import get_job_source
-from tatha.jobs.scoring import score_resume_vs_job
+import asyncio
+import heapq
+from typing import AsyncIterator
+
+from tatha.core.config import (
+    job_batch_max_size,
+    job_catalog_enabled,
+    job_catalog_sources,
+    job_fetch_limit,
+    job_funnel_stages,
+    job_score_batch_enabled,
+    job_score_concurrency,
+    job_score_mode,
+    job_score_timeout,
+    job_source_id,
+    job_top_n,
+)
+from tatha.core.deadline import clamp_timeout, expired
+from tatha.jobs.catalog import get_job_catalog, refresh_stale_sources
+from tatha.jobs.fast_scoring import fast_score_jobs
+from tatha.jobs.profile import aresume_for_scoring, resume_for_scoring
+from tatha.jobs.schemas import JobInfo, JobMatchStreamEvent, MatchResult
+from tatha.jobs.sources.registry import expand_source_ids, get_job_source
+from tatha.jobs.scoring import (
+    ascore_resume_vs_job,
+    ascore_resume_vs_jobs,
+    is_failed_score,
+    score_resume_vs_job,
+)
+from tatha.jobs.shortlist import run_funnel
 
 
-# 单次流水线最多对多少条职位做 LLM 打分（控制成本）
+# 未配置粗筛漏斗时，单次流水线最多对多少条职位做 LLM 打分（控制成本）
 MAX_JOBS_TO_SCORE = 20
 
 
+def job_description(job: JobInfo) -> str:
+    """打分用职位描述：拼入工作地点，供「钱多事少离家近」中「离家近」维度打分。"""
+    jd = (job.description or f"{job.title} @ {job.company}").strip()
+    if job.location:
+        jd = f"工作地点：{job.location}\n\n{jd}"
+    return jd
+
+
+def fetch_jobs(source_id: str | None, keywords: str | None, location: str | None) -> list[JobInfo]:
+    """
+    漏斗入口：启用职位目录（TATHA_JOB_CATALOG）时按关键词与地点查询本地目录，仅当某源从未尝试入库时同步入库一次
+    （入库失败的源交给后台调度按退避重试，不在请求路径上反复拉取）；
+    否则实时调用职位源（不支持关键词/地点过滤）。
+    """
+    limit = job_fetch_limit()
+    if job_catalog_enabled():
+        catalog = get_job_catalog()
+        raw_ids = [source_id] if source_id else job_catalog_sources()
+        sources = list(dict.fromkeys(sid for raw in raw_ids for sid in expand_source_ids(raw)))
+        attempted = catalog.last_attempts()
+        missing = [sid for sid in sources if sid not in attempted]
+        if missing:
+            refresh_stale_sources(catalog, missing)
+        return catalog.search(keywords=keywords, location=location, limit=limit, sources=sources)
+    return get_job_source(source_id).fetch_jobs(limit=limit)
+
+
+def _candidate_jobs(
+    resume_text: str,
+    source_id: str | None,
+    keywords: str | None = None,
+    location: str | None = None,
+) -> list[JobInfo]:
+    """
+    漏斗前半段：拉取至多 TATHA_JOB_FETCH_LIMIT 条职位，经粗筛阶段收窄为进入 LLM 打分的候选。
+    职位目录可达数千条，而 LLM 打分条数只由漏斗最后一级决定，成本与延迟保持不变。
+    """
+    jobs = fetch_jobs(source_id, keywords, location)
+    if not jobs:
+        return []
+    stages = job_funnel_stages()
+    jobs = run_funnel(resume_text, jobs, stages)
+    return jobs[: stages[-1][1] if stages else MAX_JOBS_TO_SCORE]
+
+
 def run_job_match_pipeline(
     resume_text: str,
     top_n: int | None = None,
     source_id: str | None = None,
+    keywords: str | None = None,
+    location: str | None = None,
+    mode: str | None = None,
 ) -> tuple[list[MatchResult], int]:
     """
-    执行一次职位匹配：用指定职位源拉职位，对每条职位做简历 vs 职位描述打分，按 overall 排序后返回前 top_n 条。
-    返回 (匹配列表, 参与打分的职位数)。resume_text 为空时返回 ([], 0)；top_n / source_id 不传则用配置。
+    执行一次职位匹配：用指定职位源拉职位并粗筛，对候选职位做简历 vs 职位描述打分，按 overall 排序后返回前 top_n 条。
+    返回 (匹配列表, 参与打分的职位数)。resume_text 为空时返回 ([], 0)；top_n / source_id / mode 不传则用配置；
+    keywords / location 仅在职位目录模式下用于检索过滤。
     """
     resume_text = (resume_text or "").strip()
     if not resume_text:
         return [], 0
 
     n = top_n if top_n is not None else job_top_n()
-    source = get_job_source(source_id)
-    jobs = source.fetch_jobs(limit=MAX_JOBS_TO_SCORE)
+    jobs = _candidate_jobs(resume_text, source_id, keywords, location)
     if not jobs:
         return [], 0
 
+    mode = mode or job_score_mode()
+    fallback = fast_score_jobs(resume_text, jobs) if mode in ("fast", "hybrid") else None
+    # 简历画像每份简历只生成一次，所有职位打分共用（未启用时即原始简历）
+    scoring_resume = resume_for_scoring(resume_text) if mode != "fast" else resume_text
     results: list[MatchResult] = []
-    for job in jobs:
-        # 拼入工作地点，供「钱多事少离家近」中「离家近」维度打分
-        jd = (job.description or f"{job.title} @ {job.company}").strip()
-        if job.location:
-            jd = f"工作地点：{job.location}\n\n{jd}"
-        score = score_resume_vs_job(resume_text, jd)
+    for i, job in enumerate(jobs):
+        if mode == "fast":
+            score = fallback[i]
+        else:
+            score = score_resume_vs_job(scoring_resume, job_description(job))
+            if fallback is not None and is_failed_score(score):
+                score = fallback[i]
         results.append(MatchResult(job=job, score=score))
 
     results.sort(key=lambda r: r.score.overall, reverse=True)
     return results[:n], len(results)
+
+
+class TopN:
+    """流式匹配中维护的 Top-N 小根堆：按 overall，同分先到者优先。"""
+
+    def __init__(self, n: int):
+        self.n = max(1, n)
+        self._heap: list[tuple[int, int, MatchResult]] = []
+        self._seq = 0
+
+    def push(self, result: MatchResult) -> bool:
+        """加入一条结果，返回其当前是否位于 Top-N。"""
+        self._seq += 1
+        item = (result.score.overall, -self._seq, result)
+        if len(self._heap) < self.n:
+            heapq.heappush(self._heap, item)
+            return True
+        if item[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, item)
+            return True
+        return False
+
+    def ranked(self) -> list[MatchResult]:
+        return [r for _, _, r in sorted(self._heap, key=lambda x: (-x[0], -x[1]))]
+
+
+async def _iter_scored(
+    resume_text: str,
+    jobs: list[JobInfo],
+    concurrency: int,
+    timeout: float,
+    batch: bool,
+    mode: str = "llm",
+) -> AsyncIterator[MatchResult]:
+    """
+    并发打分并按完成顺序逐条产出。批量模式按单批上限切块，每块一次批量调用。
+    fast 模式一次性本地打分后直接产出；hybrid 模式下 LLM 失败的职位以本地快速打分替代。
+    消费方提前退出（如客户端断开）时取消尚未完成的打分。
+    """
+    fallback = fast_score_jobs(resume_text, jobs) if mode in ("fast", "hybrid") else None
+    if mode == "fast":
+        for job, score in zip(jobs, fallback):
+            yield MatchResult(job=job, score=score)
+        return
+
+    # 简历画像每份简历只生成一次，所有职位打分共用（未启用时即原始简历）；本地快速打分仍用原文
+    scoring_resume = await aresume_for_scoring(resume_text)
+    limit = asyncio.Semaphore(concurrency)
+    size = job_batch_max_size() if batch else 1
+
+    async def _score(start: int) -> list[MatchResult]:
+        chunk = jobs[start : start + size]
+        async with limit:
+            if batch:
+                scores = await ascore_resume_vs_jobs(
+                    scoring_resume, [job_description(j) for j in chunk], timeout=timeout, concurrency=1
+                )
+            else:
+                scores = [await ascore_resume_vs_job(scoring_resume, job_description(chunk[0]), timeout=timeout)]
+        if fallback is not None:
+            scores = [fallback[start + i] if is_failed_score(s) else s for i, s in enumerate(scores)]
+        return [MatchResult(job=job, score=score) for job, score in zip(chunk, scores)]
+
+    tasks = [asyncio.ensure_future(_score(i)) for i in range(0, len(jobs), size)]
+    try:
+        for done in asyncio.as_completed(tasks):
+            for result in await done:
+                yield result
+    finally:
+        for t in tasks:
+            t.cancel()
+
+
+async def astream_job_match_pipeline(
+    resume_text: str,
+    top_n: int | None = None,
+    source_id: str | None = None,
+    concurrency: int | None = None,
+    timeout: float | None = None,
+    batch: bool | None = None,
+    keywords: str | None = None,
+    location: str | None = None,
+    mode: str | None = None,
+) -> AsyncIterator[JobMatchStreamEvent]:
+    """
+    流式职位匹配：start → 每条打分完成即产出 match（附是否位于当前 Top-N）→ summary（最终 Top-N）。
+    首条结果在一次 LLM 往返后即可展示，无需等待全部打分完成。参数含义同 arun_job_match_pipeline。
+    """
+    resume_text = (resume_text or "").strip()
+    if not resume_text:
+        yield JobMatchStreamEvent(event="summary")
+        return
+
+    n = top_n if top_n is not None else job_top_n()
+    # 职位源为同步实现（可能是外部 HTTP），粗筛含向量化计算，均放到线程中避免阻塞事件循环
+    try:
+        fetch_timeout = clamp_timeout(None)
+        jobs = await asyncio.wait_for(
+            asyncio.to_thread(_candidate_jobs, resume_text, source_id, keywords, location),
+            timeout=fetch_timeout,
+        )
+    except asyncio.TimeoutError:
+        if not expired():
+            raise
+        jobs = []
+    total = len(jobs)
+    yield JobMatchStreamEvent(event="start", total=total)
+    if not jobs:
+        yield JobMatchStreamEvent(event="summary")
+        return
+
+    top = TopN(n)
+    scored = 0
+    async for result in _iter_scored(
+        resume_text,
+        jobs,
+        concurrency=concurrency or job_score_concurrency(),
+        timeout=timeout if timeout is not None else job_score_timeout(),
+        batch=batch if batch is not None else job_score_batch_enabled(),
+        mode=mode or job_score_mode(),
+    ):
+        scored += 1
+        in_top = top.push(result)
+        yield JobMatchStreamEvent(event="match", total=total, scored=scored, match=result, in_top_n=in_top)
+    yield JobMatchStreamEvent(event="summary", total=total, scored=scored, matches=top.ranked())
+
+
+async def arun_job_match_pipeline(
+    resume_text: str,
+    top_n: int | None = None,
+    source_id: str | None = None,
+    concurrency: int | None = None,
+    timeout: float | None = None,
+    batch: bool | None = None,
+    keywords: str | None = None,
+    location: str | None = None,
+    mode: str | None = None,
+) -> tuple[list[MatchResult], int]:
+    """
+    异步版职位匹配：与 run_job_match_pipeline 语义一致，但对职位并发打分（基于 astream_job_match_pipeline）。
+    concurrency：同时在途的打分请求上限，不传用 TATHA_JOB_SCORE_CONCURRENCY；
+    timeout：单条打分超时（秒），不传用 TATHA_JOB_SCORE_TIMEOUT，超时记为 overall=0；
+    batch：是否批量打分（一次调用多条职位），不传用 TATHA_JOB_SCORE_BATCH；
+    keywords / location：仅在职位目录模式下用于检索过滤；
+    mode：fast | llm | hybrid，不传用 TATHA_JOB_SCORE_MODE（未配置 API Key 时为 fast）。
+    """
+    async for ev in astream_job_match_pipeline(
+        resume_text, top_n, source_id, concurrency, timeout, batch, keywords, location, mode
+    ):
+        if ev.event == "summary":
+            return ev.matches, ev.total
+    return [], 0
@@ -0,0 +1,101 @@
+"""
+简历画像预计算：每份简历只调用一次 LLM 生成 ResumeProfile（tatha.agents），按简历哈希缓存，
+之后所有职位打分都用紧凑画像文本替代原始简历——打分提示词更短，同一简历的各次打分依据一致。
+
+缓存：SQLite（TATHA_CACHE_DIR/resume_profiles.sqlite3），键 = 简历哈希 + 模型名，有效期同打分缓存，
+超出 TATHA_RESUME_PROFILE_CACHE_MAX 条时按最久未访问淘汰。
+画像生成失败时回退原始简历，不缓存失败结果。开关：TATHA_RESUME_PROFILE。
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+
+from tatha.agents.schemas import ResumeProfile
+from tatha.core.config import (
+    get_cache_root,
+    job_score_cache_ttl,
+    model_profile,
+    resume_profile_cache_max_entries,
+    resume_profile_enabled,
+)
+from tatha.core.sqlite_cache import SqliteLRUCache
+from tatha.jobs.score_cache import text_hash
+
+
+class ResumeProfileCache(SqliteLRUCache):
+    """SQLite 简历画像缓存（TTL + 按最久未访问的容量淘汰，同打分缓存）。"""
+
+    table = "resume_profiles"
+    model = ResumeProfile
+
+    @staticmethod
+    def make_key(resume_text: str, model: str) -> str:
+        return hashlib.sha256(f"{text_hash(resume_text)}|{model}".encode("utf-8")).hexdigest()
+
+
+_cache: ResumeProfileCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_profile_cache() -> ResumeProfileCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResumeProfileCache(
+                get_cache_root() / "resume_profiles.sqlite3",
+                ttl=job_score_cache_ttl(),
+                max_entries=resume_profile_cache_max_entries(),
+            )
+    return _cache
+
+
+def get_resume_profile(resume_text: str) -> ResumeProfile | None:
+    """取简历画像（优先缓存）；生成失败返回 None。"""
+    cache = get_profile_cache()
+    key = cache.make_key(resume_text, model_profile("resume").model_name)
+    profile = cache.get(key)
+    if profile is not None:
+        return profile
+    try:
+        from tatha.agents.document_agents import run_resume_profile
+        profile = run_resume_profile(resume_text)
+    except Exception:
+        return None
+    cache.put(key, profile)
+    return profile
+
+
+async def aget_resume_profile(resume_text: str) -> ResumeProfile | None:
+    """异步版 get_resume_profile。"""
+    cache = get_profile_cache()
+    key = cache.make_key(resume_text, model_profile("resume").model_name)
+    profile = cache.get(key)
+    if profile is not None:
+        return profile
+    try:
+        from tatha.agents.document_agents import arun_resume_profile
+        profile = await arun_resume_profile(resume_text)
+    except Exception:
+        return None
+    cache.put(key, profile)
+    return profile
+
+
+def _profile_text(profile: ResumeProfile | None, resume_text: str) -> str:
+    text = profile.to_prompt_text() if profile is not None else ""
+    return text or resume_text
+
+
+def resume_for_scoring(resume_text: str) -> str:
+    """LLM 打分用的简历文本：启用画像时为紧凑画像，否则（或生成失败时）为原始简历。"""
+    if not resume_profile_enabled():
+        return resume_text
+    return _profile_text(get_resume_profile(resume_text), resume_text)
+
+
+async def aresume_for_scoring(resume_text: str) -> str:
+    """异步版 resume_for_scoring。"""
+    if not resume_profile_enabled():
+        return resume_text
+    return _profile_text(await aget_resume_profile(resume_text), resume_text)
@@ -0,0 +1,206 @@
+"""
+异步职位匹配任务：提交即返回任务 ID，由进程内有界 worker 池运行匹配流水线，客户端轮询进度与（部分）结果。
+
+- 长时间匹配（如 Pro 档 Top-20）不再占用 HTTP 连接与线程池线程；突发请求在队列中排队，超出上限拒绝。
+- worker 为事件循环上的协程（数量 TATHA_MATCH_WORKERS），逐条消费 astream_job_match_pipeline，
+  每条打分完成即更新任务进度与当前 Top-N。
+- 任务状态存储可插拔：memory（进程内，默认）| redis（REDIS_URL，多进程/多实例共享轮询）；
+  阻塞式存储（redis）的读写放到线程中执行，不阻塞事件循环。
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+import uuid
+from typing import Any, Protocol
+
+from tatha.core.config import (
+    job_top_n,
+    match_queue_backend,
+    match_queue_max_pending,
+    match_queue_result_ttl,
+    match_queue_workers,
+)
+from tatha.core.ratelimit import llm_priority
+from tatha.jobs.schemas import MatchTask
+
+
+class QueueFullError(RuntimeError):
+    """排队任务已达上限。"""
+
+
+class TaskStore(Protocol):
+    """任务状态存储接口；blocking 为 True 时读写涉及网络 IO，由队列放到线程中执行。"""
+
+    blocking: bool
+
+    def get(self, task_id: str) -> MatchTask | None: ...
+
+    def put(self, task: MatchTask) -> None: ...
+
+
+class MemoryTaskStore:
+    """进程内任务存储；写入时顺带清理超过保留时长的任务。"""
+
+    blocking = False
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._tasks: dict[str, MatchTask] = {}
+        self._lock = threading.Lock()
+
+    def get(self, task_id: str) -> MatchTask | None:
+        with self._lock:
+            task = self._tasks.get(task_id)
+        return task.model_copy(deep=True) if task is not None else None
+
+    def put(self, task: MatchTask) -> None:
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            self._tasks[task.id] = task.model_copy(deep=True)
+            for tid in [t for t, v in self._tasks.items() if v.updated_at < cutoff]:
+                del self._tasks[tid]
+
+
+class RedisTaskStore:
+    """Redis 任务存储：键 match_task:{id}，值为 JSON，带过期时间。client 可注入（测试用），否则按 url 创建。"""
+
+    blocking = True
+
+    def __init__(self, url: str, ttl: float, client: Any = None):
+        self.ttl = int(ttl)
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(url)
+        self._client = client
+
+    def get(self, task_id: str) -> MatchTask | None:
+        raw = self._client.get(f"match_task:{task_id}")
+        return MatchTask.model_validate_json(raw) if raw else None
+
+    def put(self, task: MatchTask) -> None:
+        self._client.set(f"match_task:{task.id}", task.model_dump_json(), ex=self.ttl)
+
+
+def _make_store() -> TaskStore:
+    ttl = match_queue_result_ttl()
+    if match_queue_backend() == "redis":
+        url = os.getenv("REDIS_URL")
+        if not url:
+            raise RuntimeError("TATHA_MATCH_QUEUE_BACKEND=redis 需配置 REDIS_URL")
+        try:
+            return RedisTaskStore(url, ttl)
+        except ImportError as e:
+            raise RuntimeError("TATHA_MATCH_QUEUE_BACKEND=redis 需安装 redis：pip install 'tatha[queue-redis]'") from e
+    return MemoryTaskStore(ttl)
+
+
+class MatchQueue:
+    """有界匹配任务队列 + worker 协程池；worker 在首次提交时于当前事件循环上启动。"""
+
+    def __init__(self, store: TaskStore, workers: int, max_pending: int):
+        self.store = store
+        self.workers = workers
+        self.max_pending = max_pending
+        self._queue: asyncio.Queue | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._workers: list[asyncio.Task] = []
+
+    def _ensure_started(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._loop is not loop:
+            # 首次使用或事件循环已更换（如测试中的多个客户端）：在当前循环上重建队列与 worker
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.max_pending)
+            self._workers = [loop.create_task(self._worker()) for _ in range(self.workers)]
+        return self._queue
+
+    async def submit(self, params: dict[str, Any], user_id: str | None = None) -> MatchTask:
+        """登记任务并入队；队列已满时抛 QueueFullError。params 为 astream_job_match_pipeline 的关键字参数。"""
+        queue = self._ensure_started()
+        if queue.full():
+            raise self._full()
+        now = time.time()
+        task = MatchTask(id=uuid.uuid4().hex, user_id=user_id, created_at=now, updated_at=now)
+        # 先登记再入队，避免 worker 已写入 running 后被 queued 覆盖
+        await self._aput(task)
+        try:
+            queue.put_nowait((task, params))
+        except asyncio.QueueFull:
+            # 登记期间队列被其它提交占满
+            task.status, task.error, task.updated_at = "failed", "排队已满", time.time()
+            await self._aput(task)
+            raise self._full() from None
+        return task
+
+    def _full(self) -> QueueFullError:
+        return QueueFullError(f"匹配任务排队已满（{self.max_pending}），请稍后重试")
+
+    def get(self, task_id: str) -> MatchTask | None:
+        return self.store.get(task_id)
+
+    async def aget(self, task_id: str) -> MatchTask | None:
+        """异步读取任务状态；阻塞式存储在线程中读取。"""
+        if self.store.blocking:
+            return await asyncio.to_thread(self.store.get, task_id)
+        return self.store.get(task_id)
+
+    async def _aput(self, task: MatchTask) -> None:
+        if self.store.blocking:
+            await asyncio.to_thread(self.store.put, task)
+        else:
+            self.store.put(task)
+
+    async def _worker(self) -> None:
+        while True:
+            task, params = await self._queue.get()
+            try:
+                await self._run(task, params)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, task: MatchTask, params: dict[str, Any]) -> None:
+        from tatha.jobs.pipeline import TopN, astream_job_match_pipeline
+
+        task.status = "running"
+        task.updated_at = time.time()
+        await self._aput(task)
+        top: TopN | None = None
+        try:
+            # 后台任务以低优先级参与 LLM 限流排队
+            with llm_priority("low"):
+                async for ev in astream_job_match_pipeline(**params):
+                    if ev.event == "start":
+                        task.total = ev.total
+                        top = TopN(params.get("top_n") or job_top_n())
+                        continue
+                    if ev.event == "match" and top is not None:
+                        task.scored = ev.scored
+                        if top.push(ev.match):
+                            task.matches = top.ranked()
+                    elif ev.event == "summary":
+                        task.total, task.scored, task.matches = ev.total, ev.scored, ev.matches
+                    task.updated_at = time.time()
+                    await self._aput(task)
+            task.status = "done"
+        except Exception as e:
+            task.status = "failed"
+            task.error = str(e)
+        task.updated_at = time.time()
+        await self._aput(task)
+
+
+_queue: MatchQueue | None = None
+_queue_lock = threading.Lock()
+
+
+def get_match_queue() -> MatchQueue:
+    """进程内单例，worker 数、排队上限与存储后端见 TATHA_MATCH_* 配置。"""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = MatchQueue(_make_store(), match_queue_workers(), match_queue_max_pending())
+    return _queue
@@ -3,7 +3,7 @@
 打分维度借鉴 DailyJobMatch / resume-optimization-crew：多维度 + 结构化。
 """
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Literal, Optional
 
 
 class JobInfo(BaseModel):
@@ -37,17 +37,76 @@ class JobMatchScore(BaseModel):
     fit_bullets: list[str] = Field(default_factory=list, description="匹配要点列表")
 
 
+class BatchJobMatchScore(JobMatchScore):
+    """批量打分中的单条结果：job_index 对应本批「职位 i」的序号，用于对齐输入。"""
+    job_index: int = Field(..., ge=0, description="本批职位序号（从 0 开始）")
+
+
 class MatchResult(BaseModel):
     """单条匹配结果：职位 + 打分。"""
     job: JobInfo = Field(..., description="职位信息")
     score: JobMatchScore = Field(..., description="匹配打分")
 
 
+class JobMatchStreamEvent(BaseModel):
+    """
+    流式匹配事件（SSE 每条 data 即一个事件）：
+    start（候选职位数）→ match（每条打分完成即推送）→ summary（最终排序 Top-N）；出错时为 error。
+    """
+    event: Literal["start", "match", "summary", "error"] = Field(..., description="事件类型")
+    total: int = Field(0, description="参与打分的职位数")
+    scored: int = Field(0, description="已完成打分的职位数")
+    match: Optional[MatchResult] = Field(None, description="match 事件：刚完成打分的一条结果")
+    in_top_n: Optional[bool] = Field(None, description="match 事件：该条当前是否位于 Top-N")
+    matches: list[MatchResult] = Field(default_factory=list, description="summary 事件：按综合分排序的 Top-N")
+    error: Optional[str] = Field(None, description="error 事件：错误信息")
+
+
+class MatchTask(BaseModel):
+    """异步职位匹配任务（提交后轮询）：状态、进度与当前 Top-N（运行中为部分结果，完成后为最终结果）。"""
+    id: str = Field(..., description="任务 ID")
+    status: Literal["queued", "running", "done", "failed"] = Field("queued", description="任务状态")
+    user_id: Optional[str] = Field(None, description="提交者，仅本人可查询")
+    total: int = Field(0, description="参与打分的职位数")
+    scored: int = Field(0, description="已完成打分的职位数")
+    matches: list[MatchResult] = Field(default_factory=list, description="当前 Top-N（按综合分排序）")
+    error: Optional[str] = Field(None, description="失败原因")
+    created_at: float = Field(0.0, description="提交时间（Unix 时间戳）")
+    updated_at: float = Field(0.0, description="最近更新时间（Unix 时间戳）")
+
+
+class ResumeInput(BaseModel):
+    """批量矩阵匹配中的一份简历。"""
+    id: str = Field(..., description="简历标识（如候选人 ID 或文件名），原样出现在结果中")
+    text: str = Field(..., description="简历全文或摘要")
+
+
+class BulkMatchRecord(BaseModel):
+    """批量矩阵匹配的一条结果（JSONL 每行一条）：某职位的一名候选简历及其打分。"""
+    job_index: int = Field(..., ge=0, description="职位在输入列表中的序号")
+    resume_id: str = Field(..., description="简历标识")
+    similarity: float = Field(..., description="简历与职位的向量相似度（内积，已归一化）")
+    result: MatchResult = Field(..., description="职位 + 打分")
+
+
+class CandidateMatch(BaseModel):
+    """反向匹配（职位 → 候选人）的一条结果：简历索引中的一名候选人 + 可选打分。"""
+    candidate_id: str = Field(..., description="候选简历标识（索引文档 ID 或文件名）")
+    resume_excerpt: str = Field("", description="检索命中的简历片段")
+    similarity: float = Field(..., description="向量检索相似度")
+    score: Optional[JobMatchScore] = Field(None, description="打分结果（请求 rescore 时返回）")
+
+
 class JobMatchRequest(BaseModel):
     """POST /v1/jobs/match 请求。"""
     resume_text: str = Field(..., description="简历全文或摘要，用于与职位描述对比打分")
     top_n: Optional[int] = Field(5, ge=1, le=20, description="返回前 N 条匹配，默认 5")
-    source: Optional[str] = Field(None, description="职位源：mock（默认）| apify_linkedin，不传则用配置")
+    source: Optional[str] = Field(None, description="职位源：mock（默认）| apify_linkedin | 逗号分隔多个或 all，不传则用配置")
+    keywords: Optional[str] = Field(None, description="可选：职位关键词（空格分隔），启用职位目录时用于检索")
+    location: Optional[str] = Field(None, description="可选：期望工作地点，启用职位目录时用于过滤")
+    mode: Optional[Literal["fast", "llm", "hybrid"]] = Field(
+        None, description="打分模式：fast（本地，无 LLM）| llm | hybrid（LLM 失败回退 fast），不传按档位配置"
+    )
 
 
 class JobMatchResponse(BaseModel):
@@ -0,0 +1,56 @@
+"""
+简历×职位打分的磁盘缓存（SQLite）：同一简历对同一职位重复匹配时直接返回已有 JobMatchScore，不再调用 LLM。
+
+键 = 简历哈希 + 职位描述哈希 + 模型名 + 打分提示词版本；提示词改动后版本变化，旧条目自然失效。
+TTL、按最久未访问的容量淘汰与命中/未命中计数见 tatha.core.sqlite_cache.SqliteLRUCache。
+存储位置：TATHA_CACHE_DIR（默认 .data/cache）/job_scores.sqlite3。
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+
+from tatha.core.config import (
+    get_cache_root,
+    job_score_cache_enabled,
+    job_score_cache_max_entries,
+    job_score_cache_ttl,
+)
+from tatha.core.sqlite_cache import SqliteLRUCache
+from tatha.jobs.schemas import JobMatchScore
+
+
+def text_hash(text: str) -> str:
+    """文本内容哈希（sha256 十六进制）。"""
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+class JobScoreCache(SqliteLRUCache):
+    """SQLite 打分缓存。"""
+
+    table = "job_scores"
+    model = JobMatchScore
+
+    @staticmethod
+    def make_key(resume_text: str, job_description: str, model: str, prompt_version: str) -> str:
+        parts = (text_hash(resume_text), text_hash(job_description), model, prompt_version)
+        return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+_cache: JobScoreCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_score_cache() -> JobScoreCache | None:
+    """进程内单例；TATHA_JOB_SCORE_CACHE=false 时返回 None。"""
+    global _cache
+    if not job_score_cache_enabled():
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = JobScoreCache(
+                get_cache_root() / "job_scores.sqlite3",
+                ttl=job_score_cache_ttl(),
+                max_entries=job_score_cache_max_entries(),
+            )
+    return _cache
@@ -4,71 +4,363 @@
 """
 from __future__ import annotations
 
-from tatha.core.config import get_default_model
-from tatha.jobs.schemas import JobMatchScore
+import asyncio
+import hashlib
+from functools import lru_cache
+
+from tatha.core.config import (
+    job_batch_max_size,
+    job_batch_token_budget,
+    job_description_max_tokens,
+    job_score_concurrency,
+    model_profile,
+    resume_max_tokens,
+)
+from tatha.core.deadline import DeadlineExceeded, clamp_timeout
+from tatha.core.tokens import count_tokens, count_tokens_many, truncate_tokens
+from tatha.jobs.schemas import BatchJobMatchScore, JobMatchScore
+from tatha.jobs.score_cache import JobScoreCache, get_score_cache
 
 
 def _model():
-    from pydantic_ai_litellm import LiteLLMModel
-    return LiteLLMModel(model_name=get_default_model())
+    from tatha.core.llm import agent_model
+    return agent_model("job_scoring")
+
+
+def _scoring_model_name() -> str:
+    """打分实际使用的模型名（job_scoring 任务配置，未指定时为默认模型），用于缓存键与 token 计数。"""
+    return model_profile("job_scoring").model_name
+
+
+# 打分提示词；其哈希作为打分缓存键的一部分，改动提示词即自动使旧缓存失效
+JOB_MATCH_SYSTEM_PROMPT = (
+    "你是一个职位匹配评分员。根据「简历」与「职位描述」两段文本，从以下维度打分并只输出结构化结果。"
+    "不要输出任何解释或前缀（如「好的」「这是」），只输出符合 JobMatchScore 的 JSON。\n"
+    "维度与范围：\n"
+    "- background_match: 领域/背景匹配 0–10\n"
+    "- skills_overlap: 技能重叠 0–30\n"
+    "- experience_relevance: 经历相关性 0–30\n"
+    "- seniority: 职级匹配 0–10\n"
+    "- language_requirement: 语言要求匹配 0–10\n"
+    "- company_score: 公司/岗位吸引力 0–10\n"
+    "- salary_match: 钱多——薪资/待遇与候选人期望或市场匹配 0–10，未提及则 5\n"
+    "- location_match: 离家近——工作地点、远程/混合与候选人偏好匹配 0–10，未提及则 5\n"
+    "- culture_workload_match: 事少——工作强度、弹性、加班文化、团队氛围匹配 0–10，未提及则 5\n"
+    "- overall: 综合分 0–100，需综合考虑上述所有维度（含钱多、事少、离家近），为各项加权综合\n"
+    "同时填写 summary（一句话匹配摘要，可提及薪资/地点/强度亮点）、keywords、fit_bullets（最多 5 条）。\n"
+    "「简历」可能是原文，也可能是预先提取的候选人画像（技能、职级、地点、期望薪资、语言、经历摘要等逐行字段），两者同等对待。"
+)
+# 批量打分：同一评分标准，一次输入一份简历 + 多条编号职位，按序号逐条输出
+JOB_MATCH_BATCH_SYSTEM_PROMPT = (
+    JOB_MATCH_SYSTEM_PROMPT
+    + "\n本次输入包含一份简历与多条职位（【职位 0】【职位 1】…）。请对每条职位分别按上述标准独立打分，"
+    "每条结果填写 job_index 为对应职位序号，输出与职位数量相同的列表。"
+)
+# 单条与批量共用评分标准，结果可互相复用；任一提示词改动都会改变版本、使缓存失效
+SCORING_PROMPT_VERSION = hashlib.sha256(
+    JOB_MATCH_BATCH_SYSTEM_PROMPT.encode("utf-8")
+).hexdigest()[:12]
+# 批量请求中除简历与职位正文外的固定开销（系统提示词、编号标记、输出结构说明）估算
+_BATCH_OVERHEAD_TOKENS = 600
 
 
 def _job_match_agent():
     from pydantic_ai import Agent
     return Agent(
         model=_model(),
+        model_settings=model_profile("job_scoring").agent_settings(),
         output_type=JobMatchScore,
-        system_prompt=(
-            "你是一个职位匹配评分员。根据「简历」与「职位描述」两段文本，从以下维度打分并只输出结构化结果。"
-            "不要输出任何解释或前缀（如「好的」「这是」），只输出符合 JobMatchScore 的 JSON。\n"
-            "维度与范围：\n"
-            "- background_match: 领域/背景匹配 0–10\n"
-            "- skills_overlap: 技能重叠 0–30\n"
-            "- experience_relevance: 经历相关性 0–30\n"
-            "- seniority: 职级匹配 0–10\n"
-            "- language_requirement: 语言要求匹配 0–10\n"
-            "- company_score: 公司/岗位吸引力 0–10\n"
-            "- salary_match: 钱多——薪资/待遇与候选人期望或市场匹配 0–10，未提及则 5\n"
-            "- location_match: 离家近——工作地点、远程/混合与候选人偏好匹配 0–10，未提及则 5\n"
-            "- culture_workload_match: 事少——工作强度、弹性、加班文化、团队氛围匹配 0–10，未提及则 5\n"
-            "- overall: 综合分 0–100，需综合考虑上述所有维度（含钱多、事少、离家近），为各项加权综合\n"
-            "同时填写 summary（一句话匹配摘要，可提及薪资/地点/强度亮点）、keywords、fit_bullets（最多 5 条）。"
-        ),
+        system_prompt=JOB_MATCH_SYSTEM_PROMPT,
+    )
+
+
+def _job_match_batch_agent():
+    from pydantic_ai import Agent
+
+    settings = model_profile("job_scoring").agent_settings()
+    # 单批最多 job_batch_max_size 条，输出上限按条数放大
+    settings["max_tokens"] *= job_batch_max_size()
+    return Agent(
+        model=_model(),
+        model_settings=settings,
+        output_type=list[BatchJobMatchScore],
+        system_prompt=JOB_MATCH_BATCH_SYSTEM_PROMPT,
     )
 
 
 _agent = None
+_batch_agent = None
+
+
+def _get_agent():
+    """懒加载单例，同步与异步打分共用同一 Agent。"""
+    global _agent
+    if _agent is None:
+        _agent = _job_match_agent()
+    return _agent
+
+
+def _get_batch_agent():
+    global _batch_agent
+    if _batch_agent is None:
+        _batch_agent = _job_match_batch_agent()
+    return _batch_agent
+
+
+@lru_cache(maxsize=256)
+def _fit(text: str, max_tokens: int, model_name: str) -> str:
+    """按 (文本, 上限, 模型) 缓存截断结果：同一简历在一次匹配中被逐条、逐批及分批规划反复引用，只编码一次。"""
+    return truncate_tokens(text, max_tokens, model_name=model_name)
+
+
+def _fit_resume(resume_text: str) -> str:
+    """简历按打分模型的 token 上限截断（优先在句末断开）。"""
+    return _fit(resume_text or "", resume_max_tokens(), _scoring_model_name())
+
+
+def _fit_job(job_description: str) -> str:
+    """职位描述按打分模型的 token 上限截断（优先在句末断开）。"""
+    return _fit(job_description or "", job_description_max_tokens(), _scoring_model_name())
+
+
+def _user_message(resume_text: str, job_description: str) -> str:
+    return f"【简历】\n{_fit_resume(resume_text)}\n\n【职位描述】\n{_fit_job(job_description)}"
+
+
+FAILED_SUMMARY_PREFIX = "打分失败"
+
+
+def is_failed_score(score: JobMatchScore) -> bool:
+    """是否为 LLM 调用失败/超时时生成的默认分。"""
+    return score.summary.startswith(FAILED_SUMMARY_PREFIX)
+
+
+def _failed_score(e: BaseException) -> JobMatchScore:
+    """LLM 调用失败时的默认分：overall=0，summary 带简短错误提示。"""
+    # 简短错误提示，便于排查（不暴露 key 或长栈）
+    err_msg = (str(e).strip() or type(e).__name__)[:120]
+    if "key" in err_msg.lower() or "secret" in err_msg.lower() or "auth" in err_msg.lower():
+        err_msg = type(e).__name__ + "（请检查 .env 中对应 API Key 与 TATHA_DEFAULT_MODEL）"
+    return JobMatchScore(
+        overall=0,
+        background_match=0,
+        skills_overlap=0,
+        experience_relevance=0,
+        seniority=0,
+        language_requirement=0,
+        company_score=0,
+        salary_match=5,
+        location_match=5,
+        culture_workload_match=5,
+        summary=f"{FAILED_SUMMARY_PREFIX}: {err_msg}",
+        keywords=[],
+        fit_bullets=[],
+    )
+
+
+def _cache_key(resume_text: str, job_description: str) -> str:
+    return JobScoreCache.make_key(resume_text, job_description, _scoring_model_name(), SCORING_PROMPT_VERSION)
 
 
 def score_resume_vs_job(resume_text: str, job_description: str) -> JobMatchScore:
     """
     对单条职位做简历匹配打分。
+    先查打分缓存（见 tatha.jobs.score_cache），命中则不调用 LLM；仅成功的打分写入缓存。
     若 LLM 调用失败，返回 overall=0 的默认分。
     """
-    global _agent
-    if _agent is None:
-        _agent = _job_match_agent()
-    user_message = f"【简历】\n{resume_text[:8000]}\n\n【职位描述】\n{(job_description or '')[:4000]}"
+    cache = get_score_cache()
+    key = _cache_key(resume_text, job_description)
+    if cache is not None and (hit := cache.get(key)) is not None:
+        return hit
+    agent = _get_agent()
     try:
-        result = _agent.run_sync(user_message)
-        return result.output
+        result = agent.run_sync(_user_message(resume_text, job_description))
     except Exception as e:
-        # 简短错误提示，便于排查（不暴露 key 或长栈）
-        err_msg = (str(e).strip() or type(e).__name__)[:120]
-        if "key" in err_msg.lower() or "secret" in err_msg.lower() or "auth" in err_msg.lower():
-            err_msg = type(e).__name__ + "（请检查 .env 中对应 API Key 与 TATHA_DEFAULT_MODEL）"
-        return JobMatchScore(
-            overall=0,
-            background_match=0,
-            skills_overlap=0,
-            experience_relevance=0,
-            seniority=0,
-            language_requirement=0,
-            company_score=0,
-            salary_match=5,
-            location_match=5,
-            culture_workload_match=5,
-            summary=f"打分失败: {err_msg}",
-            keywords=[],
-            fit_bullets=[],
+        return _failed_score(e)
+    if cache is not None:
+        cache.put(key, result.output)
+    return result.output
+
+
+async def ascore_resume_vs_job(
+    resume_text: str,
+    job_description: str,
+    timeout: float | None = None,
+) -> JobMatchScore:
+    """
+    异步版打分：走 Agent.run，供流水线并发调用。
+    timeout（秒）可选，并收紧到请求截止时间；超时与其它失败一样返回 overall=0 的默认分；缓存行为同 score_resume_vs_job。
+    """
+    cache = get_score_cache()
+    key = _cache_key(resume_text, job_description)
+    if cache is not None and (hit := cache.get(key)) is not None:
+        return hit
+    agent = _get_agent()
+    try:
+        timeout = clamp_timeout(timeout)
+        result = await asyncio.wait_for(
+            agent.run(_user_message(resume_text, job_description)),
+            timeout=timeout,
         )
+    except DeadlineExceeded as e:
+        return _failed_score(e)
+    except asyncio.TimeoutError:
+        return _failed_score(TimeoutError(f"超时（>{timeout:g}s）"))
+    except Exception as e:
+        return _failed_score(e)
+    if cache is not None:
+        cache.put(key, result.output)
+    return result.output
+
+
+# ---------- 批量打分：简历只发送一次，N 条职位一次 LLM 调用 ----------
+
+
+def _batch_user_message(resume_text: str, job_descriptions: list[str]) -> str:
+    parts = [f"【简历】\n{_fit_resume(resume_text)}"]
+    for i, jd in enumerate(job_descriptions):
+        parts.append(f"【职位 {i}】\n{_fit_job(jd)}")
+    return "\n\n".join(parts)
+
+
+def plan_batches(
+    resume_tokens: int,
+    job_tokens: list[int],
+    budget: int,
+    max_size: int,
+) -> list[list[int]]:
+    """
+    自适应分批：按输入顺序贪心装箱，使每批「简历 + 固定开销 + 本批职位」token 不超过 budget，且每批不超过 max_size 条。
+    单条职位即超预算时独占一批（由模型侧截断兜底）。返回每批的职位下标列表。
+    """
+    batches: list[list[int]] = []
+    current: list[int] = []
+    used = resume_tokens + _BATCH_OVERHEAD_TOKENS
+    for i, n in enumerate(job_tokens):
+        if current and (used + n > budget or len(current) >= max_size):
+            batches.append(current)
+            current, used = [], resume_tokens + _BATCH_OVERHEAD_TOKENS
+        current.append(i)
+        used += n
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _align_batch_output(output: list[BatchJobMatchScore], size: int) -> dict[int, JobMatchScore]:
+    """按 job_index 对齐批量输出；越界或重复序号丢弃（由单条打分兜底）。"""
+    aligned: dict[int, JobMatchScore] = {}
+    for item in output or []:
+        if 0 <= item.job_index < size and item.job_index not in aligned:
+            aligned[item.job_index] = JobMatchScore.model_validate(item.model_dump(exclude={"job_index"}))
+    return aligned
+
+
+def _should_retry_singly(e: BaseException) -> bool:
+    """
+    批量调用失败后是否逐条重试：仅输出不合结构（模型未按批量格式返回）时值得；
+    超时、请求截止、提供方错误逐条重试只会把同样的失败放大 N 倍，直接记为失败分。
+    """
+    from pydantic_ai.exceptions import UnexpectedModelBehavior
+    return isinstance(e, UnexpectedModelBehavior)
+
+
+# 单批超时 = 单条超时 × min(本批条数, 该倍数)：输出随条数变长，但不让一批拖成 N 条串行的时长
+_BATCH_TIMEOUT_FACTOR = 2
+
+
+def _plan(resume_text: str, job_descriptions: list[str], pending: list[int]) -> list[list[int]]:
+    model = _scoring_model_name()
+    resume_tokens = count_tokens(_fit_resume(resume_text), model_name=model)
+    job_tokens = count_tokens_many([_fit_job(job_descriptions[i]) for i in pending], model_name=model)
+    batches = plan_batches(resume_tokens, job_tokens, job_batch_token_budget(), job_batch_max_size())
+    return [[pending[j] for j in batch] for batch in batches]
+
+
+def score_resume_vs_jobs(resume_text: str, job_descriptions: list[str]) -> list[JobMatchScore]:
+    """
+    批量打分：对多条职位描述打分，结果与输入一一对应。
+    先查缓存，未命中的按 token 预算分批，每批一次 LLM 调用；批量输出缺失或不合结构的职位回退单条打分，
+    其它调用失败（如提供方错误）整批记为失败分。
+    """
+    cache = get_score_cache()
+    keys = [_cache_key(resume_text, jd) for jd in job_descriptions]
+    scores: dict[int, JobMatchScore] = {}
+    for i, key in enumerate(keys):
+        if cache is not None and (hit := cache.get(key)) is not None:
+            scores[i] = hit
+    pending = [i for i in range(len(job_descriptions)) if i not in scores]
+    for batch in _plan(resume_text, job_descriptions, pending):
+        try:
+            result = _get_batch_agent().run_sync(
+                _batch_user_message(resume_text, [job_descriptions[i] for i in batch])
+            )
+            aligned = _align_batch_output(result.output, len(batch))
+        except Exception as e:
+            aligned = {}
+            if not _should_retry_singly(e):
+                scores.update((i, _failed_score(e)) for i in batch)
+        for j, score in aligned.items():
+            scores[batch[j]] = score
+            if cache is not None:
+                cache.put(keys[batch[j]], score)
+    for i in range(len(job_descriptions)):
+        if i not in scores:
+            scores[i] = score_resume_vs_job(resume_text, job_descriptions[i])
+    return [scores[i] for i in range(len(job_descriptions))]
+
+
+async def ascore_resume_vs_jobs(
+    resume_text: str,
+    job_descriptions: list[str],
+    timeout: float | None = None,
+    concurrency: int | None = None,
+) -> list[JobMatchScore]:
+    """
+    异步批量打分：语义同 score_resume_vs_jobs，各批并发执行（上限 concurrency）。
+    timeout 为单条职位的超时，单批超时按本批条数放大、至多 _BATCH_TIMEOUT_FACTOR 倍（均不超过请求截止时间）；
+    整批超时或调用失败时本批记为失败分（hybrid 模式由流水线换成本地快速打分），不再逐条重试。
+    """
+    cache = get_score_cache()
+    keys = [_cache_key(resume_text, jd) for jd in job_descriptions]
+    scores: dict[int, JobMatchScore] = {}
+    for i, key in enumerate(keys):
+        if cache is not None and (hit := cache.get(key)) is not None:
+            scores[i] = hit
+    pending = [i for i in range(len(job_descriptions)) if i not in scores]
+    limit = asyncio.Semaphore(concurrency or job_score_concurrency())
+
+    async def _run_batch(batch: list[int]) -> None:
+        async with limit:
+            batch_timeout = None
+            try:
+                factor = min(len(batch), _BATCH_TIMEOUT_FACTOR)
+                batch_timeout = clamp_timeout(timeout * factor if timeout is not None else None)
+                result = await asyncio.wait_for(
+                    _get_batch_agent().run(
+                        _batch_user_message(resume_text, [job_descriptions[i] for i in batch])
+                    ),
+                    timeout=batch_timeout,
+                )
+                aligned = _align_batch_output(result.output, len(batch))
+            except asyncio.TimeoutError:
+                aligned = {}
+                failed = _failed_score(TimeoutError(f"批量超时（>{batch_timeout:g}s）" if batch_timeout else "批量超时"))
+                scores.update((i, failed) for i in batch)
+            except Exception as e:
+                aligned = {}
+                if not _should_retry_singly(e):
+                    scores.update((i, _failed_score(e)) for i in batch)
+        for j, score in aligned.items():
+            scores[batch[j]] = score
+            if cache is not None:
+                cache.put(keys[batch[j]], score)
+
+    await asyncio.gather(*(_run_batch(b) for b in _plan(resume_text, job_descriptions, pending)))
+
+    async def _fallback(i: int) -> None:
+        async with limit:
+            scores[i] = await ascore_resume_vs_job(resume_text, job_descriptions[i], timeout=timeout)
+
+    await asyncio.gather(*(_fallback(i) for i in range(len(job_descriptions)) if i not in scores))
+    return [scores[i] for i in range(len(job_descriptions))]
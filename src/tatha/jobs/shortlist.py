@@ -0,0 +1,81 @@
+"""
+职位粗筛漏斗：在昂贵的 LLM 打分之前，用廉价排序器把大批职位收窄到少量候选。
+
+- embedding：简历与职位描述用检索层同一 embedding 模型（TATHA_EMBED_MODEL，默认 local）向量化，
+  NumPy 向量化计算余弦相似度取 Top-K。
+- fast：本地快速打分（技能重叠 + BM25 等，见 tatha.jobs.fast_scoring）取 Top-K，无模型开销，适合放在 embedding 之前。
+漏斗阶段与每阶段保留条数由 TATHA_JOB_FUNNEL 配置（见 tatha.core.config.job_funnel_stages）。
+"""
+from __future__ import annotations
+
+from typing import Callable
+
+import numpy as np
+
+from tatha.jobs.schemas import JobInfo
+
+# 排序器签名：(简历文本, 职位列表, 保留条数) -> 保留的职位（按相关度降序）
+Ranker = Callable[[str, list[JobInfo], int], list[JobInfo]]
+
+
+def job_text(job: JobInfo) -> str:
+    """粗筛用职位文本：标题、公司、地点与描述摘要。"""
+    parts = [job.title, job.company, job.location or "", (job.description or "")[:2000]]
+    return "\n".join(p for p in parts if p)
+
+
+def cosine_top_k(query: np.ndarray, matrix: np.ndarray, k: int) -> np.ndarray:
+    """
+    对 matrix 每行与 query 计算余弦相似度，返回相似度最高的 k 个行下标（降序）。
+    先 argpartition 取 Top-K 再局部排序，避免对全量排序。
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    query = np.asarray(query, dtype=np.float32).reshape(-1)
+    if matrix.size == 0 or k <= 0:
+        return np.empty(0, dtype=np.int64)
+    norms = np.linalg.norm(matrix, axis=1) * (np.linalg.norm(query) or 1.0)
+    sims = (matrix @ query) / np.where(norms == 0, 1.0, norms)
+    k = min(k, sims.shape[0])
+    top = np.argpartition(-sims, k - 1)[:k]
+    return top[np.argsort(-sims[top], kind="stable")]
+
+
+def embed(texts: list[str]) -> np.ndarray:
+    """懒加载检索层 embedding（导入即初始化 LlamaIndex Settings），返回 (n, dim) 矩阵。"""
+    from tatha.retrieval.llama_index_rag import embed_texts
+    return np.asarray(embed_texts(texts), dtype=np.float32)
+
+
+def embedding_shortlist(resume_text: str, jobs: list[JobInfo], k: int) -> list[JobInfo]:
+    """向量相似度粗筛：简历与职位一次批量向量化，保留最相近的 k 条。"""
+    vectors = embed([resume_text] + [job_text(j) for j in jobs])
+    idx = cosine_top_k(vectors[0], vectors[1:], k)
+    return [jobs[i] for i in idx]
+
+
+def fast_shortlist(resume_text: str, jobs: list[JobInfo], k: int) -> list[JobInfo]:
+    """本地快速打分粗筛（懒导入，避免循环依赖）。"""
+    from tatha.jobs.fast_scoring import fast_shortlist as _fast
+    return _fast(resume_text, jobs, k)
+
+
+RANKERS: dict[str, Ranker] = {
+    "embedding": embedding_shortlist,
+    "fast": fast_shortlist,
+}
+
+
+def run_funnel(resume_text: str, jobs: list[JobInfo], stages: list[tuple[str, int]]) -> list[JobInfo]:
+    """
+    依次执行漏斗各阶段。职位数不超过该阶段保留条数时跳过（不产生向量化开销）；
+    未知阶段或排序器失败（如本地 embedding 模型不可用）时退化为按原顺序截断，保证流水线可跑通。
+    """
+    for name, size in stages:
+        if len(jobs) <= size:
+            continue
+        ranker = RANKERS.get(name)
+        try:
+            jobs = ranker(resume_text, jobs, size) if ranker else jobs[:size]
+        except Exception:
+            jobs = jobs[:size]
+    return jobs
@@ -4,6 +4,8 @@ Apify LinkedIn 职位源：通过 Apify LinkedIn Job Scraper 拉取职位。
 参考 DailyJobMatch / JobMatchAI 的用法。
 """
 import os
+from tatha.core.config import job_source_description_max_tokens
+from tatha.core.tokens import truncate_tokens
 from tatha.jobs.schemas import JobInfo
 from .base import JobSource
 
@@ -29,15 +31,22 @@ class ApifyLinkedInJobSource(JobSource):
         self.actor_id = (actor_id or os.getenv("APIFY_LINKEDIN_ACTOR_ID") or DEFAULT_ACTOR_ID).strip()
         self.search_keywords = search_keywords
         self.max_items = max_items
+        self._client = None
+
+    def _get_client(self):
+        """ApifyClient 懒加载并随实例复用（实例由 registry 缓存），避免每次请求重建 HTTP 客户端。"""
+        if self._client is None:
+            from apify_client import ApifyClient
+            self._client = ApifyClient(self.api_key)
+        return self._client
 
     def fetch_jobs(self, limit: int = 50) -> list[JobInfo]:
         if not self.api_key:
             return []
         try:
-            from apify_client import ApifyClient
+            client = self._get_client()
         except ImportError:
             return []
-        client = ApifyClient(self.api_key)
         run_input = {
             "searchKeywords": self.search_keywords,
             "maxItems": min(limit, self.max_items),
@@ -60,7 +69,7 @@ class ApifyLinkedInJobSource(JobSource):
                     company=company,
                     url=url,
                     location=location,
-                    description=desc[:2000] if desc else None,
+                    description=truncate_tokens(desc, job_source_description_max_tokens()) if desc else None,
                     source="apify_linkedin",
                 )
             )
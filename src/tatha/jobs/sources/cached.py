@@ -0,0 +1,77 @@
+"""
+职位源 TTL 缓存包装：在 TTL 内复用 fetch_jobs 结果，避免每次匹配请求都触发一次外部拉取（如 Apify actor 运行）。
+
+- 单飞（single-flight）：同一时刻只有一个线程真正调用底层源，并发请求等待同一次拉取的结果。
+- 过期后先返回旧结果（stale-while-revalidate），同时在后台线程刷新，请求不为刷新买单。
+- 空结果不缓存（外部源失败时通常返回空列表），下一次请求会重试。
+"""
+from __future__ import annotations
+
+import threading
+import time
+
+from tatha.jobs.schemas import JobInfo
+from .base import JobSource
+
+
+class CachedJobSource(JobSource):
+    """为任意 JobSource 增加 TTL 缓存、单飞刷新与过期后台刷新。"""
+
+    def __init__(self, inner: JobSource, ttl: float):
+        self.inner = inner
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._jobs: list[JobInfo] | None = None
+        self._fetched_at = 0.0
+        self._fetched_limit = 0
+        self._inflight: threading.Event | None = None
+
+    def _covers(self, limit: int) -> bool:
+        """已缓存结果是否满足本次 limit：缓存时的 limit 不小于本次，或底层源当时已返回全部。"""
+        return self._jobs is not None and (
+            self._fetched_limit >= limit or len(self._jobs) < self._fetched_limit
+        )
+
+    def _refresh(self, limit: int) -> list[JobInfo]:
+        """由持有单飞标记的线程调用：拉取底层源并更新缓存，结束后唤醒等待者。"""
+        jobs: list[JobInfo] = []
+        try:
+            jobs = self.inner.fetch_jobs(limit=limit)
+            if jobs:
+                with self._lock:
+                    self._jobs = jobs
+                    self._fetched_at = time.monotonic()
+                    self._fetched_limit = limit
+        finally:
+            with self._lock:
+                done, self._inflight = self._inflight, None
+            if done is not None:
+                done.set()
+        return jobs
+
+    def fetch_jobs(self, limit: int = 50) -> list[JobInfo]:
+        with self._lock:
+            if self._covers(limit):
+                jobs = self._jobs or []
+                if time.monotonic() - self._fetched_at < self.ttl:
+                    return jobs[:limit]
+                if self._inflight is None:
+                    self._inflight = threading.Event()
+                    threading.Thread(
+                        target=self._refresh,
+                        args=(max(limit, self._fetched_limit),),
+                        name="tatha-job-source-refresh",
+                        daemon=True,
+                    ).start()
+                return jobs[:limit]
+            waiter = self._inflight
+            if waiter is None:
+                self._inflight = threading.Event()
+        if waiter is None:
+            return self._refresh(limit)[:limit]
+        waiter.wait()
+        with self._lock:
+            if self._covers(limit):
+                return (self._jobs or [])[:limit]
+        # 等到的那次拉取不满足本次 limit（或失败）：自行拉取一次
+        return self.inner.fetch_jobs(limit=limit)
@@ -0,0 +1,84 @@
+"""
+组合职位源：并发拉取多个已注册职位源，合并并去重，只返回截止时间前到达的结果。
+
+- 每个源有独立超时（TATHA_JOB_SOURCE_TIMEOUT / TATHA_JOB_SOURCE_TIMEOUT_<SOURCE>），整体延迟取决于最慢的源而非各源之和；
+  超时的源不阻塞本次返回（其后台拉取完成后会写入该源的 TTL 缓存，下次请求可直接复用）。
+  处于请求截止时间内时，各源超时不超过剩余时间。
+- 去重：标题+公司规范化后相同，且描述 SimHash 相近（或任一方无描述）即视为同一职位，保留靠前源的那条。
+"""
+from __future__ import annotations
+
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+from tatha.core.deadline import remaining
+from tatha.jobs.schemas import JobInfo
+from tatha.jobs.textutil import hamming, simhash
+from .base import JobSource
+
+# 描述 SimHash 汉明距离不超过该值视为同一职位（64 位指纹）
+SIMHASH_MAX_DISTANCE = 6
+
+
+def _norm(text: str | None) -> str:
+    return re.sub(r"[\s\-_/|·,，()（）]+", "", (text or "").lower())
+
+
+def dedupe_jobs(jobs: list[JobInfo], max_distance: int = SIMHASH_MAX_DISTANCE) -> list[JobInfo]:
+    """按「标题+公司」分组，组内描述 SimHash 相近者视为重复；保持输入顺序，保留先出现的一条。"""
+    kept: list[JobInfo] = []
+    groups: dict[tuple[str, str], list[int | None]] = {}
+    for job in jobs:
+        key = (_norm(job.title), _norm(job.company))
+        fp = simhash(job.description) if job.description else None
+        seen = groups.setdefault(key, [])
+        if any(other is None or fp is None or hamming(fp, other) <= max_distance for other in seen):
+            continue
+        seen.append(fp)
+        kept.append(job)
+    return kept
+
+
+class CompositeJobSource(JobSource):
+    """并发扇出到多个职位源，各自超时，合并去重后返回。"""
+
+    def __init__(self, sources: dict[str, JobSource], timeouts: dict[str, float]):
+        self.sources = sources
+        self.timeouts = timeouts
+
+    def fetch_jobs(self, limit: int = 50) -> list[JobInfo]:
+        start = time.monotonic()
+        pool = ThreadPoolExecutor(max_workers=max(1, len(self.sources)), thread_name_prefix="tatha-job-fanout")
+        futures: dict[Future, str] = {
+            pool.submit(src.fetch_jobs, limit): sid for sid, src in self.sources.items()
+        }
+        left = remaining()
+        expiry = {
+            f: start + (min(self.timeouts.get(sid, 20.0), left) if left is not None else self.timeouts.get(sid, 20.0))
+            for f, sid in futures.items()
+        }
+        results: dict[str, list[JobInfo]] = {}
+        pending = set(futures)
+        try:
+            while pending:
+                now = time.monotonic()
+                pending = {f for f in pending if expiry[f] > now}
+                if not pending:
+                    break
+                done, pending = wait(
+                    pending,
+                    timeout=min(expiry[f] for f in pending) - now,
+                    return_when=FIRST_COMPLETED,
+                )
+                for f in done:
+                    try:
+                        results[futures[f]] = f.result() or []
+                    except Exception:
+                        results[futures[f]] = []
+        finally:
+            # 不等待超时的源：其线程结束后自然退出
+            pool.shutdown(wait=False)
+        # 按配置中的源顺序合并，靠前的源在去重时优先保留
+        merged = [job for sid in self.sources for job in results.get(sid, [])]
+        return dedupe_jobs(merged)[:limit]
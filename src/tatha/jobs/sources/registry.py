@@ -1,17 +1,84 @@
 """根据配置返回当前使用的职位源。"""
 import os
+import threading
+
+from tatha.core.config import job_source_cache_ttl, job_source_timeout
 from tatha.jobs.sources.base import JobSource
+from tatha.jobs.sources.cached import CachedJobSource
 from tatha.jobs.sources.mock import MockJobSource
 
+# 已注册的单一职位源 ID；all 表示全部
+JOB_SOURCE_IDS = ("mock", "apify_linkedin")
 
-def get_job_source(source_id: str | None = None) -> JobSource:
+# 职位源实例按 source_id 复用（避免每次请求重建 ApifyClient 等），并按配置包一层 TTL 缓存
+_instances: dict[str, JobSource] = {}
+_instances_lock = threading.Lock()
+
+
+def expand_source_ids(source_id: str | None = None) -> list[str]:
     """
-    返回职位源实例。
-    source_id 可选：mock（默认）、apify_linkedin。
+    解析职位源 ID：单个 ID、逗号分隔的多个 ID 或 all；未知 ID 视为 mock，结果去重保序。
     不传则从环境变量 TATHA_JOB_SOURCE 读取，默认 mock。
     """
-    sid = (source_id or os.getenv("TATHA_JOB_SOURCE") or "mock").strip().lower()
+    raw = (source_id or os.getenv("TATHA_JOB_SOURCE") or "mock").strip().lower()
+    if raw == "all":
+        return list(JOB_SOURCE_IDS)
+    ids: list[str] = []
+    for part in raw.split(","):
+        sid = part.strip()
+        if not sid:
+            continue
+        sid = sid if sid in JOB_SOURCE_IDS else "mock"
+        if sid not in ids:
+            ids.append(sid)
+    return ids or ["mock"]
+
+
+def _build_source(sid: str) -> JobSource:
     if sid == "apify_linkedin":
         from tatha.jobs.sources.apify_linkedin import ApifyLinkedInJobSource
         return ApifyLinkedInJobSource()
     return MockJobSource()
+
+
+def _single_source(sid: str) -> JobSource:
+    """调用方需持有 _instances_lock。"""
+    source = _instances.get(sid)
+    if source is None:
+        source = _build_source(sid)
+        ttl = job_source_cache_ttl()
+        if ttl > 0:
+            source = CachedJobSource(source, ttl)
+        _instances[sid] = source
+    return source
+
+
+def get_uncached_job_source(source_id: str) -> JobSource:
+    """单一职位源的底层实例（绕过 TTL 缓存），供职位目录入库：入库时间戳须对应一次真实拉取。"""
+    sid = expand_source_ids(source_id)[0]
+    with _instances_lock:
+        source = _single_source(sid)
+    return source.inner if isinstance(source, CachedJobSource) else source
+
+
+def get_job_source(source_id: str | None = None) -> JobSource:
+    """
+    返回职位源实例（进程内按 source_id 复用）。
+    source_id 可选：mock（默认）、apify_linkedin；多个源逗号分隔或 all 时返回组合源（并发拉取、合并去重）。
+    不传则从环境变量 TATHA_JOB_SOURCE 读取，默认 mock。
+    TATHA_JOB_SOURCE_CACHE_TTL > 0 时单一源带 TTL 缓存与单飞刷新（见 CachedJobSource）。
+    """
+    ids = expand_source_ids(source_id)
+    with _instances_lock:
+        if len(ids) == 1:
+            return _single_source(ids[0])
+        key = ",".join(ids)
+        source = _instances.get(key)
+        if source is None:
+            from tatha.jobs.sources.composite import CompositeJobSource
+            source = CompositeJobSource(
+                {sid: _single_source(sid) for sid in ids},
+                {sid: job_source_timeout(sid) for sid in ids},
+            )
+            _instances[key] = source
+    return source
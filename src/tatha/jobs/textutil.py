@@ -0,0 +1,50 @@
+"""
+职位文本工具：中英混合分词与 SimHash 指纹，供多源去重与本地快速打分复用，无外部分词依赖。
+
+- 中文按连续汉字切出二元组（bigram），英文/数字按单词切分并转小写；
+- SimHash：64 位指纹，汉明距离越小文本越相似，用于识别转载/改写的同一职位。
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+
+_TOKEN_RE = re.compile(r"[一-鿿]+|[a-zA-Z][a-zA-Z0-9+#.\-]*|\d+")
+_CJK_RE = re.compile(r"[一-鿿]")
+
+
+def tokenize(text: str) -> list[str]:
+    """中英混合分词：汉字串切成二元组（单字保留），英文词小写并去掉末尾标点。"""
+    tokens: list[str] = []
+    for m in _TOKEN_RE.finditer(text or ""):
+        piece = m.group(0)
+        if _CJK_RE.match(piece):
+            if len(piece) == 1:
+                tokens.append(piece)
+            else:
+                tokens.extend(piece[i : i + 2] for i in range(len(piece) - 1))
+        else:
+            tokens.append(piece.lower().rstrip(".-"))
+    return [t for t in tokens if t]
+
+
+def _hash64(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(text: str) -> int:
+    """64 位 SimHash 指纹；空文本返回 0。"""
+    weights = [0] * 64
+    for token in tokenize(text):
+        h = _hash64(token)
+        for bit in range(64):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+    fp = 0
+    for bit, w in enumerate(weights):
+        if w > 0:
+            fp |= 1 << bit
+    return fp
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
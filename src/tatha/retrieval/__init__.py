@@ -4,8 +4,10 @@ from .llama_index_rag import (
     build_index_from_dir,
     build_index_from_documents,
     load_index,
+    load_index_cached,
     get_query_engine,
     get_retriever,
+    embed_texts,
 )
 
 def build_query_pipeline(*args: object, **kwargs: object) -> object:
@@ -22,8 +24,10 @@ __all__ = [
     "build_index_from_dir",
     "build_index_from_documents",
     "load_index",
+    "load_index_cached",
     "get_query_engine",
     "get_retriever",
+    "embed_texts",
     "build_query_pipeline",
     "run_query_pipeline",
 ]
@@ -9,7 +9,8 @@ from __future__ import annotations
 import os
 from typing import Any, Optional
 
-from tatha.core.config import get_default_model
+from tatha.core.config import model_profile
+from tatha.core.deadline import clamp_timeout
 
 
 def build_query_pipeline(
@@ -19,13 +20,14 @@ def build_query_pipeline(
 ) -> "Pipeline":
     """
     组装 Haystack 流水线：PromptBuilder + LLM Generator。
-    model: 不传则用 TATHA_DEFAULT_MODEL；api_base_url 不传则用 OPENAI 默认（可设 DEEPSEEK 等）。
+    model: 不传则按 rag 任务配置（TATHA_MODEL_RAG，未配置时 TATHA_DEFAULT_MODEL）；输出上限、温度与超时同取 rag 任务配置（超时不超过请求截止时间）；api_base_url 不传则用 OPENAI 默认（可设 DEEPSEEK 等）。
     """
     from haystack import Pipeline
     from haystack.components.builders import PromptBuilder
     from haystack.components.generators import OpenAIGenerator
 
-    model_name = model or get_default_model()
+    profile = model_profile("rag")
+    model_name = model or profile.model_name
     # OpenAI 兼容 API：DeepSeek 等可设 OPENAI_API_BASE 或传入 api_base_url
     base_url = api_base_url or os.getenv("OPENAI_API_BASE")
     api_key = os.getenv("OPENAI_API_KEY") or os.getenv("DEEPSEEK_API_KEY") or ""
@@ -34,6 +36,8 @@ def build_query_pipeline(
         model=model_name.split("/")[-1] if "/" in model_name else model_name,
         api_key=api_key or None,
         api_base_url=base_url,
+        generation_kwargs={"max_tokens": profile.max_tokens, "temperature": profile.temperature},
+        timeout=clamp_timeout(profile.timeout),
     )
     pipe = Pipeline()
     pipe.add_component("prompt_builder", PromptBuilder(template=template))
@@ -19,15 +19,27 @@ from typing import Any
 def _ensure_llamaindex_settings() -> None:
     """统一设置 LlamaIndex 的 embed 与 LLM，与 TATHA 配置一致（LiteLLM/DeepSeek 切换）。"""
     from llama_index.core import Settings
-    from tatha.core.config import get_default_model, embed_model_type
+    from tatha.core.config import embed_model_type
     # Embedding：local = HuggingFace 多语言小模型（384 维），无需 API Key
     if embed_model_type() == "local":
         from llama_index.embeddings.huggingface import HuggingFaceEmbedding
         _local_embed_model = os.getenv("TATHA_EMBED_LOCAL_MODEL") or "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
         Settings.embed_model = HuggingFaceEmbedding(model_name=_local_embed_model)
-    # RAG 回答用的 LLM：LiteLLM，与 TATHA_DEFAULT_MODEL 一致（如 deepseek/deepseek-chat）
+    # RAG 回答用的 LLM：LiteLLM，按 rag 任务配置（模型默认与 TATHA_DEFAULT_MODEL 一致，如 deepseek/deepseek-chat）
+    Settings.llm = _rag_llm()
+
+
+def _rag_llm(timeout: float | None = None) -> Any:
+    """按 rag 任务配置构建 LlamaIndex LiteLLM；timeout 不传用任务配置的超时。"""
     from llama_index.llms.litellm import LiteLLM
-    Settings.llm = LiteLLM(model=get_default_model())
+    from tatha.core.config import model_profile
+    profile = model_profile("rag")
+    return LiteLLM(
+        model=profile.model_name,
+        temperature=profile.temperature,
+        max_tokens=profile.max_tokens,
+        timeout=timeout if timeout is not None else profile.timeout,
+    )
 
 
 # 导入 retrieval 时立即执行一次，确保后续 build/load/query 都用 Tatha 配置
@@ -127,6 +139,21 @@ def load_index(
     return load_index_from_storage(storage_context)
 
 
+# 已加载索引的进程内缓存：namespace -> (持久化目录修改时间, 索引)；重建索引后自动重新加载
+_loaded: dict[str, tuple[float, VectorStoreIndex]] = {}
+
+
+def load_index_cached(namespace: str) -> VectorStoreIndex:
+    """同 load_index（默认存储根），但在进程内复用已加载的索引，避免每次检索都从磁盘反序列化。"""
+    persist_dir = _get_persist_dir(namespace)
+    mtime = max((p.stat().st_mtime for p in persist_dir.iterdir()), default=0.0)
+    hit = _loaded.get(namespace)
+    if hit is None or hit[0] != mtime:
+        hit = (mtime, load_index(namespace))
+        _loaded[namespace] = hit
+    return hit[1]
+
+
 def get_query_engine(
     namespace: str,
     storage_root: Path | None = None,
@@ -134,8 +161,14 @@ def get_query_engine(
 ) -> Any:
     """
     获取 RAG 查询引擎：对私有索引发起自然语言查询，返回基于检索结果的回答。
+    处于请求截止时间内时，回答用的 LLM 超时收紧到剩余时间。
     示例：engine.query("总结文档的核心观点")
     """
+    from tatha.core.config import model_profile
+    from tatha.core.deadline import clamp_timeout, remaining
+
+    if remaining() is not None and "llm" not in engine_kwargs:
+        engine_kwargs["llm"] = _rag_llm(clamp_timeout(model_profile("rag").timeout))
     index = load_index(namespace=namespace, storage_root=storage_root)
     return index.as_query_engine(**engine_kwargs)
 
@@ -149,3 +182,13 @@ def get_retriever(
     """仅做检索、不做生成的 Retriever，供自定义 RAG 流程使用。"""
     index = load_index(namespace=namespace, storage_root=storage_root)
     return index.as_retriever(similarity_top_k=similarity_top_k, **kwargs)
+
+
+def embed_texts(texts: list[str]) -> list[list[float]]:
+    """
+    用与索引/检索相同的 embedding 模型（TATHA_EMBED_MODEL）批量向量化文本。
+    供职位粗筛等无需落盘索引的场景复用，保证向量空间与检索层一致。
+    """
+    if not texts:
+        return []
+    return Settings.embed_model.get_text_embedding_batch(list(texts))
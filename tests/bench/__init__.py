@@ -0,0 +1 @@
+# 离线基准：确定性替身模型 + 职位匹配压测
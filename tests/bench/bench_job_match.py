@@ -0,0 +1,202 @@
+"""
+职位匹配离线基准：用确定性替身模型（tests/bench/fake_llm.py）驱动 run_job_match_pipeline、
+arun_job_match_pipeline 与 POST /v1/jobs/match，在不同职位数 × 并发度下测量：
+端到端延迟 p50/p95/p99、每秒打分职位数、单次模型调用延迟分位、输入/输出 token 与失败数。
+
+不访问任何提供方；打分缓存强制关闭，职位为合成数据（跳过职位源与粗筛，全部进入打分）。
+
+用法:
+  uv run python -m tests.bench.bench_job_match [--jobs 10,50,200] [--concurrency 1,5,20]
+      [--targets sync,async,api] [--repeat 5] [--latency-ms 200] [--sigma 0.5] [--failure-rate 0.02]
+      [--mode llm] [--batch（仅 async / api）] [--json out.json]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+
+from tatha.jobs.schemas import JobInfo
+
+from .fake_llm import FakeLLM
+
+RESUME = (
+    "王五，6 年 Python 后端与数据平台经验，熟悉 FastAPI、Kafka、Spark、PostgreSQL，"
+    "负责过日均亿级事件的实时数仓，现居杭州，期望 30-40k，英语可作为工作语言。"
+)
+_CITIES = ("北京", "上海", "杭州", "深圳", "成都")
+_STACKS = ("Python FastAPI Redis", "Java Spring MySQL", "Go Kubernetes", "Spark Flink 数仓", "React TypeScript")
+
+
+def synthetic_jobs(n: int) -> list[JobInfo]:
+    """确定性合成职位：标题/地点/技术栈轮换，描述长度接近真实 JD。"""
+    return [
+        JobInfo(
+            title=f"后端工程师 #{i}",
+            company=f"公司{i % 37}",
+            location=_CITIES[i % len(_CITIES)],
+            description=(f"岗位职责：负责核心服务开发与性能优化。任职要求：熟悉 {_STACKS[i % len(_STACKS)]}，"
+                         f"{1 + i % 8} 年以上经验，良好的沟通能力。") * 4,
+            source="bench",
+        )
+        for i in range(n)
+    ]
+
+
+def percentile(values: list[float], p: float) -> float:
+    """线性插值分位数（p 取 0–100）。"""
+    if not values:
+        return 0.0
+    xs = sorted(values)
+    k = (len(xs) - 1) * p / 100
+    lo, hi = int(k), min(int(k) + 1, len(xs) - 1)
+    return xs[lo] + (xs[hi] - xs[lo]) * (k - lo)
+
+
+@dataclass
+class BenchResult:
+    target: str
+    jobs: int
+    concurrency: int
+    repeat: int
+    p50_s: float
+    p95_s: float
+    p99_s: float
+    jobs_per_s: float
+    call_p50_s: float
+    call_p95_s: float
+    call_p99_s: float
+    llm_calls: int
+    failures: int
+    input_tokens: int
+    output_tokens: int
+
+
+def _run_once(target: str, jobs: list[JobInfo], concurrency: int, mode: str, batch: bool, client=None) -> None:
+    """跑一次目标；职位源替换为返回本次的 jobs（调用方负责恢复 pipeline.fetch_jobs）。"""
+    from tatha.jobs import arun_job_match_pipeline, pipeline, run_job_match_pipeline
+
+    pipeline.fetch_jobs = lambda source_id, keywords, location: list(jobs)
+    if target == "sync":
+        run_job_match_pipeline(RESUME, top_n=5, mode=mode)
+    elif target == "async":
+        asyncio.run(arun_job_match_pipeline(RESUME, top_n=5, concurrency=concurrency, batch=batch, mode=mode))
+    elif target == "api":
+        r = client.post(
+            "/v1/jobs/match",
+            json={"resume_text": RESUME, "top_n": 5, "mode": mode},
+            headers={"Authorization": "Bearer bench-token"},
+        )
+        r.raise_for_status()
+    else:
+        raise ValueError(f"未知压测目标: {target}")
+
+
+def run_scenario(
+    target: str,
+    n_jobs: int,
+    concurrency: int,
+    repeat: int,
+    fake: FakeLLM,
+    mode: str = "llm",
+    batch: bool = False,
+) -> BenchResult:
+    """在替身模型下跑一个场景（目标 × 职位数 × 并发度）repeat 次。"""
+    from tatha.api import app as app_module
+    from tatha.jobs import pipeline
+
+    jobs = synthetic_jobs(n_jobs)
+    saved = (pipeline.fetch_jobs, app_module.consume, os.environ.copy())
+    # 合成职位由 _run_once 直接送入打分；API 压测不受每日配额限制；并发与批量经环境变量传给 API 路径
+    app_module.consume = lambda user_id, tier, resource: True
+    os.environ.update({
+        "TATHA_JOB_SCORE_CACHE": "false",
+        "TATHA_JOB_FUNNEL": f"none:{n_jobs}",
+        "TATHA_JOB_SCORE_CONCURRENCY": str(concurrency),
+        "TATHA_JOB_SCORE_BATCH": "true" if batch else "false",
+    })
+    client = None
+    if target == "api":
+        from fastapi.testclient import TestClient
+        client = TestClient(app_module.app)
+    walls: list[float] = []
+    try:
+        with fake.install():
+            # 预热一次（Agent 构建、tiktoken 编码表加载等一次性开销），不计入统计
+            _run_once(target, jobs[:1], concurrency, mode, batch, client)
+            fake.stats = type(fake.stats)()
+            for _ in range(repeat):
+                start = time.perf_counter()
+                _run_once(target, jobs, concurrency, mode, batch, client)
+                walls.append(time.perf_counter() - start)
+    finally:
+        pipeline.fetch_jobs, app_module.consume = saved[:2]
+        os.environ.clear()
+        os.environ.update(saved[2])
+    calls = fake.stats.latencies
+    return BenchResult(
+        target=target,
+        jobs=n_jobs,
+        concurrency=1 if target == "sync" else concurrency,
+        repeat=repeat,
+        p50_s=round(percentile(walls, 50), 4),
+        p95_s=round(percentile(walls, 95), 4),
+        p99_s=round(percentile(walls, 99), 4),
+        jobs_per_s=round(n_jobs * repeat / sum(walls), 2) if walls else 0.0,
+        call_p50_s=round(percentile(calls, 50), 4),
+        call_p95_s=round(percentile(calls, 95), 4),
+        call_p99_s=round(percentile(calls, 99), 4),
+        llm_calls=fake.stats.calls,
+        failures=fake.stats.failures,
+        input_tokens=fake.stats.input_tokens,
+        output_tokens=fake.stats.output_tokens,
+    )
+
+
+def _ints(raw: str) -> list[int]:
+    return [int(x) for x in raw.split(",") if x.strip()]
+
+
+def main(argv: list[str] | None = None) -> list[BenchResult]:
+    parser = argparse.ArgumentParser(description="职位匹配离线基准（替身模型）")
+    parser.add_argument("--jobs", default="10,50", help="职位数，逗号分隔")
+    parser.add_argument("--concurrency", default="1,5,20", help="并发度，逗号分隔（sync 目标忽略）")
+    parser.add_argument("--targets", default="sync,async,api", help="sync | async | api，逗号分隔")
+    parser.add_argument("--repeat", type=int, default=5, help="每个场景重复次数")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="单次模型调用延迟中位数（毫秒）")
+    parser.add_argument("--sigma", type=float, default=0.5, help="延迟对数正态离散度")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="单次调用失败概率")
+    parser.add_argument("--mode", default="llm", choices=("llm", "hybrid", "fast"), help="打分模式")
+    parser.add_argument("--batch", action="store_true", help="启用批量打分（仅 async / api 目标；sync 管线不支持）")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="结果另存为 JSON（便于 CI 比对）")
+    args = parser.parse_args(argv)
+    targets = [t.strip() for t in args.targets.split(",") if t.strip()]
+    if args.batch and "sync" in targets:
+        parser.error("--batch 不适用于 sync 目标（同步管线不支持批量打分），请用 --targets async,api")
+
+    fake = FakeLLM(args.latency_ms, args.sigma, args.failure_rate, args.seed)
+    results: list[BenchResult] = []
+    header = f"{'target':<6} {'jobs':>5} {'conc':>4} {'p50':>8} {'p95':>8} {'p99':>8} {'jobs/s':>8} {'call p95':>9} {'calls':>6} {'fail':>5} {'in tok':>9} {'out tok':>8}"
+    print(header)
+    for target in targets:
+        for n in _ints(args.jobs):
+            for c in ([1] if target == "sync" else _ints(args.concurrency)):
+                r = run_scenario(target, n, c, args.repeat, fake, mode=args.mode, batch=args.batch)
+                results.append(r)
+                print(
+                    f"{r.target:<6} {r.jobs:>5} {r.concurrency:>4} {r.p50_s:>8.3f} {r.p95_s:>8.3f} {r.p99_s:>8.3f} "
+                    f"{r.jobs_per_s:>8.1f} {r.call_p95_s:>9.3f} {r.llm_calls:>6} {r.failures:>5} "
+                    f"{r.input_tokens:>9} {r.output_tokens:>8}"
+                )
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump([asdict(r) for r in results], f, ensure_ascii=False, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+确定性替身模型：基于 PydanticAI FunctionModel，替换 tatha.jobs.scoring 与 tatha.agents.document_agents 中
+Agent 的模型，不访问任何提供方。
+
+- 输出：按 Agent 的 output_type（final_result 工具 schema）生成合法结构；打分由输入内容哈希决定，同输入同输出。
+- 延迟：对数正态分布（中位数 latency_ms、离散度 sigma），可设 0 关闭。
+- 失败：以 failure_rate 概率抛出异常（模拟限流/超时），走与真实调用相同的失败路径。
+- 计量：调用次数、失败次数、每次调用延迟与输入/输出 token（tatha.core.tokens.count_tokens，报告时统计）。
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from tatha.core.tokens import count_tokens
+
+# JobMatchScore 子维度上限（与 schema 一致），替身按哈希在范围内取值
+_SCORE_FIELDS = {
+    "background_match": 10,
+    "skills_overlap": 30,
+    "experience_relevance": 30,
+    "seniority": 10,
+    "language_requirement": 10,
+    "company_score": 10,
+    "salary_match": 10,
+    "location_match": 10,
+    "culture_workload_match": 10,
+}
+_BATCH_MARK = re.compile(r"【职位 (\d+)】")
+
+
+class FakeLLMError(RuntimeError):
+    """替身模型按 failure_rate 注入的失败。"""
+
+
+@dataclass
+class FakeLLMStats:
+    calls: int = 0
+    failures: int = 0
+    latencies: list[float] = field(default_factory=list)
+    # 输入/输出文本先收集、报告时再计 token：tiktoken 可能在加载编码表时访问网络，不能放在计时路径上
+    inputs: list[str] = field(default_factory=list)
+    outputs: list[str] = field(default_factory=list)
+
+    @property
+    def input_tokens(self) -> int:
+        return count_tokens("\n".join(self.inputs))
+
+    @property
+    def output_tokens(self) -> int:
+        return count_tokens("\n".join(self.outputs))
+
+
+def _digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def _score_dict(seed_text: str) -> dict:
+    d = _digest(seed_text)
+    out = {name: d[i] % (hi + 1) for i, (name, hi) in enumerate(_SCORE_FIELDS.items())}
+    out["overall"] = min(100, sum(out.values()) * 100 // sum(_SCORE_FIELDS.values()))
+    out["summary"] = "fake"
+    return out
+
+
+class FakeLLM:
+    """可配置延迟与失败率的确定性替身模型；install() 期间所有打分/文档智能体改用它。"""
+
+    def __init__(self, latency_ms: float = 200.0, sigma: float = 0.5, failure_rate: float = 0.0, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.sigma = sigma
+        self.failure_rate = failure_rate
+        self.stats = FakeLLMStats()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _sample(self) -> tuple[float, bool]:
+        with self._lock:
+            delay = self._rng.lognormvariate(0, self.sigma) * self.latency_ms / 1000 if self.latency_ms > 0 else 0.0
+            fail = self._rng.random() < self.failure_rate
+        return delay, fail
+
+    def _output(self, prompt: str, schema: dict) -> dict:
+        props = schema.get("properties", {})
+        if "response" in props:
+            # list[...] 输出被包成 {"response": [...]}：批量打分按【职位 i】标记逐条生成
+            indices = [int(i) for i in _BATCH_MARK.findall(prompt)] or [0]
+            return {"response": [{"job_index": i, **_score_dict(f"{prompt}#{i}")} for i in indices]}
+        if "overall" in props:
+            return _score_dict(prompt)
+        # 文档解读类（字段均可选）：返回空结构即合法
+        return {}
+
+    async def _respond(self, messages, info):
+        from pydantic_ai.messages import ModelResponse, ToolCallPart
+
+        parts = [part for message in messages for part in message.parts]
+        # 只用用户消息决定输出（系统提示词中的【职位 0】示例不算）；token 计量含系统提示词
+        prompt = "\n".join(str(p.content) for p in parts if p.part_kind == "user-prompt")
+        full = "\n".join(str(getattr(p, "content", "")) for p in parts)
+        start = time.perf_counter()
+        delay, fail = self._sample()
+        await asyncio.sleep(delay)
+        elapsed = time.perf_counter() - start
+        tool = info.output_tools[0]
+        args = self._output(prompt, tool.parameters_json_schema)
+        with self._lock:
+            self.stats.calls += 1
+            self.stats.inputs.append(full)
+            self.stats.latencies.append(elapsed)
+            if fail:
+                self.stats.failures += 1
+            else:
+                self.stats.outputs.append(json.dumps(args, ensure_ascii=False))
+        if fail:
+            raise FakeLLMError("fake provider error (injected)")
+        return ModelResponse(parts=[ToolCallPart(tool.name, args)])
+
+    def model(self, task: str | None = None):
+        from pydantic_ai.models.function import FunctionModel
+        return FunctionModel(self._respond, model_name="fake")
+
+    @contextmanager
+    def install(self):
+        """替换各模块的 _model 工厂并清空已缓存的 Agent 单例，退出时恢复。"""
+        from tatha.agents import document_agents
+        from tatha.jobs import scoring
+
+        saved = (scoring._model, scoring._agent, scoring._batch_agent, document_agents._model, dict(document_agents._agents))
+        scoring._model = document_agents._model = self.model
+        scoring._agent = scoring._batch_agent = None
+        document_agents._agents.clear()
+        try:
+            yield self
+        finally:
+            scoring._model, scoring._agent, scoring._batch_agent, document_agents._model = saved[:4]
+            document_agents._agents.clear()
+            document_agents._agents.update(saved[4])
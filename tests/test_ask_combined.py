@@ -0,0 +1,103 @@
+"""
+/v1/ask 合并模式：一次结构化输出同时返回意图与文档解读（按 intent 区分的联合类型），失败时回退两步路径（不调用真实 LLM）。
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from pydantic_ai.models.test import TestModel
+
+from tatha.agents import document_agents
+from tatha.api import central_brain
+from tatha.api.schemas import AskRequest
+
+POEM = "请赏析：床前明月光，疑是地上霜。举头望明月，低头思故乡。"
+
+
+def _resp(content: str):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+@pytest.fixture(autouse=True)
+def _llm_intent(monkeypatch):
+    monkeypatch.setenv("TATHA_LLM_CACHE", "false")
+    monkeypatch.setenv("TATHA_DOCUMENT_ANALYSIS_BACKEND", "pydantic_ai")
+    monkeypatch.setattr(central_brain, "use_llm_intent", lambda: True)
+    monkeypatch.setattr(document_agents, "_agents", {})
+
+
+def _combined_model(monkeypatch, output: dict):
+    monkeypatch.setattr(document_agents, "_model", lambda task=None: TestModel(custom_output_args=output))
+
+
+def test_combined_call_returns_intent_and_analysis(monkeypatch):
+    async def _no_llm(**kwargs):
+        raise AssertionError("合并模式下不应再单独解析意图")
+
+    _combined_model(monkeypatch, {"result": {"intent": "poetry", "confidence": 0.9, "analysis": {"title": "静夜思", "author": "李白"}}})
+    monkeypatch.setattr(central_brain, "llm_acompletion", _no_llm)
+    monkeypatch.setattr(central_brain, "_document_analysis", lambda *a: pytest.fail("合并模式下不应再单独解读文档"))
+    resp = asyncio.run(central_brain.ahandle_ask(AskRequest(message=POEM)))
+    assert resp.intent == "poetry" and resp.result["confidence"] == 0.9
+    assert resp.result["status"] == "ok" and resp.result["extracted"]["author"] == "李白"
+
+
+def test_combined_failure_falls_back_to_two_steps(monkeypatch):
+    def _boom(task=None):
+        raise RuntimeError("down")
+
+    async def _intent(**kwargs):
+        return _resp('{"intent": "poetry", "confidence": 0.8}')
+
+    calls = []
+    monkeypatch.setattr(document_agents, "_model", _boom)
+    monkeypatch.setattr(central_brain, "llm_acompletion", _intent)
+    monkeypatch.setattr(central_brain, "_document_analysis", lambda dtype, text: calls.append(dtype) or {"title": "静夜思"})
+    resp = asyncio.run(central_brain.ahandle_ask(AskRequest(message=POEM)))
+    assert resp.intent == "poetry" and resp.result["extracted"] == {"title": "静夜思"}
+    assert calls == ["poetry"]
+
+
+def test_combined_mode_disabled_uses_two_steps(monkeypatch):
+    async def _intent(**kwargs):
+        return _resp('{"intent": "job_match", "confidence": 0.7}')
+
+    monkeypatch.setenv("TATHA_ASK_COMBINED", "false")
+    monkeypatch.setattr(document_agents, "_model", lambda task=None: pytest.fail("关闭合并模式时不应调用合并智能体"))
+    monkeypatch.setattr(central_brain, "llm_acompletion", _intent)
+    intent, confidence, _, extracted = asyncio.run(
+        central_brain._aresolve_intent(POEM, combined=central_brain.ask_combined_enabled())
+    )
+    assert (intent, confidence, extracted) == ("job_match", 0.7, None)
+
+
+def test_short_queries_skip_combined_call(monkeypatch):
+    intents = iter(['{"intent": "poetry", "confidence": 0.9}', '{"intent": "credit", "confidence": 0.9}', '{"intent": "job_match", "confidence": 0.9}'])
+    calls = []
+
+    async def _intent(**kwargs):
+        calls.append(kwargs["task"])
+        return _resp(next(intents))
+
+    monkeypatch.setattr(document_agents, "_model", lambda task=None: pytest.fail("短句查询不应走合并调用"))
+    monkeypatch.setattr(central_brain, "llm_acompletion", _intent)
+    # 「推荐一句诗」需注入随机主题再解读、「查一下征信」无正文、求职短句无需解读：均走意图分类任务
+    for message in ("来一句关于月亮的诗", "帮我查一下信用", "有没有后端的机会"):
+        asyncio.run(central_brain._aresolve_intent(message, combined=True))
+    assert calls == ["intent"] * 3
+
+
+def test_combined_call_queues_at_high_priority(monkeypatch):
+    from tatha.agents.schemas import IntentDocumentAnalysis
+    from tatha.core.ratelimit import current_priority
+
+    seen = []
+
+    async def _combined(text):
+        seen.append(current_priority())
+        return IntentDocumentAnalysis.model_validate({"result": {"intent": "resume_upload", "analysis": {"name": "张三"}}})
+
+    monkeypatch.setattr("tatha.agents.arun_intent_document_analysis", _combined)
+    out = asyncio.run(central_brain._aresolve_intent("简历：张三，五年 Python 经验", combined=True))
+    assert out[0] == "resume_upload" and out[3]["name"] == "张三"
+    assert seen == ["high"]
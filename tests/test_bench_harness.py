@@ -0,0 +1,36 @@
+"""
+离线基准：替身模型确定性输出、失败注入与压测场景统计（零延迟，秒级完成）。
+"""
+import asyncio
+
+from tatha.jobs import scoring
+from tests.bench.bench_job_match import percentile, run_scenario
+from tests.bench.fake_llm import FakeLLM
+
+
+def test_fake_llm_is_deterministic(monkeypatch):
+    monkeypatch.setenv("TATHA_JOB_SCORE_CACHE", "false")
+    with FakeLLM(latency_ms=0).install():
+        a = asyncio.run(scoring.ascore_resume_vs_job("简历", "职位"))
+        b = asyncio.run(scoring.ascore_resume_vs_job("简历", "职位"))
+    assert a == b and a.summary == "fake"
+
+
+def test_fake_llm_failure_goes_through_failed_score(monkeypatch):
+    monkeypatch.setenv("TATHA_JOB_SCORE_CACHE", "false")
+    with FakeLLM(latency_ms=0, failure_rate=1.0).install() as fake:
+        score = asyncio.run(scoring.ascore_resume_vs_job("简历", "职位"))
+    assert scoring.is_failed_score(score) and fake.stats.failures == 1
+
+
+def test_run_scenario_reports_stats():
+    fake = FakeLLM(latency_ms=0)
+    r = run_scenario("async", 6, 3, 2, fake)
+    assert r.llm_calls == 12 and r.failures == 0
+    assert r.jobs_per_s > 0 and r.input_tokens > 0 and r.output_tokens > 0
+    assert r.p50_s <= r.p95_s <= r.p99_s
+
+
+def test_percentile_interpolates():
+    assert percentile([1, 2, 3, 4], 50) == 2.5
+    assert percentile([], 99) == 0.0
@@ -0,0 +1,120 @@
+"""
+请求级截止时间：嵌套收紧、LLM 调用超时收紧到剩余时间且到期不重试、/v1/ask 到期返回部分结果或超时状态（不调用真实 LLM）。
+"""
+import asyncio
+import time
+from types import SimpleNamespace
+
+import litellm
+import pytest
+
+from tatha.api import central_brain
+from tatha.api.quota import clamp_deadline
+from tatha.api.schemas import AskRequest
+from tatha.core import llm
+from tatha.core.deadline import DeadlineExceeded, clamp_timeout, deadline_scope, expired, remaining
+from tatha.jobs import scoring
+
+
+def _resp(content: str):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+@pytest.fixture(autouse=True)
+def _rules_intent(monkeypatch):
+    monkeypatch.setattr(central_brain, "use_llm_intent", lambda: False)
+    monkeypatch.setenv("TATHA_LLM_CACHE", "false")
+
+
+def test_deadline_scope_nests_and_clamps():
+    assert remaining() is None and clamp_timeout(5) == 5
+    with deadline_scope(1.0):
+        with deadline_scope(10.0):
+            assert 0 < clamp_timeout(5) <= 1.0
+        with deadline_scope(0):
+            assert expired()
+            with pytest.raises(DeadlineExceeded):
+                clamp_timeout(5)
+    assert remaining() is None
+
+
+def test_clamp_deadline_caps_header_to_tier(monkeypatch):
+    assert clamp_deadline("free", None) == 15.0
+    assert clamp_deadline("free", 5) == 5
+    assert clamp_deadline("free", 600) == 15.0
+    monkeypatch.setenv("TATHA_ASK_DEADLINE_PRO", "90")
+    assert clamp_deadline("pro", 600) == 90.0
+
+
+def test_acompletion_timeout_clamped_to_deadline(monkeypatch):
+    calls = []
+
+    async def _fake(**kwargs):
+        calls.append(kwargs)
+        return _resp("ok")
+
+    async def _go():
+        with deadline_scope(0.5):
+            # 不合并时单次超时收紧到剩余时间；合并调用的上游不带截止时间，由各等待方自行限时（见 test_llm_singleflight）
+            await llm.acompletion(
+                model="openai/x", messages=[{"role": "user", "content": "hi"}], timeout=60, coalesce=False
+            )
+
+    monkeypatch.setattr(litellm, "acompletion", _fake)
+    asyncio.run(_go())
+    assert 0 < calls[0]["timeout"] <= 0.5
+
+
+def test_acompletion_gives_up_at_deadline(monkeypatch):
+    calls = []
+
+    async def _hang(**kwargs):
+        calls.append(kwargs)
+        await asyncio.sleep(10)
+
+    async def _go():
+        with deadline_scope(0.1):
+            await llm.acompletion(model="openai/x", timeout=5, max_retries=3)
+
+    monkeypatch.setattr(litellm, "acompletion", _hang)
+    monkeypatch.setattr(llm, "backoff_delay", lambda attempt: 0.0)
+    start = time.perf_counter()
+    with pytest.raises(TimeoutError):
+        asyncio.run(_go())
+    assert time.perf_counter() - start < 1.0
+    # 到期后不再重试（DeadlineExceeded 不可重试）
+    assert len(calls) == 1
+
+
+def test_ask_document_analysis_times_out(monkeypatch):
+    monkeypatch.setattr(central_brain, "_document_analysis", lambda dtype, text: time.sleep(0.3) or {"name": "张三"})
+    resp = asyncio.run(central_brain.ahandle_ask(AskRequest(message="解析简历：张三，五年 Python 经验"), timeout=0.05))
+    assert resp.intent == "resume_upload"
+    assert resp.result["status"] == "timeout" and resp.result["deadline_exceeded"] is True
+
+
+def test_ask_job_match_returns_partial_results(monkeypatch):
+    class _SlowAgent:
+        calls = 0
+
+        async def run(self, message):
+            # 第一条很快打完，其余超出时间预算
+            _SlowAgent.calls += 1
+            if _SlowAgent.calls > 1:
+                await asyncio.sleep(10)
+            return SimpleNamespace(output=scoring.JobMatchScore(overall=80, summary="匹配"))
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("TATHA_JOB_SCORE_MODE", "llm")
+    monkeypatch.setenv("TATHA_JOB_SCORE_BATCH", "false")
+    monkeypatch.setenv("TATHA_JOB_SCORE_CACHE", "false")
+    monkeypatch.setattr(scoring, "_agent", _SlowAgent())
+    start = time.perf_counter()
+    resp = asyncio.run(
+        central_brain.ahandle_ask(AskRequest(message="帮我匹配职位", resume_text="Python 工程师"), timeout=0.2)
+    )
+    assert time.perf_counter() - start < 1.5
+    assert resp.result["status"] == "partial" and resp.result["deadline_exceeded"] is True
+    # 只返回截止前已完成打分的条目，不以失败分补位
+    matches = resp.result["matches"]
+    assert [m["score"]["overall"] for m in matches] == [80]
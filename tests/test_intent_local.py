@@ -0,0 +1,97 @@
+"""
+本地意图分类：关键词多模式匹配（长关键词优先、歧义低置信度）、示例句向量最近邻，以及中央大脑只在本地判定不了时才调用 LLM。
+"""
+import asyncio
+from types import SimpleNamespace
+
+from tatha.api import central_brain
+from tatha.api.intent_local import EmbeddingIntentIndex, KeywordIntentMatcher
+
+
+def _resp(content: str):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def _bag_of_chars(texts):
+    """测试用 embedding：字符袋向量，不加载模型。"""
+    vocab = sorted({c for t in central_brain.INTENT_EXAMPLES.values() for s in t for c in s})
+    return [[t.count(c) for c in vocab] for t in texts]
+
+
+def test_keyword_matcher_prefers_longer_keywords():
+    matcher = KeywordIntentMatcher(central_brain.INTENT_KEYWORDS, central_brain.INTENT_PATTERNS)
+    # 「推荐一句」比 job_match 的「推荐」更具体
+    assert matcher.classify("推荐一句诗") == ("poetry", 1.0)
+    assert matcher.classify("帮我匹配职位") == ("job_match", 1.0)
+    assert matcher.classify("我想换份工作")[0] == "job_match"
+    # 两个意图命中相当：置信度低，交给 LLM
+    assert matcher.classify("我的简历适合什么职位")[1] < 0.5
+    assert matcher.classify("今天天气不错") == ("unknown", 0.0)
+
+
+def test_keyword_matcher_weak_negated_and_mixed_messages():
+    matcher = KeywordIntentMatcher(central_brain.INTENT_KEYWORDS, central_brain.INTENT_PATTERNS)
+    threshold = 0.85
+    # 否定：「不想找工作」不计为求职
+    assert matcher.classify("我不想找工作，想读首诗") == ("unknown", 0.0)
+    assert matcher.classify("别推荐了，来一首唐诗")[0] == "poetry"
+    # 「能不能」不是否定
+    assert matcher.classify("能不能推荐几个岗位")[0] == "job_match"
+    # 单个短关键词：弱信号，不单独跳过 LLM
+    assert matcher.classify("找工作") == ("job_match", 0.75)
+    # 两个不同关键词或长关键词：强信号
+    assert matcher.classify("我想找工作，有没有适合的岗位")[1] >= threshold
+    # 混合意图：置信度低，交给 LLM
+    assert matcher.classify("帮我匹配职位，再推荐一句诗")[1] < threshold
+    assert matcher.classify("上传简历后帮我查征信")[1] < threshold
+
+
+def test_embedding_index_nearest_neighbour():
+    calls = []
+
+    def _embed(texts):
+        calls.append(len(texts))
+        return _bag_of_chars(texts)
+
+    index = EmbeddingIntentIndex(central_brain.INTENT_EXAMPLES, _embed)
+    intent, confidence = index.classify("这份信用报告有没有不良记录")
+    assert intent == "credit" and 0 < confidence <= 1
+    index.classify("你好")
+    # 示例句只向量化一次，之后每次只向量化输入
+    assert calls[0] == sum(len(v) for v in central_brain.INTENT_EXAMPLES.values()) and calls[1:] == [1, 1]
+
+
+def test_confident_local_intent_skips_llm(monkeypatch):
+    async def _should_not_run(**kwargs):
+        raise AssertionError("本地已判定，不应调用 LLM")
+
+    monkeypatch.setattr(central_brain, "use_llm_intent", lambda: True)
+    monkeypatch.setattr(central_brain, "llm_acompletion", _should_not_run)
+    assert asyncio.run(central_brain.aparse_intent("帮我匹配职位")) == ("job_match", 1.0, {})
+
+
+def test_ambiguous_message_escalates_to_llm(monkeypatch):
+    calls = []
+
+    async def _fake(**kwargs):
+        calls.append(kwargs)
+        return _resp('{"intent": "job_match", "confidence": 0.95}')
+
+    monkeypatch.setattr(central_brain, "use_llm_intent", lambda: True)
+    monkeypatch.setattr(central_brain, "llm_acompletion", _fake)
+    assert asyncio.run(central_brain.aparse_intent("我的简历适合什么职位")) == ("job_match", 0.95, {})
+    assert len(calls) == 1
+
+
+def test_embedding_layer_resolves_before_llm(monkeypatch):
+    async def _should_not_run(**kwargs):
+        raise AssertionError("向量层已判定，不应调用 LLM")
+
+    monkeypatch.setenv("TATHA_INTENT_EMBED", "true")
+    monkeypatch.setenv("TATHA_INTENT_LOCAL_THRESHOLD", "0.3")
+    monkeypatch.setattr(central_brain, "_embedding_failed", False)
+    monkeypatch.setattr(central_brain, "_embedding_index", lambda: EmbeddingIntentIndex(central_brain.INTENT_EXAMPLES, _bag_of_chars))
+    monkeypatch.setattr(central_brain, "use_llm_intent", lambda: True)
+    monkeypatch.setattr(central_brain, "llm_acompletion", _should_not_run)
+    intent, confidence, _ = asyncio.run(central_brain.aparse_intent("李白写过哪些月亮的作品"))
+    assert intent == "poetry" and confidence >= 0.3
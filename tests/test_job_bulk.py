@@ -0,0 +1,74 @@
+"""
+批量矩阵匹配：内积 Top-K、每职位候选数、JSONL 增量写入（不调用真实 LLM / embedding）。
+"""
+import asyncio
+import json
+
+import numpy as np
+
+from tatha.jobs import bulk
+from tatha.jobs.schemas import JobInfo, JobMatchScore, ResumeInput
+
+RESUMES = [ResumeInput(id="py", text="python"), ResumeInput(id="java", text="java"), ResumeInput(id="go", text="go")]
+JOBS = [JobInfo(title="Python", company="A"), JobInfo(title="Java", company="B")]
+# 简历与职位各自落在一个坐标轴上：python→e0，java→e1，go→e2
+_VECS = {"python": [1, 0, 0], "java": [0, 1, 0], "go": [0, 0, 1]}
+
+
+def _fake_embed(texts):
+    return np.array([next(v for k, v in _VECS.items() if k in t.lower()) for t in texts], dtype=np.float32)
+
+
+def test_inner_product_top_k_matches_bruteforce():
+    rng = np.random.default_rng(0)
+    q, b = bulk._normalize(rng.normal(size=(4, 8))), bulk._normalize(rng.normal(size=(10, 8)))
+    sims, idx = bulk.inner_product_top_k(q, b, 3)
+    expected = np.argsort(-(q @ b.T), axis=1)[:, :3]
+    assert (idx == expected).all()
+    assert np.all(np.diff(sims, axis=1) <= 0)
+
+
+def test_bulk_scores_only_top_k_per_job_and_writes_jsonl(monkeypatch, tmp_path):
+    monkeypatch.setenv("TATHA_JOB_SCORE_CACHE", "false")
+    calls = []
+
+    async def _score(resume_text, job_description, timeout=None):
+        calls.append(resume_text)
+        return JobMatchScore(overall=80)
+
+    monkeypatch.setattr(bulk, "embed", _fake_embed)
+    monkeypatch.setattr(bulk, "ascore_resume_vs_job", _score)
+    out = tmp_path / "m.jsonl"
+    n = asyncio.run(bulk.abulk_match_to_jsonl(out, RESUMES, JOBS, top_k=1, mode="llm"))
+    assert n == 2 and len(calls) == 2
+    rows = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert {(r["job_index"], r["resume_id"]) for r in rows} == {(0, "py"), (1, "java")}
+    assert all(r["similarity"] == 1.0 for r in rows)
+
+
+def test_bulk_profiles_run_concurrently_at_low_priority(monkeypatch):
+    from tatha.core.ratelimit import current_priority
+
+    monkeypatch.setenv("TATHA_JOB_SCORE_CACHE", "false")
+    seen, active, peak = [], [0], [0]
+
+    async def _profile(text):
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        seen.append(current_priority())
+        await asyncio.sleep(0.01)
+        active[0] -= 1
+        return text
+
+    async def _score(resume_text, job_description, timeout=None):
+        return JobMatchScore(overall=80)
+
+    monkeypatch.setattr(bulk, "embed", _fake_embed)
+    monkeypatch.setattr(bulk, "aresume_for_scoring", _profile)
+    monkeypatch.setattr(bulk, "ascore_resume_vs_job", _score)
+
+    async def _run():
+        return [r async for r in bulk.abulk_match(RESUMES, JOBS, top_k=3, mode="llm", concurrency=2)]
+
+    assert len(asyncio.run(_run())) == 6
+    assert seen == ["low"] * 3 and peak[0] == 2
@@ -0,0 +1,51 @@
+"""
+反向匹配（职位 → 候选人）：检索结果排序与可选打分（不加载真实索引、不调用 LLM）。
+"""
+import asyncio
+import sys
+from types import SimpleNamespace
+
+from tatha.jobs import candidates
+from tatha.jobs.schemas import JobInfo, JobMatchScore
+
+JOB = JobInfo(title="Python 后端", company="A", description="FastAPI Redis")
+HITS = [("alice.md", "Java 工程师", "Java", 0.9), ("bob.md", "Python FastAPI Redis", "FastAPI", 0.8)]
+
+
+def test_candidates_ranked_by_similarity_without_rescore(monkeypatch):
+    monkeypatch.setattr(candidates, "_retrieve", lambda query, k: HITS[:k])
+    result = asyncio.run(candidates.arank_candidates(JOB, top_k=2))
+    assert [c.candidate_id for c in result] == ["alice.md", "bob.md"]
+    assert all(c.score is None for c in result)
+
+
+def test_candidates_rescored_and_reranked(monkeypatch):
+    async def _score(resume_text, job_description, timeout=None):
+        return JobMatchScore(overall=90 if "Python" in resume_text else 40)
+
+    monkeypatch.setenv("TATHA_JOB_SCORE_CACHE", "false")
+    monkeypatch.setattr(candidates, "_retrieve", lambda query, k: HITS[:k])
+    monkeypatch.setattr(candidates, "ascore_resume_vs_job", _score)
+    result = asyncio.run(candidates.arank_candidates(JOB, top_k=2, rescore=True, mode="llm"))
+    assert [c.candidate_id for c in result] == ["bob.md", "alice.md"]
+    assert result[0].score.overall == 90
+
+
+def test_retrieve_returns_best_chunk_as_excerpt(monkeypatch):
+    def _node(doc, text):
+        return SimpleNamespace(ref_doc_id=doc, node_id=text, get_content=lambda: text)
+
+    # 按 L2 距离升序：bob 的第二段命中最近，其首段排在后面
+    hits = [SimpleNamespace(node=_node("bob", "熟悉 FastAPI"), score=0.2), SimpleNamespace(node=_node("bob", "教育经历"), score=0.6)]
+    nodes = {"bob": [_node("bob", "教育经历"), _node("bob", "熟悉 FastAPI")]}
+    docstore = SimpleNamespace(
+        get_ref_doc_info=lambda doc: SimpleNamespace(node_ids=[doc], metadata={"file_name": f"{doc}.md"}),
+        get_nodes=lambda ids: nodes[ids[0]],
+    )
+    index = SimpleNamespace(
+        as_retriever=lambda similarity_top_k: SimpleNamespace(retrieve=lambda q: hits), docstore=docstore
+    )
+    monkeypatch.setitem(sys.modules, "tatha.retrieval", SimpleNamespace(load_index_cached=lambda ns: index))
+    [(name, full, excerpt, sim)] = candidates._retrieve("Python 后端", 1)
+    assert (name, excerpt, sim) == ("bob.md", "熟悉 FastAPI", 0.9)
+    assert full == "教育经历\n熟悉 FastAPI"
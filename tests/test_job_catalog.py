@@ -0,0 +1,96 @@
+"""
+本地职位目录：入库去重、中文关键词/地点检索、新鲜度与流水线接入。
+"""
+from tatha.jobs import catalog as catalog_mod
+from tatha.jobs import pipeline
+from tatha.jobs.catalog import JobCatalog
+from tatha.jobs.schemas import JobInfo
+from tatha.jobs.sources import registry
+from tatha.jobs.sources.mock import MockJobSource
+
+
+def test_ingest_dedupes_by_url_and_content(tmp_path):
+    cat = JobCatalog(tmp_path / "c.sqlite3")
+    jobs = [
+        JobInfo(title="Python 后端", company="A", url="https://x/1", source="mock"),
+        JobInfo(title="Python 后端（更新）", company="A", url="https://x/1", source="mock"),
+        JobInfo(title="数据工程师", company="B", description="Spark", source="mock"),
+        JobInfo(title="数据工程师", company="B", description="Spark", source="mock"),
+    ]
+    assert cat.ingest("mock", jobs) == 2
+    assert cat.ingest("mock", jobs) == 2
+    assert cat.count() == 2
+    assert "mock" in cat.freshness()
+
+
+def test_search_keywords_and_location(tmp_path):
+    """长关键词走 FTS，短中文词走 LIKE；地点过滤；无关键词按最近出现返回。"""
+    cat = JobCatalog(tmp_path / "c.sqlite3")
+    cat.ingest("mock", MockJobSource().fetch_jobs())
+    titles = [j.title for j in cat.search(keywords="PyTorch")]
+    assert titles == ["机器学习工程师"]
+    titles = {j.title for j in cat.search(keywords="数仓 爬虫")}
+    assert titles == {"数据工程师", "全栈开发工程师"}
+    assert [j.title for j in cat.search(keywords="Python", location="杭州")] == ["数据工程师"]
+    assert len(cat.search(limit=3)) == 3
+    assert cat.search(sources=["apify_linkedin"]) == []
+
+
+def test_pipeline_reads_catalog_instead_of_source(tmp_path, monkeypatch):
+    """启用目录后流水线查询目录：首次冷启动入库一次，之后不再调用职位源。"""
+    monkeypatch.setenv("TATHA_JOB_CATALOG", "true")
+    monkeypatch.setattr(catalog_mod, "_catalog", JobCatalog(tmp_path / "c.sqlite3"))
+    monkeypatch.setattr(registry, "_instances", {})
+    calls = []
+    original = MockJobSource.fetch_jobs
+
+    def counting_fetch(self, limit=50):
+        calls.append(limit)
+        return original(self, limit)
+
+    monkeypatch.setattr(MockJobSource, "fetch_jobs", counting_fetch)
+    jobs = pipeline.fetch_jobs("mock", "Python", "远程")
+    assert {j.title for j in jobs} == {"Python 后端工程师"}
+    pipeline.fetch_jobs("mock", None, None)
+    assert len(calls) == 1
+
+
+def test_failed_source_backs_off_instead_of_blocking_requests(tmp_path, monkeypatch):
+    """入库失败记录尝试时间：退避期内请求路径与调度都不再拉取；过了退避再试。"""
+    monkeypatch.setenv("TATHA_JOB_CATALOG", "true")
+    cat = JobCatalog(tmp_path / "c.sqlite3")
+    monkeypatch.setattr(catalog_mod, "_catalog", cat)
+    monkeypatch.setattr(registry, "_instances", {})
+    calls = []
+
+    def failing_fetch(self, limit=50):
+        calls.append(limit)
+        raise RuntimeError("actor down")
+
+    monkeypatch.setattr(MockJobSource, "fetch_jobs", failing_fetch)
+    assert pipeline.fetch_jobs("mock", None, None) == []
+    assert pipeline.fetch_jobs("mock", None, None) == []
+    assert catalog_mod.refresh_stale_sources(cat, ["mock"]) == {}
+    assert len(calls) == 1 and cat.freshness() == {"mock": None}
+
+    cat._conn.execute("UPDATE source_state SET last_attempt_at = last_attempt_at - 601")
+    assert catalog_mod.refresh_stale_sources(cat, ["mock"], limit=7) == {"mock": 0}
+    assert calls == [500, 7]
+
+
+def test_ingest_bypasses_source_ttl_cache(tmp_path, monkeypatch):
+    """入库直接调用底层源：TTL 缓存中的旧结果不会被当作新拉取入库。"""
+    monkeypatch.setenv("TATHA_JOB_SOURCE_CACHE_TTL", "600")
+    monkeypatch.setattr(registry, "_instances", {})
+    calls = []
+    original = MockJobSource.fetch_jobs
+
+    def counting_fetch(self, limit=50):
+        calls.append(limit)
+        return original(self, limit)
+
+    monkeypatch.setattr(MockJobSource, "fetch_jobs", counting_fetch)
+    registry.get_job_source("mock").fetch_jobs(limit=50)
+    cat = JobCatalog(tmp_path / "c.sqlite3")
+    assert cat.ingest_from_source("mock", limit=50) > 0
+    assert len(calls) == 2
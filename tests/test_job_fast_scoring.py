@@ -0,0 +1,61 @@
+"""
+本地快速打分：确定性、无 LLM，技能/地点/职级维度与 hybrid 回退。
+"""
+import asyncio
+
+from tatha.jobs import pipeline
+from tatha.jobs.fast_scoring import _level, fast_score_jobs, fast_shortlist
+from tatha.jobs.schemas import JobInfo, JobMatchScore
+
+RESUME = "张三，5 年 Python 后端开发经验，熟悉 FastAPI、Redis、Docker，现居上海，期望 25-35k，英语 CET-6。"
+JOBS = [
+    JobInfo(title="高级 Python 后端工程师", company="A", location="上海",
+            description="负责 FastAPI 服务开发，熟悉 Redis、Docker，3 年以上经验，薪资 30-45k"),
+    JobInfo(title="Java 开发工程师", company="B", location="北京",
+            description="Spring、MySQL、Kafka，要求 996 抗压"),
+    JobInfo(title="算法实习生", company="C", location="深圳", description="PyTorch 深度学习，应届生"),
+]
+
+
+def test_fast_scores_are_deterministic_and_ranked():
+    first = fast_score_jobs(RESUME, JOBS)
+    assert [s.model_dump() for s in first] == [s.model_dump() for s in fast_score_jobs(RESUME, JOBS)]
+    assert first[0].overall > first[1].overall and first[0].overall > first[2].overall
+    assert {"fastapi", "redis", "docker", "python"} <= set(first[0].keywords)
+    assert first[0].location_match == 10 and first[1].location_match == 2
+    assert first[1].culture_workload_match < first[0].culture_workload_match
+    assert first[2].seniority < first[0].seniority
+
+
+def test_fast_shortlist_keeps_best():
+    assert [j.company for j in fast_shortlist(RESUME, JOBS, 1)] == ["A"]
+
+
+def test_hybrid_falls_back_to_fast_on_llm_failure(monkeypatch):
+    async def _failing(resume_text, job_description, timeout=None):
+        return JobMatchScore(overall=0, summary="打分失败: provider down")
+
+    monkeypatch.setattr(pipeline, "ascore_resume_vs_job", _failing)
+    results, total = asyncio.run(pipeline.arun_job_match_pipeline(RESUME, top_n=5, source_id="mock", mode="hybrid"))
+    assert total == 5
+    assert all(r.score.summary.startswith("快速匹配") for r in results)
+
+
+def test_fast_mode_skips_llm(monkeypatch):
+    async def _boom(*args, **kwargs):
+        raise AssertionError("fast 模式不应调用 LLM")
+
+    monkeypatch.setattr(pipeline, "ascore_resume_vs_job", _boom)
+    results, total = asyncio.run(pipeline.arun_job_match_pipeline(RESUME, top_n=3, source_id="mock", mode="fast"))
+    assert total == 5 and len(results) == 3
+
+
+def test_level_ignores_calendar_years_and_substrings():
+    # 任职起止年份不是工作年限
+    assert _level("2019年-2023年 某公司 Python 开发") is None
+    assert _level("19年毕业，2 年工作经验") == 1
+    assert _level("5年以上经验") == 3
+    # 英文职级词按整词匹配；「负责人」不再视为专家/管理
+    assert _level("Office near headquarters") is None
+    assert _level("项目负责人之一") is None
+    assert _level("Head of Data") == 4
@@ -0,0 +1,77 @@
+"""
+简历×职位打分缓存：命中/未命中、TTL、容量淘汰与提示词版本失效。
+"""
+import asyncio
+
+from tatha.core import sqlite_cache
+from tatha.jobs import score_cache, scoring
+from tatha.jobs.schemas import JobMatchScore
+from tatha.jobs.score_cache import JobScoreCache
+
+
+def _key(prompt_version: str = "v1") -> str:
+    return JobScoreCache.make_key("简历", "职位描述", "deepseek/deepseek-chat", prompt_version)
+
+
+def test_cache_hit_miss_counters(tmp_path):
+    cache = JobScoreCache(tmp_path / "s.sqlite3", ttl=60, max_entries=10)
+    assert cache.get(_key()) is None
+    cache.put(_key(), JobMatchScore(overall=80, summary="ok"))
+    hit = cache.get(_key())
+    assert hit is not None and hit.overall == 80
+    assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 0, "entries": 1}
+
+
+def test_prompt_version_changes_key(tmp_path):
+    """提示词版本不同即视为不同条目，旧打分不会被复用。"""
+    cache = JobScoreCache(tmp_path / "s.sqlite3", ttl=60, max_entries=10)
+    cache.put(_key("v1"), JobMatchScore(overall=80))
+    assert cache.get(_key("v2")) is None
+
+
+def test_ttl_expiry(tmp_path, monkeypatch):
+    cache = JobScoreCache(tmp_path / "s.sqlite3", ttl=10, max_entries=10)
+    now = [1000.0]
+    monkeypatch.setattr(sqlite_cache.time, "time", lambda: now[0])
+    cache.put(_key(), JobMatchScore(overall=80))
+    now[0] += 11
+    assert cache.get(_key()) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_size_bounded_eviction(tmp_path, monkeypatch):
+    """超出容量时淘汰最久未访问的条目。"""
+    cache = JobScoreCache(tmp_path / "s.sqlite3", ttl=60, max_entries=2)
+    now = [1000.0]
+    monkeypatch.setattr(sqlite_cache.time, "time", lambda: now[0])
+    for v in ("a", "b"):
+        now[0] += 1
+        cache.put(_key(v), JobMatchScore(overall=50))
+    now[0] += 1
+    cache.get(_key("a"))
+    now[0] += 1
+    cache.put(_key("c"), JobMatchScore(overall=50))
+    assert cache.get(_key("b")) is None
+    assert cache.get(_key("a")) is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_scoring_uses_cache_and_skips_failures(tmp_path, monkeypatch):
+    """重复打分命中缓存不再调用 LLM；失败的打分不写入缓存。"""
+    monkeypatch.setenv("TATHA_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(score_cache, "_cache", None)
+    calls = []
+
+    class _Agent:
+        async def run(self, message):
+            calls.append(message)
+            if len(calls) == 1:
+                raise RuntimeError("provider down")
+            return type("R", (), {"output": JobMatchScore(overall=70)})()
+
+    monkeypatch.setattr(scoring, "_agent", _Agent())
+    first = asyncio.run(scoring.ascore_resume_vs_job("简历", "职位"))
+    assert first.overall == 0
+    for _ in range(2):
+        assert asyncio.run(scoring.ascore_resume_vs_job("简历", "职位")).overall == 70
+    assert len(calls) == 2
@@ -0,0 +1,56 @@
+"""
+职位粗筛漏斗：余弦 Top-K 与多阶段漏斗行为（不加载真实 embedding 模型）。
+"""
+import numpy as np
+
+from tatha.jobs import shortlist
+from tatha.jobs.schemas import JobInfo
+
+
+def _jobs(n: int) -> list[JobInfo]:
+    return [JobInfo(title=f"职位{i}", company="公司") for i in range(n)]
+
+
+def test_cosine_top_k_orders_by_similarity():
+    """与 query 方向最接近的行排在最前，且只返回 k 个。"""
+    matrix = np.array([[0.0, 1.0], [1.0, 0.0], [1.0, 1.0], [-1.0, 0.0]])
+    idx = shortlist.cosine_top_k(np.array([1.0, 0.1]), matrix, 2)
+    assert list(idx) == [1, 2]
+
+
+def test_cosine_top_k_handles_zero_vectors_and_large_k():
+    """零向量不产生 NaN；k 大于行数时返回全部。"""
+    matrix = np.array([[0.0, 0.0], [1.0, 0.0]])
+    idx = shortlist.cosine_top_k(np.array([1.0, 0.0]), matrix, 5)
+    assert list(idx) == [1, 0]
+
+
+def test_embedding_shortlist_uses_embeddings(monkeypatch):
+    """向量化一次（简历 + 全部职位），按相似度保留前 k 条。"""
+    calls = []
+
+    def fake_embed(texts):
+        calls.append(len(texts))
+        # 简历向量 [1, 0]；职位 i 的向量与简历夹角随 i 增大
+        return np.array([[1.0, 0.0]] + [[1.0, float(i)] for i in range(len(texts) - 1)])
+
+    monkeypatch.setattr(shortlist, "embed", fake_embed)
+    jobs = _jobs(6)
+    kept = shortlist.embedding_shortlist("简历", jobs, 2)
+    assert calls == [7]
+    assert [j.title for j in kept] == ["职位0", "职位1"]
+
+
+def test_run_funnel_stages_and_fallback(monkeypatch):
+    """各阶段依次收窄；排序器失败时按原顺序截断；条数不超过阶段大小时跳过。"""
+    def reverse_ranker(resume_text, jobs, k):
+        return list(reversed(jobs))[:k]
+
+    def broken_ranker(resume_text, jobs, k):
+        raise RuntimeError("embedding 不可用")
+
+    monkeypatch.setitem(shortlist.RANKERS, "reverse", reverse_ranker)
+    monkeypatch.setitem(shortlist.RANKERS, "broken", broken_ranker)
+    jobs = _jobs(10)
+    out = shortlist.run_funnel("简历", jobs, [("reverse", 5), ("broken", 3), ("reverse", 8)])
+    assert [j.title for j in out] == ["职位9", "职位8", "职位7"]
@@ -0,0 +1,102 @@
+"""
+职位源：TTL 缓存、单飞刷新、过期后台刷新与实例复用。
+"""
+import threading
+import time
+
+from tatha.jobs.schemas import JobInfo
+from tatha.jobs.sources import registry
+from tatha.jobs.sources.base import JobSource
+from tatha.jobs.sources.cached import CachedJobSource
+
+
+class _SlowSource(JobSource):
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+
+    def fetch_jobs(self, limit: int = 50) -> list[JobInfo]:
+        self.calls += 1
+        time.sleep(self.delay)
+        return [JobInfo(title=f"v{self.calls}-{i}", company="c") for i in range(min(limit, 3))]
+
+
+def test_ttl_reuses_results():
+    inner = _SlowSource()
+    src = CachedJobSource(inner, ttl=60)
+    first = src.fetch_jobs(3)
+    assert src.fetch_jobs(2) == first[:2]
+    assert inner.calls == 1
+
+
+def test_single_flight_under_concurrency():
+    """并发冷启动只触发一次底层拉取，所有请求拿到同一结果。"""
+    inner = _SlowSource(delay=0.2)
+    src = CachedJobSource(inner, ttl=60)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(src.fetch_jobs(3))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert inner.calls == 1
+    assert all(r[0].title == "v1-0" for r in results)
+
+
+def test_stale_while_revalidate():
+    """过期后立即返回旧结果，后台刷新完成后返回新结果。"""
+    inner = _SlowSource(delay=0.1)
+    src = CachedJobSource(inner, ttl=0.05)
+    assert src.fetch_jobs(3)[0].title == "v1-0"
+    time.sleep(0.1)
+    start = time.perf_counter()
+    assert src.fetch_jobs(3)[0].title == "v1-0"
+    assert time.perf_counter() - start < 0.05
+    time.sleep(0.2)
+    assert src.fetch_jobs(3)[0].title == "v2-0"
+
+
+def test_registry_reuses_instances(monkeypatch):
+    monkeypatch.setattr(registry, "_instances", {})
+    assert registry.get_job_source("mock") is registry.get_job_source("MOCK")
+
+
+# ---------- 组合源：并发扇出、超时与去重 ----------
+
+
+def test_composite_returns_before_slow_source_times_out():
+    """慢源超时不拖慢整体：只返回截止前到达的结果。"""
+    from tatha.jobs.sources.composite import CompositeJobSource
+
+    fast, slow = _SlowSource(delay=0.05), _SlowSource(delay=1.0)
+    src = CompositeJobSource({"fast": fast, "slow": slow}, {"fast": 0.5, "slow": 0.2})
+    start = time.perf_counter()
+    jobs = src.fetch_jobs(10)
+    assert time.perf_counter() - start < 0.5
+    assert [j.title for j in jobs] == ["v1-0", "v1-1", "v1-2"]
+
+
+def test_dedupe_near_identical_postings():
+    """同标题同公司、描述仅细微差别视为同一职位；描述差异大则保留。"""
+    from tatha.jobs.sources.composite import dedupe_jobs
+
+    desc = "负责后端服务开发，要求熟悉 Python、FastAPI、数据库，有 AI/LLM 相关经验优先，团队氛围好，弹性工作制。"
+    jobs = [
+        JobInfo(title="Python 后端工程师", company="某科技公司", description=desc, source="a"),
+        JobInfo(title="python后端工程师", company="某科技公司 ", description=desc + "！", source="b"),
+        JobInfo(title="Python 后端工程师", company="某科技公司", description="负责 iOS 客户端开发，Swift 与 Objective-C。", source="b"),
+        JobInfo(title="Python 后端工程师", company="另一家公司", description=desc, source="b"),
+    ]
+    kept = dedupe_jobs(jobs)
+    assert [(j.company, j.source) for j in kept] == [("某科技公司", "a"), ("某科技公司", "b"), ("另一家公司", "b")]
+
+
+def test_registry_builds_composite(monkeypatch):
+    from tatha.jobs.sources.composite import CompositeJobSource
+
+    monkeypatch.setattr(registry, "_instances", {})
+    assert registry.expand_source_ids("all") == ["mock", "apify_linkedin"]
+    assert registry.expand_source_ids("mock, mock,unknown") == ["mock"]
+    src = registry.get_job_source("mock,apify_linkedin")
+    assert isinstance(src, CompositeJobSource)
+    assert src is registry.get_job_source("mock,apify_linkedin")
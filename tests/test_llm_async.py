@@ -0,0 +1,130 @@
+"""
+异步 LLM 调用：可重试错误退避重试、不可重试错误直接抛出、超时、共享连接池；中央大脑意图解析走异步路径（不调用真实 LLM）。
+"""
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import litellm
+import pytest
+
+from tatha.api import central_brain
+from tatha.core import llm
+
+_backoff_delay = llm.backoff_delay
+
+
+def _resp(content: str):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class _StatusError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+@pytest.fixture(autouse=True)
+def _no_backoff(monkeypatch):
+    monkeypatch.setattr(llm, "backoff_delay", lambda attempt: 0.0)
+
+
+def test_acompletion_retries_retryable_errors(monkeypatch):
+    calls = []
+
+    async def _fake(**kwargs):
+        calls.append(kwargs)
+        if len(calls) < 3:
+            raise _StatusError(429)
+        return _resp("ok")
+
+    monkeypatch.setattr(litellm, "acompletion", _fake)
+    out = asyncio.run(llm.ask_ai_async("hi", model="openai/x", max_retries=2, timeout=5))
+    assert out == "ok" and len(calls) == 3
+    # 重试由本层负责：不叠加 SDK 内部重试；超时透传
+    assert calls[0]["max_retries"] == 0 and calls[0]["timeout"] == 5
+
+
+def test_acompletion_raises_non_retryable_immediately(monkeypatch):
+    calls = []
+
+    async def _fake(**kwargs):
+        calls.append(kwargs)
+        raise _StatusError(401)
+
+    monkeypatch.setattr(litellm, "acompletion", _fake)
+    with pytest.raises(_StatusError):
+        asyncio.run(llm.acompletion(messages=[{"role": "user", "content": "x"}], max_retries=3))
+    assert len(calls) == 1
+
+
+def test_acompletion_times_out_and_gives_up(monkeypatch):
+    calls = []
+
+    async def _hang(**kwargs):
+        calls.append(kwargs)
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(litellm, "acompletion", _hang)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(llm.acompletion(timeout=0.05, max_retries=1))
+    assert len(calls) == 2
+
+
+def test_backoff_delay_is_jittered_and_capped():
+    delays = [_backoff_delay(5, base=0.5, cap=2.0) for _ in range(50)]
+    assert all(0 <= d <= 2.0 for d in delays) and len(set(delays)) > 1
+
+
+def test_shared_http_client_reused_within_loop():
+    async def _go():
+        a = llm.get_async_http_client()
+        b = llm.get_async_http_client()
+        await llm.aclose_http_client()
+        return a is b
+
+    assert asyncio.run(_go())
+
+
+def test_parse_intent_uses_async_llm(monkeypatch):
+    async def _fake(**kwargs):
+        return _resp('```json\n{"intent": "poetry", "confidence": 0.9, "slots": {"query": "月"}}\n```')
+
+    monkeypatch.setattr(central_brain, "use_llm_intent", lambda: True)
+    monkeypatch.setattr(central_brain, "llm_acompletion", _fake)
+    assert asyncio.run(central_brain.aparse_intent("来一句关于月亮的诗")) == ("poetry", 0.9, {"query": "月"})
+
+
+def test_parse_intent_falls_back_to_rules_on_llm_error(monkeypatch):
+    async def _boom(**kwargs):
+        raise RuntimeError("down")
+
+    # 关闭本地分类，确保走到 LLM 再回退
+    monkeypatch.setenv("TATHA_INTENT_LOCAL", "false")
+    monkeypatch.setattr(central_brain, "use_llm_intent", lambda: True)
+    monkeypatch.setattr(central_brain, "llm_acompletion", _boom)
+    intent, confidence, _ = central_brain.parse_intent("帮我匹配职位")
+    assert intent == "job_match" and confidence == 0.8
+
+
+def test_http_client_per_loop_without_reassigning_litellm_session(monkeypatch):
+    """各事件循环（含线程内 asyncio.run）各用自己的客户端，循环结束即关闭；litellm 全局会话只设置一次。"""
+    async def _fake(**kwargs):
+        return _resp("ok")
+
+    monkeypatch.setattr(litellm, "acompletion", _fake)
+
+    async def _go():
+        await llm.acompletion(model="m", messages=[{"role": "user", "content": "hi"}], coalesce=False)
+        return litellm.aclient_session, llm.get_async_http_client()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(asyncio.run(_go()))) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    sessions = {id(session) for session, _ in results}
+    clients = [client for _, client in results]
+    assert len(sessions) == 1 and len({id(c) for c in clients}) == 3
+    assert all(c.is_closed for c in clients)
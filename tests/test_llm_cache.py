@@ -0,0 +1,97 @@
+"""
+LLM 响应缓存：键构成、默认仅 temperature=0 缓存、单次跳过、LRU 淘汰、TTL、磁盘层回填与计数（不调用真实 LLM）。
+"""
+import asyncio
+
+import litellm
+import pytest
+
+from tatha.core import llm, llm_cache
+from tatha.core.llm_cache import LLMResponseCache, make_key
+
+MESSAGES = [{"role": "user", "content": "帮我匹配职位"}]
+
+
+def _resp(content: str):
+    return litellm.ModelResponse(
+        model="m", choices=[{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}]
+    )
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    c = LLMResponseCache(max_entries=10, ttl=60)
+    monkeypatch.setattr(llm_cache, "get_llm_cache", lambda: c)
+    return c
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    calls = []
+
+    def _fake(**kwargs):
+        calls.append(kwargs)
+        return _resp(f"answer {len(calls)}")
+
+    async def _afake(**kwargs):
+        return _fake(**kwargs)
+
+    monkeypatch.setattr(litellm, "completion", _fake)
+    monkeypatch.setattr(litellm, "acompletion", _afake)
+    return calls
+
+
+def test_key_ignores_transport_kwargs():
+    base = make_key("m", MESSAGES, {"temperature": 0})
+    assert make_key("m", MESSAGES, {"temperature": 0, "timeout": 5, "max_retries": 0}) == base
+    assert make_key("m", MESSAGES, {"temperature": 0, "max_tokens": 10}) != base
+    assert make_key("other", MESSAGES, {"temperature": 0}) != base
+
+
+def test_temperature_zero_cached_by_default(cache, upstream):
+    a = llm.completion(model="m", messages=MESSAGES, temperature=0)
+    b = llm.completion(model="m", messages=MESSAGES, temperature=0)
+    assert len(upstream) == 1
+    assert a.choices[0].message.content == b.choices[0].message.content == "answer 1"
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["entries"] == 1 and stats["bytes"] > 0
+
+
+def test_nonzero_temperature_and_opt_out_skip_cache(cache, upstream):
+    llm.completion(model="m", messages=MESSAGES, temperature=0.7)
+    llm.completion(model="m", messages=MESSAGES, temperature=0.7)
+    llm.completion(model="m", messages=MESSAGES, temperature=0, cache=False)
+    assert len(upstream) == 3 and cache.stats()["entries"] == 0
+    # 显式 cache=True 时非确定性调用也缓存
+    llm.completion(model="m", messages=MESSAGES, temperature=0.7, cache=True)
+    llm.completion(model="m", messages=MESSAGES, temperature=0.7, cache=True)
+    assert len(upstream) == 4
+
+
+def test_async_path_shares_cache(cache, upstream):
+    llm.completion(model="m", messages=MESSAGES, temperature=0)
+    out = asyncio.run(llm.ask_ai_async("帮我匹配职位", model="m", temperature=0))
+    assert out == "answer 1" and len(upstream) == 1
+
+
+def test_lru_eviction_and_ttl(monkeypatch):
+    c = LLMResponseCache(max_entries=2, ttl=10)
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    for k in ("a", "b"):
+        c.put(k, _resp(k))
+    assert c.get("a") is not None  # a 变为最近访问
+    c.put("c", _resp("c"))
+    assert c.get("b") is None and c.stats()["evictions"] == 1
+    now[0] += 11
+    assert c.get("a") is None and c.stats()["entries"] == 1
+
+
+def test_disk_tier_backfills_memory(tmp_path):
+    path = tmp_path / "llm.sqlite3"
+    LLMResponseCache(max_entries=5, ttl=60, disk_path=path).put("k", _resp("持久化"))
+    fresh = LLMResponseCache(max_entries=5, ttl=60, disk_path=path)
+    assert fresh.get("k").choices[0].message.content == "持久化"
+    assert fresh.get("k") is not None
+    stats = fresh.stats()
+    assert stats["disk_hits"] == 1 and stats["memory_hits"] == 1 and stats["disk_entries"] == 1
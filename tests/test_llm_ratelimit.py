@@ -0,0 +1,94 @@
+"""
+LLM 限流：令牌桶等待与超时、提供方共用桶、未配置不限流、按优先级出队、用量校正与 completion 接入（不调用真实 LLM）。
+"""
+import asyncio
+from types import SimpleNamespace
+
+import litellm
+import pytest
+
+from tatha.core import config, llm
+from tatha.core.ratelimit import RateLimiter, RateLimitTimeout, llm_priority
+
+
+def test_waits_for_refill_then_times_out():
+    limiter = RateLimiter({"deepseek": (0, 600)}, max_wait=1.0)  # 每秒回填 10 token
+    assert limiter.acquire("deepseek/deepseek-chat", 600) < 0.05
+    waited = limiter.acquire("deepseek/deepseek-chat", 2)
+    assert 0.1 <= waited < 0.6
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire("deepseek/deepseek-chat", 100, max_wait=0.1)
+    stats = limiter.stats()["deepseek"]
+    assert stats["acquired"] == 2 and stats["rejected"] == 1 and stats["waiting"] == 0
+
+
+def test_provider_key_shared_and_unlisted_unlimited():
+    limiter = RateLimiter({"deepseek": (1, 0), "openai/gpt-4o": (5, 0)})
+    limiter.acquire("deepseek/deepseek-chat")
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire("deepseek/deepseek-reasoner", max_wait=0)
+    assert limiter.limited("openai/gpt-4o") and not limiter.limited("openai/gpt-4o-mini")
+    assert limiter.acquire("anthropic/claude-3-5-sonnet", 10**9, max_wait=0) == 0.0
+
+
+def test_high_priority_served_before_earlier_low():
+    limiter = RateLimiter({}, default=(600, 0))  # 每 0.1s 一个请求额度
+    for _ in range(600):
+        limiter.acquire("m")
+    order = []
+
+    async def _call(name, priority):
+        await limiter.aacquire("m", priority=priority, max_wait=5)
+        order.append(name)
+
+    async def _go():
+        low = [asyncio.ensure_future(_call(f"low{i}", "low")) for i in range(2)]
+        await asyncio.sleep(0.01)
+        with llm_priority("high"):
+            high = asyncio.ensure_future(_call("high", None))
+        await asyncio.gather(*low, high)
+
+    asyncio.run(_go())
+    assert order[0] == "high" and sorted(order[1:]) == ["low0", "low1"]
+
+
+def test_settle_refunds_overestimate():
+    limiter = RateLimiter({"m": (0, 1000)})
+    limiter.acquire("m", 800)
+    limiter.settle("m", estimated=800, actual=100)
+    assert limiter.stats()["m"]["tokens_left"] >= 900
+
+
+def test_completion_acquires_before_upstream(monkeypatch):
+    limiter = RateLimiter({"m": (1, 0)}, max_wait=0)
+    calls = []
+    monkeypatch.setattr(llm, "get_rate_limiter", lambda: limiter)
+    monkeypatch.setattr(
+        litellm, "completion",
+        lambda **kw: calls.append(kw) or SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))]),
+    )
+    assert llm.ask_ai("你好", model="m", cache=False) == "ok"
+    with pytest.raises(RateLimitTimeout):
+        llm.ask_ai("再来一次", model="m", cache=False)
+    assert len(calls) == 1
+
+
+def test_rate_limit_config_parsing(monkeypatch):
+    monkeypatch.setenv("TATHA_LLM_RATE_LIMITS", "DeepSeek=300:1000000, openai/gpt-4o=500:30000, bad, x=y")
+    monkeypatch.setenv("TATHA_LLM_RPM", "60")
+    assert config.llm_rate_limits() == {"deepseek": (300, 1000000), "openai/gpt-4o": (500, 30000)}
+    assert config.llm_default_rate_limit() == (60, 0)
+
+
+def test_agent_model_wrapper_is_rate_limited(monkeypatch):
+    from pydantic_ai import Agent
+    from pydantic_ai.models.test import TestModel
+
+    from tatha.core import ratelimit
+
+    limiter = RateLimiter({"test": (1, 0)}, max_wait=0)
+    monkeypatch.setattr(ratelimit, "get_rate_limiter", lambda: limiter)
+    agent = Agent(ratelimit.rate_limited_model(TestModel()), output_type=str)
+    assert agent.run_sync("你好").output
+    with pytest.raises(RateLimitTimeout):
+        agent.run_sync("再来一次")
@@ -0,0 +1,224 @@
+"""
+LLM 单飞合并：并发相同调用只发一次上游请求（异步/同步/混合）、异常共享且不残留、单次跳过、领头方取消不影响跟随方。
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import litellm
+import pytest
+
+from tatha.core import llm
+from tatha.core.singleflight import SingleFlight
+
+MESSAGES = [{"role": "user", "content": "推荐一句诗"}]
+
+
+def _resp(content: str):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+@pytest.fixture(autouse=True)
+def _fresh_flight(monkeypatch):
+    monkeypatch.setattr(llm, "_flight", SingleFlight())
+    monkeypatch.setenv("TATHA_LLM_CACHE", "false")
+
+
+def test_async_identical_calls_share_one_request(monkeypatch):
+    calls = []
+
+    async def _fake(**kwargs):
+        calls.append(kwargs)
+        await asyncio.sleep(0.05)
+        return _resp(f"诗 {len(calls)}")
+
+    monkeypatch.setattr(litellm, "acompletion", _fake)
+
+    async def _go():
+        return await asyncio.gather(*(llm.ask_ai_async("推荐一句诗", model="m", temperature=0.8) for _ in range(5)))
+
+    assert asyncio.run(_go()) == ["诗 1"] * 5
+    assert len(calls) == 1 and llm._flight.stats() == {"leaders": 1, "shared": 4, "in_flight": 0}
+
+
+def test_sync_threads_share_one_request(monkeypatch):
+    calls = []
+
+    def _fake(**kwargs):
+        calls.append(kwargs)
+        time.sleep(0.1)
+        return _resp("ok")
+
+    monkeypatch.setattr(litellm, "completion", _fake)
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        outs = list(pool.map(lambda _: llm.ask_ai("推荐一句诗", model="m"), range(5)))
+    assert outs == ["ok"] * 5 and len(calls) == 1
+
+
+def test_sync_caller_joins_async_leader(monkeypatch):
+    started = threading.Event()
+    calls = []
+
+    async def _afake(**kwargs):
+        calls.append(kwargs)
+        started.set()
+        await asyncio.sleep(0.1)
+        return _resp("shared")
+
+    monkeypatch.setattr(litellm, "acompletion", _afake)
+    monkeypatch.setattr(litellm, "completion", lambda **kw: calls.append(kw) or _resp("own"))
+    leader = threading.Thread(target=lambda: asyncio.run(llm.acompletion(model="m", messages=MESSAGES)))
+    leader.start()
+    started.wait(1)
+    out = llm.completion(model="m", messages=MESSAGES)
+    leader.join()
+    assert out.choices[0].message.content == "shared" and len(calls) == 1
+
+
+def test_errors_are_shared_and_not_sticky(monkeypatch):
+    calls = []
+
+    async def _fail(**kwargs):
+        calls.append(kwargs)
+        await asyncio.sleep(0.02)
+        raise ValueError("bad request")
+
+    monkeypatch.setattr(litellm, "acompletion", _fail)
+
+    async def _go():
+        return await asyncio.gather(
+            *(llm.acompletion(model="m", messages=MESSAGES) for _ in range(3)), return_exceptions=True
+        )
+
+    outs = asyncio.run(_go())
+    assert all(isinstance(o, ValueError) for o in outs) and len(calls) == 1
+    asyncio.run(_go())
+    assert len(calls) == 2
+
+
+def test_opt_out_and_leader_cancellation(monkeypatch):
+    calls = []
+
+    async def _fake(**kwargs):
+        calls.append(kwargs)
+        await asyncio.sleep(0.05)
+        return _resp("ok")
+
+    monkeypatch.setattr(litellm, "acompletion", _fake)
+
+    async def _go():
+        leader = asyncio.ensure_future(llm.acompletion(model="m", messages=MESSAGES))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(llm.acompletion(model="m", messages=MESSAGES))
+        own = asyncio.ensure_future(llm.acompletion(model="m", messages=MESSAGES, coalesce=False))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower, await own
+
+    follower, own = asyncio.run(_go())
+    assert follower.choices[0].message.content == own.choices[0].message.content == "ok"
+    assert len(calls) == 2
+
+
+def test_short_deadline_leader_does_not_fail_long_deadline_follower(monkeypatch):
+    """领头方截止时间短、跟随方长：共享一次上游请求，领头方按自己的预算超时，跟随方拿到结果。"""
+    from tatha.core.deadline import DeadlineExceeded, deadline_scope
+
+    calls = []
+
+    async def _fake(**kwargs):
+        calls.append(kwargs)
+        await asyncio.sleep(0.3)
+        return _resp("ok")
+
+    monkeypatch.setattr(litellm, "acompletion", _fake)
+
+    async def _call(budget):
+        with deadline_scope(budget):
+            return await llm.acompletion(model="m", messages=MESSAGES)
+
+    async def _go():
+        # 预热（首次调用的懒加载开销不计入领头方的预算）
+        await llm.acompletion(model="m", messages=MESSAGES, coalesce=False)
+        calls.clear()
+        leader = asyncio.ensure_future(_call(0.15))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(_call(2.0))
+        return await asyncio.gather(leader, follower, return_exceptions=True)
+
+    leader, follower = asyncio.run(_go())
+    assert isinstance(leader, DeadlineExceeded)
+    assert follower.choices[0].message.content == "ok"
+    assert len(calls) == 1 and calls[0]["timeout"] > 0.3
+
+
+def test_priorities_do_not_share_a_flight(monkeypatch):
+    from tatha.core.ratelimit import llm_priority
+
+    calls = []
+
+    async def _fake(**kwargs):
+        calls.append(kwargs)
+        await asyncio.sleep(0.02)
+        return _resp("ok")
+
+    monkeypatch.setattr(litellm, "acompletion", _fake)
+
+    async def _low():
+        with llm_priority("low"):
+            return await llm.acompletion(model="m", messages=MESSAGES)
+
+    async def _go():
+        return await asyncio.gather(_low(), llm.acompletion(model="m", messages=MESSAGES, priority="high"))
+
+    asyncio.run(_go())
+    assert len(calls) == 2
+
+
+def test_sync_follower_retries_after_leader_deadline():
+    """同步领头方因自身截止时间失败时，仍有预算的跟随方重新发起。"""
+    from tatha.core.deadline import DeadlineExceeded, deadline_scope
+
+    flight, calls = SingleFlight(), []
+    started = threading.Event()
+
+    def _leader_fn():
+        calls.append("leader")
+        started.set()
+        time.sleep(0.05)
+        raise DeadlineExceeded("leader budget")
+
+    leader = threading.Thread(target=lambda: pytest.raises(DeadlineExceeded, flight.do, "k", _leader_fn))
+    leader.start()
+    started.wait(1)
+    with deadline_scope(1.0):
+        out = flight.do("k", lambda: calls.append("follower") or "ok")
+    leader.join()
+    assert out == "ok" and calls == ["leader", "follower"]
+
+
+def test_upstream_cancelled_when_last_waiter_leaves(monkeypatch):
+    """唯一的等待方到截止时间离开后取消上游请求，之后的相同调用重新发起。"""
+    from tatha.core.deadline import DeadlineExceeded, deadline_scope
+
+    cancelled = []
+
+    async def _hang(**kwargs):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    monkeypatch.setattr(litellm, "acompletion", _hang)
+
+    async def _go():
+        with deadline_scope(0.05):
+            with pytest.raises(DeadlineExceeded):
+                await llm.acompletion(model="m", messages=MESSAGES)
+        await asyncio.sleep(0.01)
+
+    asyncio.run(_go())
+    assert cancelled == [True] and llm._flight.in_flight() == 0
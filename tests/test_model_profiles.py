@@ -0,0 +1,74 @@
+"""
+按任务的模型配置：默认值与环境变量覆盖、completion/acompletion 套用任务参数（显式参数优先）、Agent 模型与 model_settings（不调用真实 LLM）。
+"""
+import asyncio
+from types import SimpleNamespace
+
+import litellm
+import pytest
+
+from tatha.core import llm
+from tatha.core.config import MODEL_TASKS, model_profile
+
+
+def _resp():
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))])
+
+
+@pytest.fixture(autouse=True)
+def _no_cache(monkeypatch):
+    monkeypatch.setenv("TATHA_LLM_CACHE", "false")
+
+
+def test_profile_defaults_and_overrides(monkeypatch):
+    assert set(MODEL_TASKS) == {"intent", "intent_document", "resume", "poetry", "credit", "job_scoring", "rag"}
+    intent = model_profile("intent")
+    assert intent.model is None and intent.temperature == 0 and intent.max_tokens == 200
+    monkeypatch.setenv("TATHA_DEFAULT_MODEL", "openai/gpt-4o")
+    monkeypatch.setenv("TATHA_MODEL_INTENT", "deepseek/deepseek-chat")
+    monkeypatch.setenv("TATHA_MAX_TOKENS_INTENT", "50")
+    monkeypatch.setenv("TATHA_TIMEOUT_INTENT", "bad")
+    monkeypatch.setenv("TATHA_JOB_SCORE_TIMEOUT", "12")
+    intent = model_profile("intent")
+    assert (intent.model_name, intent.max_tokens, intent.timeout) == ("deepseek/deepseek-chat", 50, 15.0)
+    assert model_profile("job_scoring").timeout == 12.0
+    assert model_profile("rag").model_name == "openai/gpt-4o"
+    with pytest.raises(ValueError):
+        model_profile("unknown")
+
+
+def test_completion_applies_task_profile(monkeypatch):
+    monkeypatch.setenv("TATHA_MODEL_INTENT", "deepseek/deepseek-chat")
+    calls = []
+    monkeypatch.setattr(litellm, "completion", lambda **kw: calls.append(kw) or _resp())
+    llm.completion(messages=[{"role": "user", "content": "hi"}], task="intent")
+    llm.completion(messages=[{"role": "user", "content": "hi"}], task="intent", model="openai/gpt-4o", max_tokens=5)
+    assert calls[0]["model"] == "deepseek/deepseek-chat"
+    assert (calls[0]["max_tokens"], calls[0]["temperature"], calls[0]["timeout"]) == (200, 0.0, 15.0)
+    assert calls[1]["model"] == "openai/gpt-4o" and calls[1]["max_tokens"] == 5
+
+
+def test_acompletion_uses_task_timeout(monkeypatch):
+    calls = []
+
+    async def _fake(**kw):
+        calls.append(kw)
+        return _resp()
+
+    monkeypatch.setattr(litellm, "acompletion", _fake)
+    asyncio.run(llm.acompletion(messages=[{"role": "user", "content": "hi"}], task="poetry"))
+    assert calls[0]["timeout"] == 45.0 and calls[0]["temperature"] == 0.7
+
+
+def test_agents_use_task_model_and_settings(monkeypatch):
+    from tatha.agents import document_agents
+    from tatha.jobs import scoring
+
+    monkeypatch.setenv("TATHA_MODEL_RESUME", "deepseek/deepseek-chat")
+    monkeypatch.setenv("TATHA_MAX_TOKENS_JOB_SCORING", "300")
+    monkeypatch.setenv("TATHA_JOB_BATCH_SIZE", "4")
+    agent = document_agents._resume_agent()
+    assert agent.model.model_name == "deepseek/deepseek-chat"
+    assert agent.model_settings["max_tokens"] == 1500 and agent.model_settings["extra_body"] == {"temperature": 0}
+    assert scoring._job_match_agent().model_settings["max_tokens"] == 300
+    assert scoring._job_match_batch_agent().model_settings["max_tokens"] == 1200
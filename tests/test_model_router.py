@@ -0,0 +1,154 @@
+"""
+多提供方模型路由：健康度排序、慢请求对冲、故障转移、熔断、completion 与 PydanticAI 模型接入（不调用真实 LLM）。
+"""
+import asyncio
+import time
+from types import SimpleNamespace
+
+import litellm
+import pytest
+
+from tatha.core import llm, router as router_mod
+from tatha.core.router import AllModelsFailed, ModelRouter
+
+
+def _resp(content: str):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def test_candidates_prefer_healthy_then_fast():
+    r = ModelRouter(["a", "b", "c"])
+    assert r.candidates() == ["a", "b", "c"]
+    for _ in range(5):
+        r.record("a", None, False)
+        r.record("b", 0.5, True)
+        r.record("c", 0.1, True)
+    assert r.candidates() == ["c", "b", "a"]
+
+
+def test_hedges_slow_primary():
+    r = ModelRouter(["slow", "fast"], hedge_delay=0.05)
+    cancelled = []
+
+    async def _call(model):
+        try:
+            await asyncio.sleep(1.0 if model == "slow" else 0.01)
+        except asyncio.CancelledError:
+            cancelled.append(model)
+            raise
+        return model
+
+    start = time.monotonic()
+    assert asyncio.run(r.acall(_call)) == "fast"
+    assert time.monotonic() - start < 0.5
+    assert r.stats()["hedges"] == 1 and cancelled == ["slow"]
+
+
+def test_fails_over_then_raises_when_all_fail():
+    r = ModelRouter(["a", "b"], hedge=False)
+
+    async def _flaky(model):
+        if model == "a":
+            raise RuntimeError("503")
+        return model
+
+    def _flaky_sync(model):
+        if model == "a":
+            raise RuntimeError("503")
+        return model
+
+    assert asyncio.run(r.acall(_flaky)) == "b"
+    assert r.call(_flaky_sync) == "b"
+
+    async def _down(model):
+        raise RuntimeError(f"{model} down")
+
+    with pytest.raises(AllModelsFailed):
+        asyncio.run(r.acall(_down))
+
+
+def test_circuit_breaker_opens_and_recovers(monkeypatch):
+    r = ModelRouter(["a", "b"], breaker_failures=2, breaker_cooldown=10)
+    now = [100.0]
+    monkeypatch.setattr(router_mod.time, "monotonic", lambda: now[0])
+    r.record("a", None, False)
+    r.record("a", None, False)
+    assert r.stats()["models"]["a"]["open"] and r.candidates()[0] == "b"
+    now[0] += 11
+    assert not r.stats()["models"]["a"]["open"]
+    r.record("a", 0.1, True)
+    assert r.stats()["models"]["a"]["open"] is False
+
+
+def test_acompletion_routes_without_explicit_model(monkeypatch):
+    monkeypatch.setenv("TATHA_MODEL_ROUTE", "deepseek/deepseek-chat,openai/gpt-4o-mini")
+    monkeypatch.setenv("TATHA_LLM_CACHE", "false")
+    monkeypatch.setattr(router_mod, "_router", None)
+    used = []
+
+    async def _fake(**kwargs):
+        used.append(kwargs["model"])
+        if kwargs["model"].startswith("deepseek"):
+            raise ValueError("bad key")
+        return _resp("from openai")
+
+    monkeypatch.setattr(litellm, "acompletion", _fake)
+    assert asyncio.run(llm.ask_ai_async("你好")) == "from openai"
+    assert used == ["deepseek/deepseek-chat", "openai/gpt-4o-mini"]
+    # 显式指定模型时不路由
+    with pytest.raises(ValueError):
+        asyncio.run(llm.ask_ai_async("你好", model="deepseek/deepseek-chat"))
+
+
+def test_routed_agent_model_fails_over():
+    from pydantic_ai import Agent
+    from pydantic_ai.messages import ModelResponse, TextPart
+    from pydantic_ai.models.function import FunctionModel
+
+    def _broken(messages, info):
+        raise RuntimeError("provider down")
+
+    def _ok(messages, info):
+        return ModelResponse(parts=[TextPart("你好")])
+
+    r = ModelRouter(["a", "b"], hedge=False)
+    model = router_mod.routed_model(r, {"a": FunctionModel(_broken), "b": FunctionModel(_ok)})
+    assert Agent(model, output_type=str).run_sync("hi").output == "你好"
+    assert r.stats()["models"]["a"]["error_rate"] == 1.0
+
+
+def test_deadline_failures_do_not_trip_breaker():
+    from tatha.core.deadline import DeadlineExceeded, clamp_timeout, deadline_scope
+    from tatha.core.ratelimit import RateLimitTimeout
+
+    r = ModelRouter(["a", "b"], hedge=False, breaker_failures=1)
+    tried = []
+
+    def _call(model):
+        tried.append(model)
+        raise DeadlineExceeded("请求截止时间已到")
+
+    with deadline_scope(0):
+        with pytest.raises(DeadlineExceeded):
+            r.call(_call)
+    # 预算耗尽后不再转移，也不计为模型失败
+    assert tried == ["a"] and not r.stats()["models"]["a"]["open"]
+
+    async def _slow(model):
+        # 超时收紧到剩余预算，与 LLM 调用一致
+        await asyncio.wait_for(asyncio.sleep(1.0), timeout=clamp_timeout(5))
+
+    async def _go():
+        with deadline_scope(0.05):
+            return await r.acall(_slow)
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(_go())
+    assert r.stats()["models"]["a"]["samples"] == 0 and r.stats()["models"]["b"]["samples"] == 0
+
+    def _queued(model):
+        raise RateLimitTimeout("排队超时")
+
+    with pytest.raises(AllModelsFailed):
+        r.call(_queued)
+    assert not any(m["open"] for m in r.stats()["models"].values())
@@ -0,0 +1,90 @@
+"""
+简历画像：紧凑文本、按简历哈希缓存，LLM 打分使用画像替代原始简历（不调用真实 LLM）。
+"""
+import asyncio
+
+from tatha.agents import ResumeProfile, document_agents
+from tatha.jobs import pipeline, profile
+from tatha.jobs.schemas import JobMatchScore
+
+PROFILE = ResumeProfile(
+    name="张三",
+    skill_list=["Python", "FastAPI"],
+    seniority="高级",
+    years_of_experience=5,
+    locations=["上海"],
+    salary_expectation="25-35k",
+)
+
+
+def _use_tmp_cache(monkeypatch, tmp_path):
+    monkeypatch.setenv("TATHA_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("TATHA_JOB_SCORE_CACHE", "false")
+    monkeypatch.setenv("TATHA_RESUME_PROFILE", "true")
+    monkeypatch.setattr(profile, "_cache", None)
+
+
+def test_profile_prompt_text_is_compact():
+    text = PROFILE.to_prompt_text()
+    assert "技能：Python、FastAPI" in text
+    assert "职级：高级 5 年经验" in text
+    assert "语言" not in text
+
+
+def test_profile_generated_once_per_resume(monkeypatch, tmp_path):
+    _use_tmp_cache(monkeypatch, tmp_path)
+    calls = []
+
+    async def _fake(text):
+        calls.append(text)
+        return PROFILE
+
+    monkeypatch.setattr(document_agents, "arun_resume_profile", _fake)
+    first = asyncio.run(profile.aresume_for_scoring("原始简历全文"))
+    second = asyncio.run(profile.aresume_for_scoring("原始简历全文"))
+    assert first == second == PROFILE.to_prompt_text()
+    assert len(calls) == 1
+
+
+def test_profile_failure_falls_back_to_raw_resume(monkeypatch, tmp_path):
+    _use_tmp_cache(monkeypatch, tmp_path)
+
+    async def _fail(text):
+        raise RuntimeError("provider down")
+
+    monkeypatch.setattr(document_agents, "arun_resume_profile", _fail)
+    assert asyncio.run(profile.aresume_for_scoring("原始简历全文")) == "原始简历全文"
+
+
+def test_pipeline_scores_with_profile(monkeypatch, tmp_path):
+    _use_tmp_cache(monkeypatch, tmp_path)
+    seen = set()
+
+    async def _fake_profile(text):
+        return PROFILE
+
+    async def _score(resume_text, job_description, timeout=None):
+        seen.add(resume_text)
+        return JobMatchScore(overall=50)
+
+    monkeypatch.setattr(document_agents, "arun_resume_profile", _fake_profile)
+    monkeypatch.setattr(pipeline, "ascore_resume_vs_job", _score)
+    asyncio.run(pipeline.arun_job_match_pipeline("原始简历全文", source_id="mock", mode="llm"))
+    assert seen == {PROFILE.to_prompt_text()}
+
+
+def test_profile_cache_evicts_least_recently_used(tmp_path):
+    import sqlite3
+
+    path = tmp_path / "p.sqlite3"
+    # 旧版表（无 accessed_at 列）打开时自动迁移
+    conn = sqlite3.connect(str(path))
+    conn.execute("CREATE TABLE resume_profiles (key TEXT PRIMARY KEY, payload TEXT NOT NULL, created_at REAL NOT NULL)")
+    conn.close()
+    cache = profile.ResumeProfileCache(path, ttl=60, max_entries=2)
+    cache.put("a", PROFILE)
+    cache.put("b", PROFILE)
+    assert cache.get("a") is not None
+    cache.put("c", PROFILE)
+    assert cache.get("b") is None and cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["entries"] == 2 and cache.stats()["evictions"] == 1